@@ -0,0 +1,182 @@
+"""
+API asyncio para firmar y verificar sin bloquear el bucle de eventos
+
+Las operaciones de curva se ejecutan en un executor (por defecto el del
+bucle). Las peticiones individuales que llegan casi a la vez se agrupan en
+una sola tarea de firmar_lote / verificar_lote para amortizar el coste de
+enviar trabajo al executor.
+
+El executor tiene que ser de hilos (ThreadPoolExecutor): ECDSA guarda
+candados y cachés que no se pueden enviar a otro proceso, así que cualquier
+otro executor se rechaza al construir ECDSAAsincrono. La aritmética de
+enteros de Python no suelta el GIL, de modo que los hilos no calculan en
+paralelo entre sí ni con el bucle de eventos: el bucle solo recupera el
+control en los cambios de hilo del intérprete (sys.getswitchinterval(), 5 ms
+por defecto). Sigue respondiendo, pero con esos retrasos y sin ganar
+núcleos. Para repartir el trabajo entre núcleos está MotorParalelo
+(ecdsa_paralelo).
+"""
+
+import asyncio
+import functools
+import os
+import sys
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Tuple, Optional, List, Iterable
+
+# Agregar el directorio actual al path para importar ecdsa_core
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ecdsa_core import ECDSA, Mensaje
+
+
+class ECDSAAsincrono:
+    """
+    Envoltorio asyncio de un objeto ECDSA
+    
+    Como mucho max_concurrencia tareas ocupan el executor a la vez. Cancelar
+    una llamada que aún espera en un grupo la saca del grupo; si el grupo ya
+    se está calculando, su resultado simplemente se descarta. Si el cálculo
+    de un grupo falla, se repite petición a petición para que la excepción
+    solo llegue a quien la provocó.
+    """
+    
+    def __init__(self, ecdsa: ECDSA, ejecutor: Optional[Executor] = None,
+                 max_concurrencia: int = 4, espera_agrupacion: float = 0.0005,
+                 max_agrupacion: int = 64):
+        """
+        Args:
+            ecdsa: Objeto ECDSA que hace el trabajo
+            ejecutor: ThreadPoolExecutor donde se calcula (None = el
+                      executor por defecto del bucle de eventos, también de hilos)
+            max_concurrencia: Tareas como máximo en el executor a la vez
+            espera_agrupacion: Segundos que una petición individual espera a
+                               otras para ir en el mismo grupo
+            max_agrupacion: Tamaño con el que un grupo se envía sin esperar más
+        
+        Raises:
+            TypeError: Si ejecutor no es un ThreadPoolExecutor
+        """
+        if max_concurrencia < 1 or max_agrupacion < 1:
+            raise ValueError("max_concurrencia y max_agrupacion deben ser al menos 1")
+        if ejecutor is not None and not isinstance(ejecutor, ThreadPoolExecutor):
+            raise TypeError("ejecutor debe ser un ThreadPoolExecutor; para varios procesos "
+                            "usa MotorParalelo")
+        self.ecdsa = ecdsa
+        self.ejecutor = ejecutor
+        self.max_concurrencia = max_concurrencia
+        self.espera_agrupacion = espera_agrupacion
+        self.max_agrupacion = max_agrupacion
+        self._semaforo = None
+        self._pendientes = {}
+        self._temporizadores = {}
+        self._tareas = set()
+    
+    def _obtener_semaforo(self) -> asyncio.Semaphore:
+        """El semáforo se crea dentro del bucle de eventos que lo usa"""
+        if self._semaforo is None:
+            self._semaforo = asyncio.Semaphore(self.max_concurrencia)
+        return self._semaforo
+    
+    async def _ejecutar(self, funcion, *args):
+        """Ejecuta funcion(*args) en el executor respetando max_concurrencia"""
+        loop = asyncio.get_running_loop()
+        async with self._obtener_semaforo():
+            return await loop.run_in_executor(self.ejecutor, functools.partial(funcion, *args))
+    
+    async def _encolar(self, clave: tuple, elemento):
+        """Añade una petición individual al grupo de su clave y espera su resultado"""
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        grupo = self._pendientes.setdefault(clave, [])
+        grupo.append((elemento, futuro))
+        if len(grupo) >= self.max_agrupacion:
+            self._despachar(clave)
+        elif len(grupo) == 1:
+            self._temporizadores[clave] = loop.call_later(self.espera_agrupacion, self._despachar, clave)
+        return await futuro
+    
+    def _despachar(self, clave: tuple):
+        """Envía al executor el grupo pendiente de la clave"""
+        temporizador = self._temporizadores.pop(clave, None)
+        if temporizador is not None:
+            temporizador.cancel()
+        grupo = self._pendientes.pop(clave, None)
+        if grupo:
+            tarea = asyncio.get_running_loop().create_task(self._procesar(clave, grupo))
+            self._tareas.add(tarea)
+            tarea.add_done_callback(self._tareas.discard)
+    
+    async def _procesar(self, clave: tuple, grupo: List[tuple]):
+        """Calcula un grupo con firmar_lote / verificar_lote y reparte los resultados"""
+        loop = asyncio.get_running_loop()
+        async with self._obtener_semaforo():
+            # Las peticiones canceladas mientras esperaban ya no se calculan
+            grupo = [(elemento, futuro) for elemento, futuro in grupo if not futuro.done()]
+            if not grupo:
+                return
+            elementos = [elemento for elemento, _ in grupo]
+            if clave[0] == 'verificar':
+                funcion = functools.partial(self.ecdsa.verificar_lote, elementos)
+            else:
+                funcion = functools.partial(self.ecdsa.firmar_lote, elementos, clave[1])
+            try:
+                resultados = [(r, None) for r in await loop.run_in_executor(self.ejecutor, funcion)]
+            except Exception as e:
+                if len(grupo) == 1:
+                    resultados = [(None, e)]
+                else:
+                    # Una petición mala no debe hacer fallar a las demás:
+                    # se repite el grupo petición a petición
+                    resultados = await loop.run_in_executor(
+                        self.ejecutor, functools.partial(self._procesar_uno_a_uno, clave, elementos))
+        
+        for (_, futuro), (resultado, error) in zip(grupo, resultados):
+            if futuro.done():
+                continue
+            if error is not None:
+                futuro.set_exception(error)
+            else:
+                futuro.set_result(resultado)
+    
+    def _procesar_uno_a_uno(self, clave: tuple, elementos: list) -> List[tuple]:
+        """(resultado, excepción) de cada elemento calculado por separado"""
+        resultados = []
+        for elemento in elementos:
+            try:
+                if clave[0] == 'verificar':
+                    resultados.append((self.ecdsa.verificar_lote([elemento])[0], None))
+                else:
+                    resultados.append((self.ecdsa.firmar_lote([elemento], clave[1])[0], None))
+            except Exception as e:
+                resultados.append((None, e))
+        return resultados
+    
+    async def firmar_async(self, mensaje: Mensaje, llave_privada: int) -> Tuple[int, int]:
+        """Firma un mensaje; se agrupa con otras firmas de la misma llave"""
+        return await self._encolar(('firmar', llave_privada), mensaje)
+    
+    async def verificar_async(self, mensaje: Mensaje, firma: Tuple[int, int], llave_publica) -> bool:
+        """Verifica una firma; se agrupa con otras verificaciones cercanas en el tiempo"""
+        return await self._encolar(('verificar',), (mensaje, firma, llave_publica))
+    
+    async def firmar_lote_async(self, mensajes: Iterable[Mensaje], llave_privada: int) -> List[Tuple[int, int]]:
+        """Firma varios mensajes en una sola tarea del executor"""
+        return await self._ejecutar(self.ecdsa.firmar_lote, list(mensajes), llave_privada)
+    
+    async def verificar_lote_async(self, elementos: Iterable[tuple]) -> List[bool]:
+        """Verifica varias firmas (mensaje, firma, llave) en una sola tarea del executor"""
+        return await self._ejecutar(self.ecdsa.verificar_lote, list(elementos))
+    
+    async def cerrar(self):
+        """Envía los grupos pendientes y espera a que terminen"""
+        for clave in list(self._pendientes):
+            self._despachar(clave)
+        if self._tareas:
+            await asyncio.gather(*self._tareas, return_exceptions=True)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.cerrar()
@@ -0,0 +1,393 @@
+"""
+Herramienta de línea de comandos para firmar y verificar en masa
+
+Uso (desde src/ o con src/ en PYTHONPATH):
+    python -m ecdsa_cli firmar    --llave-privada priv.pem < mensajes.jsonl > firmas.jsonl
+    python -m ecdsa_cli verificar --llave-publica pub.pem  < firmas.jsonl  > resultados.jsonl
+    python -m ecdsa_cli firmar    --llave-privada priv.pem --directorio artefactos/
+    python -m ecdsa_cli verificar --llave-publica pub.pem  --directorio artefactos/
+    python -m ecdsa_cli verificar --llavero llaves.llv      < firmas.jsonl  > resultados.jsonl
+
+Registros JSONL (uno por línea):
+    firmar:    {"id": ..., "mensaje": "texto"}  o  {"id": ..., "mensaje_b64": "..."}
+    verificar: lo mismo más "r" y "s" (hexadecimal o enteros) y, opcionalmente,
+               "v" (identificador de recuperación, para verificar por lotes),
+               "qx" y "qy" con otra llave pública de la misma curva, o
+               "llave_id" con el identificador de la llave en --llavero
+Cada registro produce una línea de salida en el mismo orden, con "id" y
+"r"/"s", "valida" o "error".
+
+Con --estado se guarda cada cierto número de registros cuántos van ya
+escritos y hasta qué byte llega la salida (con --directorio, además, el
+último archivo procesado); al relanzar el mismo comando la salida se corta
+en ese byte y se continúa desde ahí. Al terminar se escribe un resumen en
+stderr.
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple, Optional, List, Iterable, Iterator
+
+# Agregar el directorio actual al path para importar ecdsa_core
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ecdsa_core import (
+    ECDSA, PuntoElliptico, importar_llave_publica, importar_llave_privada,
+    exportar_firma, importar_firma, obtener_curva
+)
+from ecdsa_paralelo import MotorParalelo
+from llavero import Llavero
+
+
+# Registros entre dos escrituras del archivo de estado
+INTERVALO_ESTADO = 10000
+
+
+class _MotorLocal:
+    """Misma interfaz que MotorParalelo, en el propio proceso (--procesos 0)"""
+    
+    def __init__(self, ecdsa: ECDSA, llaves_publicas=None, llave_privada=None, tam_bloque=256):
+        self.ecdsa = ecdsa
+        self.llaves = llaves_publicas or {}
+        self.llave_privada = llave_privada
+        self.tam_bloque = tam_bloque
+    
+    def _bloques(self, elementos: Iterable) -> Iterator[list]:
+        bloque = []
+        for elemento in elementos:
+            bloque.append(elemento)
+            if len(bloque) == self.tam_bloque:
+                yield bloque
+                bloque = []
+        if bloque:
+            yield bloque
+    
+    def verificar(self, elementos):
+        for bloque in self._bloques(elementos):
+            yield from self.ecdsa.verificar_lote(
+                [(m, f, llave if isinstance(llave, PuntoElliptico) else self.llaves[llave])
+                 for m, f, llave in bloque])
+    
+    def firmar(self, mensajes):
+        for bloque in self._bloques(mensajes):
+            yield from self.ecdsa.firmar_lote(bloque, self.llave_privada)
+    
+    def cerrar(self):
+        pass
+
+
+def _entero(valor) -> int:
+    """r, s, qx, qy: enteros JSON o cadenas hexadecimales"""
+    if isinstance(valor, int) and not isinstance(valor, bool):
+        return valor
+    if isinstance(valor, str):
+        return int(valor, 16)
+    raise ValueError(f"Valor numérico inválido: {valor!r}")
+
+
+def _mensaje(registro: dict):
+    """Mensaje de un registro: texto en "mensaje" o binario en "mensaje_b64\""""
+    if "mensaje_b64" in registro:
+        return base64.b64decode(registro["mensaje_b64"], validate=True)
+    mensaje = registro["mensaje"]
+    if not isinstance(mensaje, str):
+        raise ValueError("\"mensaje\" debe ser texto; usa \"mensaje_b64\" para datos binarios")
+    return mensaje
+
+
+def _leer_estado(ruta: Optional[str]) -> dict:
+    """
+    Contenido del archivo de estado: "completados" (registros ya escritos),
+    "bytes_salida" (tamaño de la salida en ese momento, si se conoce) y, con
+    --directorio, "ultimo_archivo"
+    """
+    if ruta is None or not os.path.exists(ruta):
+        return {"completados": 0}
+    with open(ruta, 'r', encoding='utf-8') as f:
+        estado = json.load(f)
+    estado["completados"] = int(estado["completados"])
+    return estado
+
+
+def _guardar_estado(ruta: Optional[str], completados: int, salida, **extra):
+    """Vuelca la salida a disco y después guarda el estado (de forma atómica)"""
+    if ruta is None:
+        return
+    salida.flush()
+    estado = {"completados": completados}
+    try:
+        os.fsync(salida.fileno())
+        estado["bytes_salida"] = salida.tell()
+    except (OSError, ValueError, AttributeError):
+        pass  # stdout de una tubería, etc.
+    estado.update(extra)
+    temporal = ruta + ".tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(estado, f)
+    os.replace(temporal, ruta)
+
+
+def _registros(entrada, saltar: int) -> Iterator[Tuple[Optional[dict], Optional[str]]]:
+    """(registro, error) por cada línea no vacía de la entrada, saltando las ya hechas"""
+    numero = 0
+    for linea in entrada:
+        if not linea.strip():
+            continue
+        numero += 1
+        if numero <= saltar:
+            continue
+        try:
+            registro = json.loads(linea)
+            if not isinstance(registro, dict):
+                raise ValueError("el registro no es un objeto JSON")
+            yield registro, None
+        except ValueError as e:
+            yield None, f"JSON inválido en la línea {numero}: {e}"
+
+
+class _Resumen:
+    """Contadores para el resumen final"""
+    
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.procesados = 0
+        self.validos = 0
+        self.invalidos = 0
+        self.errores = 0
+    
+    def imprimir(self, operacion: str, destino=None):
+        destino = destino or sys.stderr
+        segundos = max(time.perf_counter() - self.inicio, 1e-9)
+        print(f"{operacion}: {self.procesados} registros en {segundos:.2f} s "
+              f"({self.procesados / segundos:.0f} registros/s)", file=destino)
+        if operacion == "verificar":
+            print(f"  válidas: {self.validos}  inválidas: {self.invalidos}  "
+                  f"errores: {self.errores}", file=destino)
+        else:
+            print(f"  firmadas: {self.procesados - self.errores}  errores: {self.errores}", file=destino)
+
+
+def _procesar_jsonl(args, motor, entrada, salida, resumen: _Resumen,
+                    llavero: Optional[Llavero] = None) -> int:
+    """Firma o verifica un flujo JSONL manteniendo el orden de los registros"""
+    completados = _leer_estado(args.estado)["completados"]
+    # Por cada elemento enviado al motor: (id, error) en el mismo orden
+    metadatos = deque()
+    
+    def elementos():
+        for registro, error in _registros(entrada, completados):
+            identificador = registro.get("id") if registro else None
+            try:
+                if error is not None:
+                    raise ValueError(error)
+                mensaje = _mensaje(registro)
+                if args.operacion == "firmar":
+                    elemento = mensaje
+                else:
+                    firma = (_entero(registro["r"]), _entero(registro["s"]))
+                    if "v" in registro:
+                        firma += (_entero(registro["v"]),)
+                    if "qx" in registro or "qy" in registro:
+                        llave = PuntoElliptico(_entero(registro["qx"]), _entero(registro["qy"]))
+                    elif "llave_id" in registro:
+                        if llavero is None:
+                            raise ValueError("\"llave_id\" necesita --llavero")
+                        llave = llavero.obtener(str(registro["llave_id"]))
+                        if llave is None:
+                            raise ValueError(f"llave desconocida: {registro['llave_id']}")
+                    elif args.llave_publica:
+                        llave = 0
+                    else:
+                        raise ValueError("el registro no indica la llave pública "
+                                         "(\"qx\"/\"qy\" o \"llave_id\")")
+                    elemento = (mensaje, firma, llave)
+            except (KeyError, ValueError, TypeError) as e:
+                error = str(e) if not isinstance(e, KeyError) else f"falta el campo {e}"
+                # Relleno barato que mantiene el orden; su resultado se ignora
+                elemento = "" if args.operacion == "firmar" else ("", (0, 0), 0)
+            metadatos.append((identificador, error))
+            yield elemento
+    
+    if args.operacion == "firmar":
+        resultados = motor.firmar(elementos())
+    else:
+        resultados = motor.verificar(elementos())
+    
+    for resultado in resultados:
+        identificador, error = metadatos.popleft()
+        salida_registro = {"id": identificador}
+        if error is not None:
+            salida_registro["error"] = error
+            resumen.errores += 1
+        elif args.operacion == "firmar":
+            salida_registro["r"] = format(resultado[0], 'x')
+            salida_registro["s"] = format(resultado[1], 'x')
+        else:
+            salida_registro["valida"] = resultado
+            if resultado:
+                resumen.validos += 1
+            else:
+                resumen.invalidos += 1
+        salida.write(json.dumps(salida_registro, ensure_ascii=False) + "\n")
+        resumen.procesados += 1
+        completados += 1
+        if completados % INTERVALO_ESTADO == 0:
+            _guardar_estado(args.estado, completados, salida)
+    
+    _guardar_estado(args.estado, completados, salida)
+    return 0 if resumen.errores == 0 and resumen.invalidos == 0 else 1
+
+
+def _procesar_directorio(args, ecdsa: ECDSA, llave, salida, resumen: _Resumen) -> int:
+    """
+    Firma cada archivo de un directorio (escribe <archivo>.sig) o verifica
+    cada archivo que tenga su .sig; el hash se calcula por bloques en hilos
+    """
+    archivos = sorted(
+        nombre for nombre in os.listdir(args.directorio)
+        if os.path.isfile(os.path.join(args.directorio, nombre)) and not nombre.endswith(".sig")
+    )
+    estado = _leer_estado(args.estado)
+    completados = estado["completados"]
+    ultimo = estado.get("ultimo_archivo")
+    if ultimo is not None:
+        # Por nombre y no por posición: el directorio puede haber cambiado
+        archivos = [nombre for nombre in archivos if nombre > ultimo]
+    elif completados:
+        archivos = archivos[completados:]
+    
+    def trabajar(nombre: str) -> dict:
+        ruta = os.path.join(args.directorio, nombre)
+        try:
+            if args.operacion == "firmar":
+                firma = ecdsa.firmar_archivo(ruta, llave)
+                exportar_firma(firma, ruta + ".sig",
+                               {"archivo": nombre, "tamano": os.path.getsize(ruta)},
+                               algoritmo_hash=ecdsa.nombre_hash)
+                return {"archivo": nombre, "r": format(firma[0], 'x'), "s": format(firma[1], 'x')}
+            firma, metadatos = importar_firma(ruta + ".sig")
+            if metadatos.get("hash", ecdsa.nombre_hash) != ecdsa.nombre_hash:
+                raise ValueError(f"la firma usa {metadatos['hash']} y no {ecdsa.nombre_hash}")
+            return {"archivo": nombre, "valida": ecdsa.verificar_archivo(ruta, firma, llave)}
+        except (OSError, ValueError, KeyError) as e:
+            return {"archivo": nombre, "error": str(e)}
+    
+    with ThreadPoolExecutor(max_workers=max(1, args.procesos or 1)) as hilos:
+        for resultado in hilos.map(trabajar, archivos):
+            if "error" in resultado:
+                resumen.errores += 1
+            elif resultado.get("valida") is True:
+                resumen.validos += 1
+            elif resultado.get("valida") is False:
+                resumen.invalidos += 1
+            salida.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+            resumen.procesados += 1
+            completados += 1
+            ultimo = resultado["archivo"]
+            if completados % INTERVALO_ESTADO == 0:
+                _guardar_estado(args.estado, completados, salida, ultimo_archivo=ultimo)
+    
+    _guardar_estado(args.estado, completados, salida, ultimo_archivo=ultimo)
+    return 0 if resumen.errores == 0 and resumen.invalidos == 0 else 1
+
+
+def _crear_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m ecdsa_cli",
+        description="Firma y verifica ECDSA en masa sobre flujos JSONL o directorios"
+    )
+    subparsers = parser.add_subparsers(dest="operacion", required=True)
+    
+    for operacion in ("firmar", "verificar"):
+        sub = subparsers.add_parser(operacion)
+        if operacion == "firmar":
+            sub.add_argument("--llave-privada", required=True, help="Archivo PEM de la llave privada")
+            sub.add_argument("--deterministas", action="store_true",
+                             help="Nonces deterministas (RFC 6979)")
+        else:
+            grupo = sub.add_mutually_exclusive_group(required=True)
+            grupo.add_argument("--llave-publica", help="Archivo PEM de la llave pública por defecto")
+            grupo.add_argument("--curva", help="Curva estándar (si todas las llaves van en los registros)")
+            grupo.add_argument("--llavero", help="Llavero con las llaves que nombran los registros (llave_id)")
+        sub.add_argument("--entrada", default="-", help="Archivo JSONL de entrada (por defecto stdin)")
+        sub.add_argument("--salida", default="-", help="Archivo JSONL de salida (por defecto stdout)")
+        sub.add_argument("--directorio", help="Procesar los archivos de este directorio en vez de JSONL")
+        sub.add_argument("--procesos", type=int, default=os.cpu_count() or 1,
+                         help="Procesos trabajadores (0 = en este proceso)")
+        sub.add_argument("--tam-bloque", type=int, default=256, help="Registros por tarea")
+        sub.add_argument("--hash", dest="algoritmo_hash", help="Función hash (por defecto la de la curva)")
+        sub.add_argument("--estado", help="Archivo de estado para reanudar tras un fallo")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Punto de entrada; devuelve 0 si todo fue válido, 1 si hubo inválidas o errores"""
+    args = _crear_parser().parse_args(argv)
+    
+    llave_privada = None
+    llave_publica = None
+    llavero = None
+    if args.operacion == "firmar":
+        llave_privada, curva = importar_llave_privada(args.llave_privada)
+    elif args.llave_publica:
+        llave_publica, curva = importar_llave_publica(args.llave_publica)
+    elif args.llavero:
+        llavero = Llavero(args.llavero, solo_lectura=True)
+        curva = llavero.curva
+    else:
+        curva = obtener_curva(args.curva)
+    
+    ecdsa = ECDSA(curva, algoritmo_hash=args.algoritmo_hash,
+                  nonces_deterministas=getattr(args, "deterministas", False))
+    # La llave 0 es la de --llave-publica; sin ella se usa G como relleno
+    llaves = {0: llave_publica if llave_publica is not None else curva.G}
+    
+    estado = _leer_estado(args.estado)
+    reanudando = estado["completados"] > 0
+    if args.salida == "-":
+        salida = sys.stdout
+    else:
+        salida = open(args.salida, 'a' if reanudando else 'w', encoding='utf-8')
+        if reanudando and 0 <= estado.get("bytes_salida", -1) < salida.tell():
+            # Descarta lo escrito después del último estado guardado
+            # (registros que se van a repetir y una posible línea a medias)
+            salida.truncate(estado["bytes_salida"])
+    resumen = _Resumen()
+    
+    try:
+        if args.directorio:
+            llave = llave_privada if args.operacion == "firmar" else llave_publica
+            if llave is None:
+                raise SystemExit("--directorio necesita --llave-publica para verificar")
+            return _procesar_directorio(args, ecdsa, llave, salida, resumen)
+        
+        if args.procesos > 0:
+            motor = MotorParalelo(curva, llaves, llave_privada, procesos=args.procesos,
+                                  tam_bloque=args.tam_bloque, algoritmo_hash=ecdsa.nombre_hash,
+                                  nonces_deterministas=ecdsa.nonces_deterministas)
+        else:
+            motor = _MotorLocal(ecdsa, llaves, llave_privada, args.tam_bloque)
+        
+        entrada = sys.stdin if args.entrada == "-" else open(args.entrada, 'r', encoding='utf-8')
+        try:
+            return _procesar_jsonl(args, motor, entrada, salida, resumen, llavero)
+        finally:
+            motor.cerrar()
+            if entrada is not sys.stdin:
+                entrada.close()
+    finally:
+        resumen.imprimir(args.operacion)
+        if llavero is not None:
+            llavero.cerrar()
+        if salida is not sys.stdout:
+            salida.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
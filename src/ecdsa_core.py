@@ -6,51 +6,238 @@ Autores: Betito, Alicia, Candy
 """
 
 import hashlib
+import hmac
+import functools
 import secrets
 import math
 import base64
-from typing import Tuple, Optional, List, Dict
+import re
+import sys
+import threading
+from collections import OrderedDict, deque
+from typing import Tuple, Optional, List, Dict, Iterable, Union
+
+# pow(a, -1, m) calcula inversos modulares desde Python 3.8
+_POW_CON_INVERSO = sys.version_info >= (3, 8)
+
+# Mensajes aceptados: texto (se codifica en UTF-8) u objetos con protocolo de buffer
+Mensaje = Union[str, bytes, bytearray, memoryview]
+
+# Función hash usada cuando la curva no tiene una propia en _HASH_POR_CURVA
+HASH_POR_DEFECTO = 'sha256'
 
 
 class PuntoElliptico:
-    """Representa un punto en una curva elíptica o el punto en el infinito"""
+    """
+    Representa un punto en una curva elíptica o el punto en el infinito
+    
+    Es inmutable y usa __slots__ (sin __dict__), así que ocupa poca memoria y
+    puede usarse como clave de diccionarios y conjuntos.
+    """
+    
+    __slots__ = ('x', 'y')
     
     def __init__(self, x: Optional[int], y: Optional[int]):
-        self.x = x
-        self.y = y
-        self.es_infinito = (x is None and y is None)
+        object.__setattr__(self, 'x', x)
+        object.__setattr__(self, 'y', y)
+    
+    @property
+    def es_infinito(self) -> bool:
+        return self.x is None and self.y is None
+    
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("PuntoElliptico es inmutable")
+    
+    def __delattr__(self, nombre):
+        raise AttributeError("PuntoElliptico es inmutable")
+    
+    def __reduce__(self):
+        return (PuntoElliptico, (self.x, self.y))
     
     def __eq__(self, otro):
         if not isinstance(otro, PuntoElliptico):
             return False
         return self.x == otro.x and self.y == otro.y
     
+    def __hash__(self):
+        return hash((self.x, self.y))
+    
     def __repr__(self):
         if self.es_infinito:
             return "O (punto en el infinito)"
         return f"({self.x}, {self.y})"
 
 
+def _wnaf(k: int, w: int) -> List[int]:
+    """
+    Representación NAF de ancho w de k (dígitos del menos al más significativo)
+    Cada dígito es 0 o impar con |d| < 2^(w-1), y entre dos dígitos no nulos
+    hay al menos w-1 ceros.
+    """
+    signo = 1
+    if k < 0:
+        signo, k = -1, -k
+    
+    modulo = 1 << w
+    mitad = 1 << (w - 1)
+    digitos = []
+    while k > 0:
+        if k & 1:
+            d = k & (modulo - 1)
+            if d >= mitad:
+                d -= modulo
+            k -= d
+        else:
+            d = 0
+        digitos.append(signo * d)
+        k >>= 1
+    return digitos
+
+
+def _inverso(a: int, m: int) -> int:
+    """
+    Inverso modular de a módulo m (algoritmo extendido de Euclides, iterativo)
+    
+    En Python 3.8+ se usa pow(a, -1, m), implementado en C.
+    """
+    if _POW_CON_INVERSO:
+        try:
+            return pow(a, -1, m)
+        except ValueError:
+            raise ValueError(f"No existe inverso modular de {a} módulo {m}")
+    
+    r0, r1 = a % m, m
+    s0, s1 = 1, 0
+    while r1:
+        cociente = r0 // r1
+        r0, r1 = r1, r0 - cociente * r1
+        s0, s1 = s1, s0 - cociente * s1
+    if r0 != 1:
+        raise ValueError(f"No existe inverso modular de {a} módulo {m}")
+    return s0 % m
+
+
+def _es_primo_probable(n: int, rondas: int = 32) -> bool:
+    """Prueba de primalidad de Miller-Rabin"""
+    if n < 2:
+        return False
+    for primo in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37):
+        if n % primo == 0:
+            return n == primo
+    
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for _ in range(rondas):
+        x = pow(secrets.randbelow(n - 3) + 2, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = (x * x) % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+@functools.lru_cache(maxsize=32)
+def _parametros_tonelli_shanks(p: int) -> Tuple[int, int, int]:
+    """
+    (Q, S, c) con p - 1 = Q·2^S, Q impar, y c = z^Q para un no residuo z;
+    solo dependen de p, así que se calculan una vez por primo
+    """
+    Q, S = p - 1, 0
+    while Q % 2 == 0:
+        Q //= 2
+        S += 1
+    z = 2
+    while pow(z, (p - 1) // 2, p) != p - 1:
+        z += 1
+    return Q, S, pow(z, Q, p)
+
+
+def _raiz_cuadrada(a: int, p: int) -> Optional[int]:
+    """
+    Calcula y tal que y² ≡ a (mod p) con p primo, o None si a no es residuo
+    cuadrático. Usa el exponente (p+1)/4 cuando p ≡ 3 (mod 4) y
+    Tonelli-Shanks en otro caso.
+    """
+    a %= p
+    if a == 0:
+        return 0
+    
+    if p % 4 == 3:
+        y = pow(a, (p + 1) // 4, p)
+        return y if (y * y) % p == a else None
+    
+    if pow(a, (p - 1) // 2, p) != 1:
+        return None
+    
+    # Tonelli-Shanks: p - 1 = Q·2^S con Q impar
+    Q, S, c = _parametros_tonelli_shanks(p)
+    M, t, R = S, pow(a, Q, p), pow(a, (Q + 1) // 2, p)
+    while t != 1:
+        i, t2 = 0, t
+        while t2 != 1:
+            t2 = (t2 * t2) % p
+            i += 1
+        b = pow(c, 1 << (M - i - 1), p)
+        M, c = i, (b * b) % p
+        t, R = (t * c) % p, (R * b) % p
+    return R
+
+
+def _redondear_division(a: int, n: int) -> int:
+    """Entero más cercano a a/n (n > 0), también para a negativo"""
+    return (2 * a + n) // (2 * n)
+
+
+def _ventana_wnaf(bits: int) -> int:
+    """
+    Elige el ancho w de la ventana wNAF para un escalar de `bits` bits,
+    minimizando precálculo (2^(w-2) puntos) + sumas esperadas (bits/(w+1))
+    """
+    return min(range(2, 9), key=lambda w: (1 << (w - 2)) + bits / (w + 1))
+
+
 class CurvaEliptica:
     """
     Curva elíptica sobre un campo finito F_p
     Ecuación: y² = x³ + ax + b (mod p)
     """
     
-    def __init__(self, p: int, a: int, b: int, G: Tuple[int, int], q: int):
+    def __init__(self, p: int, a: int, b: int, G: Tuple[int, int], q: int,
+                 nombre: Optional[str] = None, endomorfismo: Optional[Tuple[int, int]] = None):
         """
         Args:
             p: Primo que define el campo finito F_p
             a, b: Coeficientes de la curva
             G: Punto generador (x, y)
             q: Orden del punto generador G
+            nombre: Identificador de la curva si es una curva estándar
+            endomorfismo: (β, λ) del endomorfismo (x, y) ↦ (βx, y) = λ·(x, y)
+                          para curvas con a = 0 y p ≡ 1 (mod 3); si no se
+                          indica, se busca automáticamente cuando aplica
         """
+        self.nombre = nombre
         self.p = p
         self.a = a
         self.b = b
         self.G = PuntoElliptico(G[0], G[1])
         self.q = q
         
+        # Tabla precalculada para k·G (se construye la primera vez que se usa)
+        self._tabla_G = None
+        self._multiplos_G = None
+        self._cofactor_uno = None
+        self._llaves_validadas = OrderedDict()
+        self._candado_validadas = threading.Lock()
+        self._endomorfismo = endomorfismo
+        self._glv = None
+        self._multiplos_G_endo = None
+        
         # Verificar que el discriminante no sea cero
         discriminante = (4 * a**3 + 27 * b**2) % p
         if discriminante == 0:
@@ -61,31 +248,110 @@ class CurvaEliptica:
         if punto.es_infinito:
             return True
         
-        izquierda = (punto.y ** 2) % self.p
-        derecha = (punto.x ** 3 + self.a * punto.x + self.b) % self.p
-        return izquierda == derecha
+        x, y, p = punto.x, punto.y, self.p
+        return (y * y - (x * x + self.a) * x - self.b) % p == 0
+    
+    # Resultados de es_llave_publica_valida() que recuerda cada curva
+    MAX_LLAVES_VALIDADAS = 65536
+    
+    def es_llave_publica_valida(self, punto: PuntoElliptico) -> bool:
+        """
+        Validación completa de una llave pública (SEC1, sección 3.2.2.1)
+        
+        Q ≠ O, coordenadas en [0, p), Q en la curva y q·Q = O. Si el grupo
+        tiene orden primo q (cofactor 1) la última comprobación sobra. El
+        resultado se recuerda por llave, así que las llaves frecuentes solo se
+        validan una vez.
+        """
+        if punto.es_infinito:
+            return False
+        clave = (punto.x, punto.y)
+        with self._candado_validadas:
+            valida = self._llaves_validadas.get(clave)
+            if valida is not None:
+                self._llaves_validadas.move_to_end(clave)
+                return valida
+        
+        x, y = clave
+        valida = (0 <= x < self.p and 0 <= y < self.p and self.esta_en_curva(punto) and
+                  (self._tiene_cofactor_uno() or self._wnaf_jacobiano(self.q, punto)[2] == 0))
+        with self._candado_validadas:
+            self._llaves_validadas[clave] = valida
+            if len(self._llaves_validadas) > self.MAX_LLAVES_VALIDADAS:
+                self._llaves_validadas.popitem(last=False)
+        return valida
     
     def inverso_modular(self, a: int, m: int) -> int:
         """
         Calcula el inverso modular de a módulo m usando el algoritmo extendido de Euclides
         Devuelve x tal que (a * x) ≡ 1 (mod m)
         """
-        if a < 0:
-            a = (a % m + m) % m
+        return _inverso(a, m)
+    
+    def invertir_lote(self, valores: List[int], m: int) -> List[int]:
+        """
+        Invierte varios valores módulo m con un solo inverso modular (truco de Montgomery)
         
-        # Algoritmo extendido de Euclides
-        def egcd(a, b):
-            if a == 0:
-                return b, 0, 1
-            gcd, x1, y1 = egcd(b % a, a)
-            x = y1 - (b // a) * x1
-            y = x1
-            return gcd, x, y
+        Se acumulan los productos parciales v₁·v₂·…·vᵢ, se invierte el producto
+        total y se recorre la lista hacia atrás recuperando cada inverso con dos
+        multiplicaciones.
         
-        gcd, x, _ = egcd(a, m)
-        if gcd != 1:
-            raise ValueError(f"No existe inverso modular de {a} módulo {m}")
-        return (x % m + m) % m
+        Raises:
+            ValueError: Si algún valor no tiene inverso módulo m
+        """
+        valores = [v % m for v in valores]
+        if not valores:
+            return []
+        
+        acumulados = []
+        producto = 1
+        for v in valores:
+            producto = (producto * v) % m
+            acumulados.append(producto)
+        
+        try:
+            inverso = _inverso(producto, m)
+        except ValueError:
+            malos = [v for v in valores if math.gcd(v, m) != 1]
+            raise ValueError(f"No existe inverso modular de {malos[0]} módulo {m}")
+        
+        inversos = [0] * len(valores)
+        for i in range(len(valores) - 1, 0, -1):
+            inversos[i] = (inverso * acumulados[i - 1]) % m
+            inverso = (inverso * valores[i]) % m
+        inversos[0] = inverso
+        return inversos
+    
+    def _raiz_cuadrada_modular(self, a: int) -> Optional[int]:
+        """Calcula y tal que y² ≡ a (mod p), o None si a no es residuo cuadrático"""
+        return _raiz_cuadrada(a, self.p)
+    
+    def _levantar_x(self, x: int) -> Optional[Tuple[int, int]]:
+        """Devuelve un punto (x, y) de la curva con la coordenada x dada, o None si no existe"""
+        y = self._raiz_cuadrada_modular(x * x * x + self.a * x + self.b)
+        if y is None:
+            return None
+        return (x % self.p, y)
+    
+    def punto_desde_x(self, x: int, y_impar: bool) -> PuntoElliptico:
+        """
+        Reconstruye el punto de la curva con coordenada x y la paridad de y
+        indicada (descompresión SEC1)
+        
+        Raises:
+            ValueError: Si x no está en [0, p) o no hay punto con esa x
+        """
+        if not 0 <= x < self.p:
+            raise ValueError("La coordenada x debe estar en [0, p)")
+        punto = self._levantar_x(x)
+        if punto is None:
+            raise ValueError(f"No hay ningún punto de la curva con x = {x}")
+        y = punto[1]
+        if y == 0 and y_impar:
+            raise ValueError("y = 0 no puede tener paridad impar")
+        if (y & 1) != bool(y_impar):
+            y = self.p - y
+        return PuntoElliptico(x, y)
     
     def sumar_puntos(self, P: PuntoElliptico, Q: PuntoElliptico) -> PuntoElliptico:
         """
@@ -102,7 +368,7 @@ class CurvaEliptica:
             return PuntoElliptico(None, None)
         
         # Calcular la pendiente
-        if P == Q:
+        if P.x == Q.x and P.y == Q.y:
             # Duplicación de punto: λ = (3x² + a) / (2y)
             numerador = (3 * P.x ** 2 + self.a) % self.p
             denominador = (2 * P.y) % self.p
@@ -121,30 +387,791 @@ class CurvaEliptica:
         
         return PuntoElliptico(x_r, y_r)
     
-    def multiplicar_escalar(self, k: int, P: PuntoElliptico) -> PuntoElliptico:
+    # ------------------------------------------------------------------
+    # Aritmética interna en coordenadas jacobianas
+    #
+    # Un punto (X, Y, Z) representa al punto afín (X/Z², Y/Z³); Z = 0 es el
+    # punto en el infinito. Estas rutinas trabajan con tuplas de enteros y no
+    # calculan inversos: solo se invierte una vez al volver a coordenadas afines.
+    # ------------------------------------------------------------------
+    
+    _INFINITO_JACOBIANO = (1, 1, 0)
+    
+    def _duplicar_jacobiano(self, P: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        """Calcula 2·P en coordenadas jacobianas"""
+        X1, Y1, Z1 = P
+        p = self.p
+        if Z1 == 0 or Y1 == 0:
+            return self._INFINITO_JACOBIANO
+        
+        YY = (Y1 * Y1) % p
+        S = (4 * X1 * YY) % p
+        ZZ = (Z1 * Z1) % p
+        M = (3 * X1 * X1 + self.a * ZZ * ZZ) % p
+        X3 = (M * M - 2 * S) % p
+        Y3 = (M * (S - X3) - 8 * YY * YY) % p
+        Z3 = (2 * Y1 * Z1) % p
+        return (X3, Y3, Z3)
+    
+    def _sumar_jacobiano_mixto(self, P: Tuple[int, int, int], x2: int, y2: int) -> Tuple[int, int, int]:
+        """Calcula P + (x2, y2) con P jacobiano y (x2, y2) afín (suma mixta)"""
+        X1, Y1, Z1 = P
+        p = self.p
+        if Z1 == 0:
+            return (x2 % p, y2 % p, 1)
+        
+        Z1Z1 = (Z1 * Z1) % p
+        U2 = (x2 * Z1Z1) % p
+        S2 = (y2 * Z1 * Z1Z1) % p
+        H = (U2 - X1) % p
+        R = (S2 - Y1) % p
+        if H == 0:
+            if R == 0:
+                return self._duplicar_jacobiano(P)
+            return self._INFINITO_JACOBIANO
+        
+        HH = (H * H) % p
+        HHH = (H * HH) % p
+        V = (X1 * HH) % p
+        X3 = (R * R - HHH - 2 * V) % p
+        Y3 = (R * (V - X3) - Y1 * HHH) % p
+        Z3 = (Z1 * H) % p
+        return (X3, Y3, Z3)
+    
+    def _sumar_jacobiano(self, P: Tuple[int, int, int], Q: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        """Calcula P + Q con ambos puntos en coordenadas jacobianas"""
+        X1, Y1, Z1 = P
+        X2, Y2, Z2 = Q
+        p = self.p
+        if Z1 == 0:
+            return Q
+        if Z2 == 0:
+            return P
+        
+        Z1Z1 = (Z1 * Z1) % p
+        Z2Z2 = (Z2 * Z2) % p
+        U1 = (X1 * Z2Z2) % p
+        U2 = (X2 * Z1Z1) % p
+        S1 = (Y1 * Z2 * Z2Z2) % p
+        S2 = (Y2 * Z1 * Z1Z1) % p
+        H = (U2 - U1) % p
+        R = (S2 - S1) % p
+        if H == 0:
+            if R == 0:
+                return self._duplicar_jacobiano(P)
+            return self._INFINITO_JACOBIANO
+        
+        HH = (H * H) % p
+        HHH = (H * HH) % p
+        V = (U1 * HH) % p
+        X3 = (R * R - HHH - 2 * V) % p
+        Y3 = (R * (V - X3) - S1 * HHH) % p
+        Z3 = (Z1 * Z2 * H) % p
+        return (X3, Y3, Z3)
+    
+    def _a_afin(self, P: Tuple[int, int, int]) -> PuntoElliptico:
+        """Convierte un punto jacobiano a afín con un único inverso modular"""
+        X, Y, Z = P
+        if Z == 0:
+            return PuntoElliptico(None, None)
+        
+        z_inv = self.inverso_modular(Z, self.p)
+        z_inv2 = (z_inv * z_inv) % self.p
+        return PuntoElliptico((X * z_inv2) % self.p, (Y * z_inv2 * z_inv) % self.p)
+    
+    def _normalizar_lote(self, puntos: List[Tuple[int, int, int]]) -> List[Optional[Tuple[int, int]]]:
+        """
+        Convierte muchos puntos jacobianos a afines con un solo inverso modular
+        Devuelve tuplas (x, y), o None para el punto en el infinito.
+        """
+        p = self.p
+        finitos = [i for i, (_, _, Z) in enumerate(puntos) if Z % p]
+        inversos = self.invertir_lote([puntos[i][2] for i in finitos], p)
+        
+        afines = [None] * len(puntos)
+        for i, z_inv in zip(finitos, inversos):
+            X, Y, _ = puntos[i]
+            z_inv2 = (z_inv * z_inv) % p
+            afines[i] = ((X * z_inv2) % p, (Y * z_inv2 * z_inv) % p)
+        return afines
+    
+    def multiplicar_escalar(self, k: int, P: PuntoElliptico, ventana: Optional[int] = None) -> PuntoElliptico:
         """
-        Multiplica un punto P por un escalar k usando el método de duplicación y suma
+        Multiplica un punto P por un escalar k
         Calcula k·P
+        
+        Usa la forma NAF de ancho w de k con los múltiplos impares de P
+        precalculados (P, 3P, ..., (2^(w-1) - 1)P), en coordenadas jacobianas
+        y con un solo inverso modular al final.
+        
+        Args:
+            k: Escalar (puede ser negativo)
+            P: Punto a multiplicar
+            ventana: Ancho w de la ventana (si no se indica, se elige según
+                     el tamaño de k)
         """
-        if k == 0:
-            return PuntoElliptico(None, None)
+        if ventana is not None and ventana < 2:
+            raise ValueError(f"El ancho de ventana debe ser al menos 2 (w={ventana})")
+        return self._a_afin(self._multiplicar_escalar_jacobiano(k, P, ventana))
+    
+    def _multiplicar_escalar_jacobiano(self, k: int, P: PuntoElliptico,
+                                       ventana: Optional[int] = None) -> Tuple[int, int, int]:
+        """k·P con wNAF; el resultado queda en coordenadas jacobianas"""
+        if k == 0 or P.es_infinito:
+            return self._INFINITO_JACOBIANO
+        
+        glv = self._parametros_glv()
+        if glv is not None and self.esta_en_curva(P):
+            # k·P = k₁·P + k₂·φ(P) con k₁, k₂ de la mitad de bits
+            k1, k2 = self._descomponer_glv(k)
+            w = ventana if ventana is not None else _ventana_wnaf(max(k1.bit_length(), k2.bit_length()))
+            multiplos = self._multiplos_impares_afines(P, w)
+            return self._strauss_jacobiano(0, [_wnaf(k1, w), _wnaf(k2, w)],
+                                           [multiplos, self._aplicar_endomorfismo(multiplos)])
+        
+        return self._wnaf_jacobiano(k, P, ventana)
+    
+    def _wnaf_jacobiano(self, k: int, P: PuntoElliptico, ventana: Optional[int] = None) -> Tuple[int, int, int]:
+        """k·P con wNAF genérico (sin endomorfismo), en coordenadas jacobianas"""
+        if k == 0 or P.es_infinito:
+            return self._INFINITO_JACOBIANO
+        
+        w = ventana if ventana is not None else _ventana_wnaf(k.bit_length())
+        return self._strauss_jacobiano(0, [_wnaf(k, w)], [self._multiplos_impares_afines(P, w)])
+    
+    # Ancho (en bits) de cada ventana de la tabla fija del generador
+    VENTANA_TABLA_G = 4
+    
+    def _construir_tabla_G(self) -> List[List[Optional[Tuple[int, int]]]]:
+        """
+        Construye la tabla de ventana fija para G:
+            tabla[i][j - 1] = j · 2^(w·i) · G   para j = 1 .. 2^w - 1
+        con los puntos en coordenadas afines (None representa a O).
+        """
+        w = self.VENTANA_TABLA_G
+        num_ventanas = max(1, -(-self.q.bit_length() // w))
+        base = (self.G.x % self.p, self.G.y % self.p, 1)
+        
+        jacobianos = []
+        for _ in range(num_ventanas):
+            multiplo = self._INFINITO_JACOBIANO
+            for _ in range((1 << w) - 1):
+                multiplo = self._sumar_jacobiano(multiplo, base)
+                jacobianos.append(multiplo)
+            # Siguiente base: 2^w · base = (2^w - 1)·base + base
+            base = self._sumar_jacobiano(multiplo, base)
+        
+        # Todas las filas se normalizan juntas con un solo inverso
+        afines = self._normalizar_lote(jacobianos)
+        por_fila = (1 << w) - 1
+        return [afines[i:i + por_fila] for i in range(0, len(afines), por_fila)]
+    
+    def multiplicar_generador(self, k: int) -> PuntoElliptico:
+        """
+        Calcula k·G usando la tabla precalculada del generador
         
-        if k < 0:
-            # Para k negativo, usar -k·P = k·(-P)
-            k = -k
-            P = PuntoElliptico(P.x, (-P.y) % self.p)
+        La tabla se construye una sola vez por curva; cada multiplicación
+        solo hace una suma mixta por ventana, sin duplicaciones.
+        """
+        return self._a_afin(self._multiplicar_generador_jacobiano(k))
+    
+    def _multiplicar_generador_jacobiano(self, k: int) -> Tuple[int, int, int]:
+        """k·G con la tabla fija; el resultado queda en coordenadas jacobianas"""
+        tabla = self._tabla_G
+        if tabla is None:
+            tabla = self._tabla_G = self._construir_tabla_G()
+        
+        w = self.VENTANA_TABLA_G
+        if k < 0 or k.bit_length() > w * len(tabla):
+            # Fuera del rango de la tabla: usar el método general
+            return self._multiplicar_escalar_jacobiano(k, self.G)
         
-        # Algoritmo de duplicación y suma (binary method)
-        resultado = PuntoElliptico(None, None)  # Iniciar con O
-        sumando = P
+        mascara = (1 << w) - 1
+        sumandos = []
+        for fila in tabla:
+            if k == 0:
+                break
+            digito = k & mascara
+            k >>= w
+            if digito and fila[digito - 1] is not None:
+                sumandos.append(fila[digito - 1])
         
-        while k > 0:
-            if k & 1:  # Si el bit es 1
-                resultado = self.sumar_puntos(resultado, sumando)
-            sumando = self.sumar_puntos(sumando, sumando)  # Duplicar
-            k >>= 1  # Shift derecha
+        X, Y, Z = self._INFINITO_JACOBIANO
+        return self._sumar_afines_jacobiano(X, Y, Z, sumandos)
+    
+    # Ancho de ventana wNAF para los múltiplos precalculados de G
+    VENTANA_WNAF_G = 7
+    
+    def _obtener_multiplos_G(self) -> List[Optional[Tuple[int, int]]]:
+        """Múltiplos impares 1·G, 3·G, 5·G, ... en coordenadas afines (precalculados)"""
+        multiplos = self._multiplos_G
+        if multiplos is None:
+            multiplos = self._multiplos_G = self._multiplos_impares_afines(self.G, self.VENTANA_WNAF_G)
+        return multiplos
+    
+    def _multiplos_impares_afines(self, P: PuntoElliptico, w: int) -> List[Optional[Tuple[int, int]]]:
+        """Múltiplos impares P, 3P, ..., (2^(w-1) - 1)·P en coordenadas afines (None = O)"""
+        return self._normalizar_lote(self._multiplos_impares_jacobianos(P, w))
+    
+    def _multiplos_impares_jacobianos(self, P: PuntoElliptico, w: int) -> List[Tuple[int, int, int]]:
+        """Múltiplos impares P, 3P, ..., (2^(w-1) - 1)·P en coordenadas jacobianas"""
+        if P.es_infinito:
+            return [self._INFINITO_JACOBIANO] * (1 << (w - 2))
+        
+        actual = (P.x % self.p, P.y % self.p, 1)
+        doble = self._duplicar_jacobiano(actual)
+        multiplos = [actual]
+        for _ in range((1 << (w - 2)) - 1):
+            actual = self._sumar_jacobiano(actual, doble)
+            multiplos.append(actual)
+        return multiplos
+    
+    def _multiplicar_doble_jacobiano(self, u1: int, u2: int, Q: PuntoElliptico) -> Tuple[int, int, int]:
+        """
+        Calcula u1·G + u2·Q (método de Strauss-Shamir con wNAF intercalado)
+        
+        Ambas multiplicaciones comparten las mismas duplicaciones; el resultado
+        queda en coordenadas jacobianas.
+        """
+        return self._multiplicar_multiple_jacobiano([u2], [Q], u1)
+    
+    # A partir de este número de puntos se usa Pippenger en lugar de Strauss
+    UMBRAL_PIPPENGER = 48
+    
+    def _multiplicar_multiple_jacobiano(self, escalares: List[int], puntos: List[PuntoElliptico],
+                                        escalar_G: int = 0) -> Tuple[int, int, int]:
+        """
+        Calcula escalar_G·G + Σ escalares[i]·puntos[i] en coordenadas jacobianas
+        
+        Con pocos puntos intercala los wNAF de todos los escalares (Strauss);
+        con muchos usa el método de cubetas de Pippenger.
+        """
+        if len(puntos) >= self.UMBRAL_PIPPENGER:
+            return self._pippenger_jacobiano(escalares + [escalar_G], puntos + [self.G])
+        
+        glv = self._parametros_glv()
+        if glv is not None and not all(self.esta_en_curva(P) for P in puntos):
+            glv = None
+        
+        digitos = []
+        tablas = []
+        for k, P in zip(escalares, puntos):
+            if k == 0 or P.es_infinito:
+                continue
+            if glv is not None:
+                # Cada escalar se parte en dos de la mitad de bits
+                mitades = self._descomponer_glv(k)
+                w = _ventana_wnaf(max(m.bit_length() for m in mitades))
+                digitos.extend(_wnaf(m, w) for m in mitades)
+                tablas.append(self._multiplos_impares_jacobianos(P, w))
+            else:
+                w = _ventana_wnaf(k.bit_length())
+                digitos.append(_wnaf(k, w))
+                tablas.append(self._multiplos_impares_jacobianos(P, w))
+        
+        # Los múltiplos de todos los puntos se normalizan juntos para poder
+        # usar sumas mixtas en el bucle principal
+        if tablas:
+            afines = self._normalizar_lote([punto for tabla in tablas for punto in tabla])
+            inicio = 0
+            for j, tabla in enumerate(tablas):
+                tablas[j] = afines[inicio:inicio + len(tabla)]
+                inicio += len(tabla)
+        
+        if glv is not None:
+            # Tablas de P y φ(P) intercaladas, en el mismo orden que los dígitos
+            tablas = [t for tabla in tablas for t in (tabla, self._aplicar_endomorfismo(tabla))]
+        
+        return self._strauss_jacobiano(escalar_G, digitos, tablas)
+    
+    def _strauss_jacobiano(self, escalar_G: int, digitos: List[List[int]],
+                           tablas: List[List[Optional[Tuple[int, int]]]]) -> Tuple[int, int, int]:
+        """
+        Bucle de Strauss: escalar_G·G + Σ (wNAF digitos[i])·P_i, donde tablas[i]
+        contiene los múltiplos impares afines de P_i
+        """
+        p = self.p
+        if escalar_G and self._parametros_glv() is not None:
+            # escalar_G·G = k₁·G + k₂·φ(G)
+            k1, k2 = self._descomponer_glv(escalar_G)
+            multiplos_G = self._obtener_multiplos_G()
+            if self._multiplos_G_endo is None:
+                self._multiplos_G_endo = self._aplicar_endomorfismo(multiplos_G)
+            digitos = digitos + [_wnaf(k1, self.VENTANA_WNAF_G), _wnaf(k2, self.VENTANA_WNAF_G)]
+            tablas = tablas + [multiplos_G, self._multiplos_G_endo]
+            escalar_G = 0
+        
+        if escalar_G:
+            digitos = digitos + [_wnaf(escalar_G, self.VENTANA_WNAF_G)]
+            tablas = tablas + [self._obtener_multiplos_G()]
+        
+        # Puntos afines (ya con su signo) que se suman en cada posición
+        longitud = max([0] + [len(d) for d in digitos])
+        sumandos = [None] * longitud
+        for digitos_P, tabla in zip(digitos, tablas):
+            for i, d in enumerate(digitos_P):
+                if d:
+                    punto = tabla[abs(d) >> 1]
+                    if punto is not None:
+                        if d < 0:
+                            punto = (punto[0], (-punto[1]) % p)
+                        if sumandos[i] is None:
+                            sumandos[i] = [punto]
+                        else:
+                            sumandos[i].append(punto)
+        
+        # Bucle principal sobre enteros sueltos: no se crea ningún objeto por paso
+        a = self.a % p
+        X, Y, Z = self._INFINITO_JACOBIANO
+        for i in range(longitud - 1, -1, -1):
+            # Duplicación (mismas fórmulas que _duplicar_jacobiano)
+            if Z:
+                if Y:
+                    YY = (Y * Y) % p
+                    S = (4 * X * YY) % p
+                    if a:
+                        ZZ = (Z * Z) % p
+                        M = (3 * X * X + a * ZZ * ZZ) % p
+                    else:
+                        M = (3 * X * X) % p
+                    Z = (2 * Y * Z) % p
+                    X = (M * M - 2 * S) % p
+                    Y = (M * (S - X) - 8 * YY * YY) % p
+                else:
+                    X, Y, Z = self._INFINITO_JACOBIANO
+            
+            if sumandos[i] is not None:
+                X, Y, Z = self._sumar_afines_jacobiano(X, Y, Z, sumandos[i])
+        
+        return (X, Y, Z)
+    
+    def _sumar_afines_jacobiano(self, X: int, Y: int, Z: int,
+                                puntos: List[Tuple[int, int]]) -> Tuple[int, int, int]:
+        """Suma a (X, Y, Z) una lista de puntos afines (mismas fórmulas que _sumar_jacobiano_mixto)"""
+        p = self.p
+        for x2, y2 in puntos:
+            if Z == 0:
+                X, Y, Z = x2, y2, 1
+                continue
+            Z1Z1 = (Z * Z) % p
+            H = (x2 * Z1Z1 - X) % p
+            R = (y2 * Z * Z1Z1 - Y) % p
+            if H == 0:
+                X, Y, Z = self._duplicar_jacobiano((X, Y, Z)) if R == 0 else self._INFINITO_JACOBIANO
+                continue
+            HH = (H * H) % p
+            HHH = (H * HH) % p
+            V = (X * HH) % p
+            X3 = (R * R - HHH - 2 * V) % p
+            Y = (R * (V - X3) - Y * HHH) % p
+            X = X3
+            Z = (Z * H) % p
+        return (X, Y, Z)
+    
+    def _pippenger_jacobiano(self, escalares: List[int], puntos: List[PuntoElliptico]) -> Tuple[int, int, int]:
+        """Multiplicación multiescalar por cubetas (Pippenger) en coordenadas jacobianas"""
+        p = self.p
+        pares = []
+        for k, P in zip(escalares, puntos):
+            if k == 0 or P.es_infinito:
+                continue
+            if k < 0:
+                pares.append((-k, P.x % p, (-P.y) % p))
+            else:
+                pares.append((k, P.x % p, P.y % p))
+        if not pares:
+            return self._INFINITO_JACOBIANO
+        
+        c = max(2, len(pares).bit_length() - 3)
+        mascara = (1 << c) - 1
+        bits = max(k.bit_length() for k, _, _ in pares)
+        
+        resultado = self._INFINITO_JACOBIANO
+        for ventana in range(-(-bits // c) - 1, -1, -1):
+            for _ in range(c):
+                resultado = self._duplicar_jacobiano(resultado)
+            
+            # Repartir los puntos en cubetas según el dígito de esta ventana
+            desplazamiento = ventana * c
+            cubetas = [self._INFINITO_JACOBIANO] * (mascara + 1)
+            for k, x, y in pares:
+                d = (k >> desplazamiento) & mascara
+                if d:
+                    cubetas[d] = self._sumar_jacobiano_mixto(cubetas[d], x, y)
+            
+            # Σ d·cubetas[d] con sumas acumuladas desde la cubeta más alta
+            acumulado = self._INFINITO_JACOBIANO
+            suma = self._INFINITO_JACOBIANO
+            for d in range(mascara, 0, -1):
+                acumulado = self._sumar_jacobiano(acumulado, cubetas[d])
+                suma = self._sumar_jacobiano(suma, acumulado)
+            resultado = self._sumar_jacobiano(resultado, suma)
         
         return resultado
+    
+    def multiplicar_multiple(self, escalares: List[int], puntos: List[PuntoElliptico]) -> PuntoElliptico:
+        """
+        Calcula Σ escalares[i]·puntos[i] con una sola cadena de duplicaciones
+        Equivale a sumar los resultados de multiplicar_escalar para cada par.
+        """
+        return self._a_afin(self._multiplicar_multiple_jacobiano(list(escalares), list(puntos)))
+    
+    def _tiene_cofactor_uno(self) -> bool:
+        """
+        Indica (y recuerda) si el grupo de la curva tiene orden primo q
+        
+        Si q es primo, q·G = O y q > (p + 1 + 2√p) / 2, la cota de Hasse
+        implica que #E = q: todo punto de la curva distinto de O tiene orden q.
+        """
+        if self._cofactor_uno is None:
+            q, p = self.q, self.p
+            margen = 2 * q - p - 1
+            self._cofactor_uno = (margen > 0 and margen * margen > 4 * p and
+                                  _es_primo_probable(q) and
+                                  self._wnaf_jacobiano(q, self.G)[2] == 0)
+        return self._cofactor_uno
+    
+    # ------------------------------------------------------------------
+    # Endomorfismo GLV para curvas y² = x³ + b con p ≡ 1 (mod 3)
+    #
+    # φ(x, y) = (β·x, y) con β³ ≡ 1 (mod p) actúa sobre el subgrupo de orden q
+    # como la multiplicación por λ (λ² + λ + 1 ≡ 0 mod q). Así k·P se escribe
+    # como k₁·P + k₂·φ(P) con k₁, k₂ de unos √q, y se calculan a la vez.
+    # ------------------------------------------------------------------
+    
+    def _parametros_glv(self) -> Optional[tuple]:
+        """(β, λ, a1, b1, a2, b2) si la curva admite GLV, o None (se calcula una vez)"""
+        if self._glv is None:
+            self._glv = self._calcular_glv() or False
+        return self._glv or None
+    
+    def _calcular_glv(self) -> Optional[tuple]:
+        """Busca (o comprueba) β y λ y calcula la base reducida del retículo"""
+        p, q = self.p, self.q
+        if self.a % p != 0 or p % 3 != 1 or q % 3 != 1 or not self._tiene_cofactor_uno():
+            if self._endomorfismo is not None:
+                raise ValueError("La curva no admite el endomorfismo GLV (se requiere a = 0, "
+                                 "p ≡ 1 (mod 3) y grupo de orden primo q)")
+            return None
+        
+        if self._endomorfismo is not None:
+            candidatos = [self._endomorfismo]
+        else:
+            # Raíces cúbicas de la unidad módulo p y módulo q
+            g, beta = 2, 1
+            while beta == 1:
+                beta = pow(g, (p - 1) // 3, p)
+                g += 1
+            raiz = _raiz_cuadrada(-3, q)
+            if raiz is None:
+                return None
+            mitad = _inverso(2, q)
+            lambdas = [((raiz - 1) * mitad) % q, ((-raiz - 1) * mitad) % q]
+            candidatos = [(b, l) for b in (beta, (beta * beta) % p) for l in lambdas]
+        
+        Gx, Gy = self.G.x % p, self.G.y % p
+        for beta, lam in candidatos:
+            X, Y, Z = self._wnaf_jacobiano(lam, self.G)
+            ZZ = (Z * Z) % p
+            if Z and X == (beta * Gx * ZZ) % p and Y == (Gy * ZZ * Z) % p:
+                break
+        else:
+            if self._endomorfismo is not None:
+                raise ValueError("El endomorfismo indicado no cumple λ·G = (β·Gx, Gy)")
+            return None
+        
+        # Base corta del retículo {(x, y) : x + y·λ ≡ 0 (mod q)} por Euclides extendido
+        r0, r1 = q, lam
+        t0, t1 = 0, 1
+        while r1 * r1 >= q:
+            cociente = r0 // r1
+            r0, r1 = r1, r0 - cociente * r1
+            t0, t1 = t1, t0 - cociente * t1
+        a1, b1 = r1, -t1
+        cociente = r0 // r1
+        r2, t2 = r0 - cociente * r1, t0 - cociente * t1
+        if r0 * r0 + t0 * t0 <= r2 * r2 + t2 * t2:
+            a2, b2 = r0, -t0
+        else:
+            a2, b2 = r2, -t2
+        return (beta, lam, a1, b1, a2, b2)
+    
+    def _descomponer_glv(self, k: int) -> Tuple[int, int]:
+        """Escribe k ≡ k₁ + k₂·λ (mod q) con |k₁|, |k₂| del orden de √q"""
+        _, _, a1, b1, a2, b2 = self._glv
+        q = self.q
+        k %= q
+        c1 = _redondear_division(b2 * k, q)
+        c2 = _redondear_division(-b1 * k, q)
+        return k - c1 * a1 - c2 * a2, -c1 * b1 - c2 * b2
+    
+    def _aplicar_endomorfismo(self, puntos: List[Optional[Tuple[int, int]]]) -> List[Optional[Tuple[int, int]]]:
+        """φ(x, y) = (β·x, y) para cada punto afín de la lista"""
+        beta, p = self._glv[0], self.p
+        return [None if P is None else ((beta * P[0]) % p, P[1]) for P in puntos]
+    
+    def multiplicar_doble(self, u1: int, u2: int, Q: PuntoElliptico) -> PuntoElliptico:
+        """
+        Calcula u1·G + u2·Q compartiendo las duplicaciones de ambos productos
+        Equivale a sumar_puntos(multiplicar_escalar(u1, G), multiplicar_escalar(u2, Q))
+        """
+        return self._a_afin(self._multiplicar_doble_jacobiano(u1, u2, Q))
+    
+    def _x_congruente_jacobiano(self, P: Tuple[int, int, int], r: int) -> bool:
+        """
+        Comprueba x(P) ≡ r (mod q)
+        
+        Como x = X/Z² con 0 ≤ x < p, si p < 2q basta probar X ≡ c·Z² (mod p)
+        para c = r y c = r + q, sin ningún inverso. Si q es mucho menor que p
+        (curvas propias) habría demasiados candidatos y se pasa a afín.
+        """
+        X, _, Z = P
+        if Z == 0:
+            return False
+        
+        p, q = self.p, self.q
+        if p >= 2 * q:
+            return self._a_afin(P).x % q == r
+        
+        ZZ = (Z * Z) % p
+        c = r
+        while c < p:
+            if (c * ZZ) % p == X:
+                return True
+            c += q
+        return False
+
+
+class LlaveVerificacion:
+    """
+    Llave pública lista para verificar: guarda el punto Q, su curva y la
+    tabla de múltiplos impares de Q (en coordenadas afines) que usa u₂·Q.
+    
+    Se puede pasar a ECDSA.verificar en lugar del PuntoElliptico.
+    """
+    
+    # Con la tabla amortizada conviene una ventana más ancha que la automática
+    VENTANA_POR_DEFECTO = 8
+    
+    def __init__(self, llave_publica: PuntoElliptico, curva: CurvaEliptica,
+                 ventana: int = VENTANA_POR_DEFECTO):
+        if ventana < 2:
+            raise ValueError(f"El ancho de ventana debe ser al menos 2 (w={ventana})")
+        self.punto = llave_publica
+        self.curva = curva
+        self.ventana = ventana
+        self.valida = curva.es_llave_publica_valida(llave_publica)
+        self._multiplos = curva._multiplos_impares_afines(llave_publica, ventana)
+        
+        # Con endomorfismo GLV también se guarda la tabla de φ(Q)
+        self._multiplos_endo = None
+        if curva._parametros_glv() is not None and self.valida:
+            self._multiplos_endo = curva._aplicar_endomorfismo(self._multiplos)
+    
+    def _multiplicar_doble_jacobiano(self, u1: int, u2: int) -> Tuple[int, int, int]:
+        """u1·G + u2·Q con la tabla precalculada de Q"""
+        if u2 == 0 or self.punto.es_infinito:
+            return self.curva._strauss_jacobiano(u1, [], [])
+        if self._multiplos_endo is not None:
+            k1, k2 = self.curva._descomponer_glv(u2)
+            return self.curva._strauss_jacobiano(u1, [_wnaf(k1, self.ventana), _wnaf(k2, self.ventana)],
+                                                 [self._multiplos, self._multiplos_endo])
+        return self.curva._strauss_jacobiano(u1, [_wnaf(u2, self.ventana)], [self._multiplos])
+    
+    def tamano_bytes(self) -> int:
+        """Memoria aproximada que ocupa la tabla precalculada"""
+        total = sys.getsizeof(self._multiplos)
+        tablas = self._multiplos + (self._multiplos_endo or [])
+        for punto in tablas:
+            if punto is not None:
+                total += sys.getsizeof(punto) + sys.getsizeof(punto[0]) + sys.getsizeof(punto[1])
+        return total
+    
+    def __repr__(self):
+        return f"LlaveVerificacion({self.punto}, ventana={self.ventana})"
+
+
+def _como_punto(llave_publica) -> PuntoElliptico:
+    """Devuelve el PuntoElliptico de una llave pública (punto o LlaveVerificacion)"""
+    if isinstance(llave_publica, LlaveVerificacion):
+        return llave_publica.punto
+    return llave_publica
+
+
+class CacheLlavesVerificacion:
+    """
+    Caché LRU de LlaveVerificacion acotada por número de llaves y por memoria
+    
+    Las llaves más usadas conservan su tabla precalculada; cuando se supera
+    alguno de los límites se descartan las menos usadas recientemente.
+    """
+    
+    def __init__(self, max_llaves: int = 4096, max_bytes: int = 64 * 1024 * 1024,
+                 ventana: int = LlaveVerificacion.VENTANA_POR_DEFECTO):
+        """
+        Args:
+            max_llaves: Número máximo de llaves guardadas
+            max_bytes: Memoria máxima aproximada de todas las tablas
+            ventana: Ancho de ventana de las tablas que se construyen
+        """
+        self.max_llaves = max_llaves
+        self.max_bytes = max_bytes
+        self.ventana = ventana
+        self.bytes_usados = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._llaves = OrderedDict()
+        self._candado = threading.Lock()
+    
+    def obtener(self, llave_publica: PuntoElliptico, curva: CurvaEliptica) -> LlaveVerificacion:
+        """Devuelve la LlaveVerificacion de la llave pública, construyéndola si no está"""
+        clave = (curva, llave_publica.x, llave_publica.y)
+        with self._candado:
+            llave = self._llaves.get(clave)
+            if llave is not None:
+                self._llaves.move_to_end(clave)
+                self.aciertos += 1
+                return llave
+            self.fallos += 1
+        
+        # La tabla se construye fuera del candado
+        llave = LlaveVerificacion(llave_publica, curva, self.ventana)
+        tamano = llave.tamano_bytes()
+        with self._candado:
+            anterior = self._llaves.pop(clave, None)
+            if anterior is not None:
+                self.bytes_usados -= anterior.tamano_bytes()
+            self._llaves[clave] = llave
+            self.bytes_usados += tamano
+            while self._llaves and (len(self._llaves) > self.max_llaves or
+                                    self.bytes_usados > self.max_bytes):
+                _, descartada = self._llaves.popitem(last=False)
+                self.bytes_usados -= descartada.tamano_bytes()
+        return llave
+    
+    def limpiar(self):
+        """Vacía la caché"""
+        with self._candado:
+            self._llaves.clear()
+            self.bytes_usados = 0
+    
+    def __len__(self):
+        return len(self._llaves)
+    
+    def __contains__(self, clave: Tuple[CurvaEliptica, PuntoElliptico]) -> bool:
+        curva, llave_publica = clave
+        return (curva, llave_publica.x, llave_publica.y) in self._llaves
+
+
+class PoolNonces:
+    """
+    Reserva de nonces (k, r, k⁻¹) precalculados en un hilo de fondo
+    
+    R = k·G, r y k⁻¹ no dependen del mensaje ni de la llave, así que se
+    preparan por lotes mientras la aplicación está ociosa. Cada tupla se
+    entrega una sola vez; si la reserva se vacía, tomar() calcula una en el
+    momento en vez de esperar.
+    """
+    
+    def __init__(self, curva: CurvaEliptica, profundidad: int = 1024,
+                 marca_recarga: Optional[int] = None, tam_lote: int = 64):
+        """
+        Args:
+            curva: Curva cuyos nonces se precalculan
+            profundidad: Número máximo de tuplas guardadas
+            marca_recarga: Cuando quedan esta cantidad o menos, el hilo vuelve
+                           a llenar la reserva (por defecto profundidad // 4)
+            tam_lote: Tuplas que se calculan juntas (un solo inverso por lote)
+        """
+        if profundidad < 1:
+            raise ValueError("La profundidad debe ser al menos 1")
+        if marca_recarga is None:
+            marca_recarga = profundidad // 4
+        if not 0 <= marca_recarga < profundidad:
+            raise ValueError("marca_recarga debe estar en [0, profundidad)")
+        
+        self.curva = curva
+        self.profundidad = profundidad
+        self.marca_recarga = marca_recarga
+        self.tam_lote = max(1, tam_lote)
+        self.agotamientos = 0  # veces que tomar() encontró la reserva vacía
+        
+        self._nonces = deque()
+        self._condicion = threading.Condition()
+        self._cerrado = False
+        self._hilo = threading.Thread(target=self._rellenar, name="PoolNonces", daemon=True)
+        self._hilo.start()
+    
+    def _calcular_lote(self, n: int) -> List[Tuple[int, int, int]]:
+        """Calcula n tuplas (k, r, k⁻¹) con inversos por lote"""
+        curva = self.curva
+        q = curva.q
+        nonces = []
+        while len(nonces) < n:
+            k = secrets.randbelow(q - 1) + 1
+            if math.gcd(k, q) == 1:
+                nonces.append(k)
+        
+        puntos_R = curva._normalizar_lote([curva._multiplicar_generador_jacobiano(k) for k in nonces])
+        inversos_k = curva.invertir_lote(nonces, q)
+        return [(k, R[0] % q, k_inv)
+                for k, R, k_inv in zip(nonces, puntos_R, inversos_k)
+                if R is not None and R[0] % q != 0]
+    
+    def _rellenar(self):
+        """Hilo de fondo: rellena la reserva cada vez que baja de la marca"""
+        while True:
+            with self._condicion:
+                while not self._cerrado and len(self._nonces) > self.marca_recarga:
+                    self._condicion.wait()
+                if self._cerrado:
+                    return
+                faltan = self.profundidad - len(self._nonces)
+            
+            # Rellenar hasta la profundidad completa; el cálculo se hace fuera
+            # del candado para no bloquear tomar()
+            while faltan > 0:
+                lote = self._calcular_lote(min(faltan, self.tam_lote))
+                with self._condicion:
+                    if self._cerrado:
+                        return
+                    self._nonces.extend(lote[:self.profundidad - len(self._nonces)])
+                    faltan = self.profundidad - len(self._nonces)
+    
+    def tomar(self) -> Tuple[int, int, int]:
+        """Saca una tupla (k, r, k⁻¹) de la reserva; nunca se entrega dos veces"""
+        with self._condicion:
+            if self._cerrado:
+                raise RuntimeError("El PoolNonces está cerrado")
+            if self._nonces:
+                tupla = self._nonces.popleft()
+                if len(self._nonces) <= self.marca_recarga:
+                    self._condicion.notify()
+                return tupla
+            self.agotamientos += 1
+            self._condicion.notify()
+        
+        lote = []
+        while not lote:
+            lote = self._calcular_lote(1)
+        return lote[0]
+    
+    def cerrar(self):
+        """Detiene el hilo de fondo y descarta los nonces no usados"""
+        with self._condicion:
+            self._cerrado = True
+            self._nonces.clear()
+            self._condicion.notify_all()
+        self._hilo.join()
+    
+    def __len__(self):
+        return len(self._nonces)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.cerrar()
 
 
 class ECDSA:
@@ -152,8 +1179,142 @@ class ECDSA:
     Implementación del algoritmo de firma digital ECDSA
     """
     
-    def __init__(self, curva: CurvaEliptica):
+    # Tamaño de q (bits) a partir del cual el hash se trunca en vez de reducirse módulo q
+    BITS_MINIMOS_TRUNCADO = 128
+    
+    def __init__(self, curva: CurvaEliptica, cache_llaves: Optional['CacheLlavesVerificacion'] = None,
+                 algoritmo_hash=None, nonces_deterministas: bool = False,
+                 pool_nonces: Optional[PoolNonces] = None):
+        """
+        Args:
+            curva: Curva elíptica sobre la que se firma y verifica
+            cache_llaves: Caché opcional de LlaveVerificacion; si se indica,
+                          verificar() reutiliza la precomputación de las
+                          llaves públicas más usadas
+            algoritmo_hash: Nombre de hashlib ('sha256', 'sha512', 'sha3_256',
+                            'blake2b', ...) o constructor con la misma interfaz
+                            (por ejemplo hashlib.blake2b). Por defecto el de la
+                            curva estándar, o HASH_POR_DEFECTO.
+            nonces_deterministas: Si es True, los nonces k se derivan de la
+                                  llave privada y del hash (RFC 6979) en vez
+                                  de sacarse de secrets
+            pool_nonces: PoolNonces de la misma curva del que firmar() toma
+                         (k, r, k⁻¹) ya calculados; así solo queda hashear
+                         y hacer un par de multiplicaciones módulo q
+        
+        Si q tiene al menos BITS_MINIMOS_TRUNCADO bits, el hash se trunca a
+        sus bits más a la izquierda (tantos como bits tiene q), como indica
+        FIPS 186-4; en las curvas de juguete se conserva la reducción módulo
+        q, con la que están calculados los ejemplos didácticos. Solo cuentan
+        los parámetros de la curva, no su nombre.
+        """
         self.curva = curva
+        self.cache_llaves = cache_llaves
+        
+        if algoritmo_hash is None:
+            algoritmo_hash = _HASH_POR_CURVA.get(_nombre_estandar(curva), HASH_POR_DEFECTO)
+        if isinstance(algoritmo_hash, str):
+            nombre = algoritmo_hash.lower()
+            # Los constructores con nombre (hashlib.sha256, ...) son más rápidos que hashlib.new
+            constructor = getattr(hashlib, nombre, None)
+            if constructor is None or nombre not in hashlib.algorithms_available:
+                constructor = functools.partial(hashlib.new, nombre)
+            # HMAC por nombre usa la implementación nativa de hashlib
+            self._digestmod = nombre
+        elif callable(algoritmo_hash):
+            constructor = algoritmo_hash
+            self._digestmod = constructor
+        else:
+            raise TypeError("algoritmo_hash debe ser un nombre de hashlib o un constructor")
+        
+        muestra = constructor()  # ValueError si el nombre no existe
+        if not getattr(muestra, 'digest_size', 0):
+            raise ValueError(f"La función hash {muestra.name} no tiene tamaño de digest fijo")
+        self._constructor_hash = constructor
+        self.nombre_hash = muestra.name
+        self.truncar_hash = curva.q.bit_length() >= self.BITS_MINIMOS_TRUNCADO
+        
+        if pool_nonces is not None:
+            if nonces_deterministas:
+                raise ValueError("pool_nonces no se puede combinar con nonces_deterministas")
+            if pool_nonces.curva is not curva:
+                raise ValueError("El PoolNonces es de otra curva")
+        self.pool_nonces = pool_nonces
+        self.nonces_deterministas = nonces_deterministas
+        self._estados_rfc6979 = OrderedDict()
+        self._candado_rfc6979 = threading.Lock()
+    
+    # Número de llaves privadas cuyo estado HMAC inicial (RFC 6979) se conserva
+    MAX_ESTADOS_RFC6979 = 256
+    
+    def _estado_rfc6979(self, x: bytes) -> 'hmac.HMAC':
+        """
+        HMAC con la llave inicial K = 0x00… que ya ha absorbido V || 0x00 || x
+        
+        Solo depende de la llave privada, así que se guarda (LRU) y cada firma
+        parte de una copia.
+        """
+        with self._candado_rfc6979:
+            estado = self._estados_rfc6979.get(x)
+            if estado is not None:
+                self._estados_rfc6979.move_to_end(x)
+                return estado
+        
+        tam = self._constructor_hash().digest_size
+        estado = hmac.new(b'\x00' * tam, b'\x01' * tam + b'\x00' + x, self._digestmod)
+        with self._candado_rfc6979:
+            self._estados_rfc6979[x] = estado
+            while len(self._estados_rfc6979) > self.MAX_ESTADOS_RFC6979:
+                self._estados_rfc6979.popitem(last=False)
+        return estado
+    
+    def _nonces_rfc6979(self, z: int, llave_privada: int) -> Iterable[int]:
+        """
+        Candidatos a nonce k de RFC 6979 (sección 3.2) para el hash z
+        
+        Genera la secuencia de k en [1, q-1]; si un k no sirve para firmar, el
+        siguiente es el que indica el RFC (paso h.3).
+        """
+        q = self.curva.q
+        bits_q = q.bit_length()
+        bytes_q = (bits_q + 7) // 8
+        digestmod = self._digestmod
+        
+        # int2octets(x) y bits2octets(h1); z ya es bits2int(h1) mod q
+        x = (llave_privada % q).to_bytes(bytes_q, 'big')
+        h1 = (z % q).to_bytes(bytes_q, 'big')
+        
+        mac = self._estado_rfc6979(x).copy()
+        mac.update(h1)
+        K = mac.digest()
+        V = hmac.new(K, b'\x01' * len(K), digestmod).digest()
+        K = hmac.new(K, V + b'\x01' + x + h1, digestmod).digest()
+        V = hmac.new(K, V, digestmod).digest()
+        
+        while True:
+            T = b''
+            while len(T) * 8 < bits_q:
+                V = hmac.new(K, V, digestmod).digest()
+                T += V
+            k = int.from_bytes(T, 'big') >> (len(T) * 8 - bits_q)
+            if 1 <= k < q:
+                yield k
+            K = hmac.new(K, V + b'\x00', digestmod).digest()
+            V = hmac.new(K, V, digestmod).digest()
+    
+    def _llave_valida(self, llave_publica: Union[PuntoElliptico, LlaveVerificacion]) -> bool:
+        """es_llave_publica_valida() de la llave (ya calculada si es LlaveVerificacion)"""
+        if isinstance(llave_publica, LlaveVerificacion) and llave_publica.curva is self.curva:
+            return llave_publica.valida
+        return self.curva.es_llave_publica_valida(_como_punto(llave_publica))
+    
+    def _calcular_X(self, u1: int, u2: int, llave_publica) -> Tuple[int, int, int]:
+        """u₁·G + u₂·Q en coordenadas jacobianas, usando la tabla de la llave si la hay"""
+        if isinstance(llave_publica, PuntoElliptico) and self.cache_llaves is not None:
+            llave_publica = self.cache_llaves.obtener(llave_publica, self.curva)
+        if isinstance(llave_publica, LlaveVerificacion) and llave_publica.curva is self.curva:
+            return llave_publica._multiplicar_doble_jacobiano(u1, u2)
+        return self.curva._multiplicar_doble_jacobiano(u1, u2, _como_punto(llave_publica))
     
     def generar_llaves(self) -> Tuple[int, PuntoElliptico]:
         """
@@ -168,50 +1329,157 @@ class ECDSA:
         d = secrets.randbelow(self.curva.q - 1) + 1
         
         # Calcular llave pública Q = d·G
-        Q = self.curva.multiplicar_escalar(d, self.curva.G)
+        Q = self.curva.multiplicar_generador(d)
         
         return d, Q
     
-    def hash_mensaje(self, mensaje: str) -> int:
+    def generar_llaves_lote(self, n: int) -> List[Tuple[int, PuntoElliptico]]:
+        """
+        Genera n pares de llaves (privada, pública)
+        
+        Las n llaves públicas se pasan a coordenadas afines juntas, con un
+        solo inverso modular.
+        """
+        privadas = [secrets.randbelow(self.curva.q - 1) + 1 for _ in range(n)]
+        publicas = self.curva._normalizar_lote(
+            [self.curva._multiplicar_generador_jacobiano(d) for d in privadas])
+        return [(d, PuntoElliptico(*Q) if Q is not None else PuntoElliptico(None, None))
+                for d, Q in zip(privadas, publicas)]
+    
+    def hash_mensaje(self, mensaje: Mensaje) -> int:
         """
-        Calcula el hash del mensaje y lo convierte a entero módulo q
+        Calcula el hash del mensaje con la función configurada y lo convierte
+        a entero módulo q
+        
+        Los str se codifican en UTF-8; bytes, bytearray, memoryview y cualquier
+        otro objeto con protocolo de buffer se pasan a hashlib sin copiarlos.
         """
-        # Usar SHA-256 para el hash
-        hash_bytes = hashlib.sha256(mensaje.encode('utf-8')).digest()
-        hash_int = int.from_bytes(hash_bytes, byteorder='big')
+        if isinstance(mensaje, str):
+            mensaje = mensaje.encode('utf-8')
         
-        # Reducir módulo q
-        return hash_int % self.curva.q
+        return self._digest_a_entero(self._constructor_hash(mensaje).digest())
     
-    def firmar(self, mensaje: str, llave_privada: int, k: Optional[int] = None) -> Tuple[int, int]:
+    def _digest_a_entero(self, digest: Union[bytes, bytearray, memoryview]) -> int:
+        """
+        Convierte un digest a entero módulo q; lo usan todas las operaciones,
+        tanto las que hashean el mensaje como las que reciben el digest
+        
+        Con truncar_hash se toman sus bits más a la izquierda (tantos como bits
+        tiene q), como indica FIPS 186-4 / SEC1; si no, se reduce módulo q.
+        """
+        if len(digest) == 0:
+            raise ValueError("El digest está vacío")
+        e = int.from_bytes(digest, byteorder='big')
+        if self.truncar_hash:
+            exceso = 8 * len(digest) - self.curva.q.bit_length()
+            if exceso > 0:
+                e >>= exceso
+        return e % self.curva.q
+    
+    # Tamaño de bloque (bytes) con el que se leen los archivos al calcular su hash
+    TAM_BLOQUE_ARCHIVO = 1 << 20
+    
+    def hash_archivo(self, nombre_archivo: str) -> int:
+        """
+        Calcula el hash de un archivo y lo convierte a entero módulo q
+        
+        El archivo se lee por bloques de TAM_BLOQUE_ARCHIVO bytes sobre un único
+        buffer reutilizado, así que la memoria usada no depende de su tamaño.
+        El resultado es el mismo que hash_mensaje() sobre su contenido.
+        """
+        h = self._constructor_hash()
+        buffer = bytearray(self.TAM_BLOQUE_ARCHIVO)
+        vista = memoryview(buffer)
+        with open(nombre_archivo, 'rb', buffering=0) as f:
+            while True:
+                leidos = f.readinto(buffer)
+                if not leidos:
+                    break
+                h.update(vista[:leidos])
+        return self._digest_a_entero(h.digest())
+    
+    def firmar(self, mensaje: Mensaje, llave_privada: int, k: Optional[int] = None) -> Tuple[int, int]:
         """
         Firma un mensaje usando ECDSA
         
         Args:
-            mensaje: Mensaje a firmar
+            mensaje: Mensaje a firmar (str o bytes, bytearray, memoryview)
             llave_privada: Llave privada d
             k: Nonce aleatorio (opcional, si no se proporciona se genera uno)
         
         Returns:
             (r, s): Firma digital
         """
-        # Calcular hash del mensaje
-        z = self.hash_mensaje(mensaje)
+        return self._firmar_hash(self.hash_mensaje(mensaje), llave_privada, k)
+    
+    def firmar_digest(self, digest: Union[bytes, bytearray, memoryview], llave_privada: int,
+                      k: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Firma un digest ya calculado por el llamador (sin volver a hashear)
+        
+        Args:
+            digest: Salida de la función hash (por ejemplo 32 bytes de SHA-256);
+                se convierte a entero igual que en hash_mensaje()
+            llave_privada: Llave privada d
+            k: Nonce aleatorio (opcional, si no se proporciona se genera uno)
+        
+        Returns:
+            (r, s): Firma digital
+        """
+        return self._firmar_hash(self._digest_a_entero(digest), llave_privada, k)
+    
+    def firmar_archivo(self, nombre_archivo: str, llave_privada: int) -> Tuple[int, int]:
+        """
+        Firma el contenido de un archivo (firma separada) sin cargarlo en memoria
+        
+        Returns:
+            (r, s): Firma digital, igual a firmar() sobre el contenido del archivo
+        """
+        return self._firmar_hash(self.hash_archivo(nombre_archivo), llave_privada)
+    
+    def firmar_recuperable(self, mensaje: Mensaje, llave_privada: int,
+                           k: Optional[int] = None) -> Tuple[int, int, int]:
+        """
+        Firma un mensaje añadiendo el identificador de recuperación
+        
+        Con (r, s, v) recuperar_llave_publica() obtiene la llave del firmante
+        sin conocerla de antemano. No usa pool_nonces: la reserva guarda r
+        pero no la paridad de y de R.
+        
+        Returns:
+            (r, s, v): Firma y v = paridad de y_R + 2 si x_R ≥ q
+        """
+        return self._firmar_hash(self.hash_mensaje(mensaje), llave_privada, k, recuperable=True)
+    
+    def _firmar_hash(self, z: int, llave_privada: int, k: Optional[int] = None,
+                     recuperable: bool = False) -> tuple:
+        """Firma un hash z ya reducido módulo q; con recuperable devuelve también v"""
+        if k is None and self.pool_nonces is not None and not recuperable:
+            q = self.curva.q
+            for _ in range(100):
+                _, r, k_inv = self.pool_nonces.tomar()
+                s = (k_inv * (z + r * llave_privada)) % q
+                if s != 0 and math.gcd(s, q) == 1:
+                    return r, s
+            raise RuntimeError("No se pudo generar firma después de 100 intentos")
         
         max_intentos = 100
         intentos = 0
+        nonces = self._nonces_rfc6979(z, llave_privada) if k is None and self.nonces_deterministas else None
         
         while intentos < max_intentos:
             intentos += 1
             
-            # Generar nonce aleatorio k si no se proporciona
-            if k is None:
-                k_actual = secrets.randbelow(self.curva.q - 1) + 1
-            else:
+            # Generar nonce k (aleatorio o RFC 6979) si no se proporciona
+            if k is not None:
                 k_actual = k
+            elif nonces is not None:
+                k_actual = next(nonces)
+            else:
+                k_actual = secrets.randbelow(self.curva.q - 1) + 1
             
             # Calcular punto R = k·G
-            R = self.curva.multiplicar_escalar(k_actual, self.curva.G)
+            R = self.curva.multiplicar_generador(k_actual)
             
             # r = x_R mod q
             r = R.x % self.curva.q
@@ -244,55 +1512,300 @@ class ECDSA:
                     raise ValueError(f"k inválido: s={s} no tiene inverso módulo q={self.curva.q}")
                 continue
             
+            if recuperable:
+                return r, s, (R.y & 1) | (2 if R.x >= self.curva.q else 0)
             return r, s
         
         raise RuntimeError(f"No se pudo generar firma después de {max_intentos} intentos")
     
-    def verificar(self, mensaje: str, firma: Tuple[int, int], llave_publica: PuntoElliptico) -> bool:
+    def firmar_lote(self, mensajes: Iterable[Mensaje], llave_privada: int) -> List[Tuple[int, int]]:
+        """
+        Firma varios mensajes con la misma llave privada
+        
+        Los inversos de las coordenadas Z de los puntos R = k·G y los inversos
+        de los nonces k se calculan cada uno con un solo inverso modular para
+        todo el lote. Las firmas que salgan degeneradas (r = 0, s = 0, ...) se
+        repiten con firmar().
+        
+        Returns:
+            Lista de firmas (r, s), en el mismo orden que los mensajes
+        """
+        curva = self.curva
+        hashes = [self.hash_mensaje(mensaje) for mensaje in mensajes]
+        
+        # Nonces invertibles módulo q (con q primo, cualquier k en [1, q-1])
+        nonces = []
+        for z in hashes:
+            if self.nonces_deterministas:
+                nonces_z = self._nonces_rfc6979(z, llave_privada)
+                k = next(nonces_z)
+                while math.gcd(k, curva.q) != 1:
+                    k = next(nonces_z)
+            else:
+                k = secrets.randbelow(curva.q - 1) + 1
+                while math.gcd(k, curva.q) != 1:
+                    k = secrets.randbelow(curva.q - 1) + 1
+            nonces.append(k)
+        
+        puntos_R = curva._normalizar_lote([curva._multiplicar_generador_jacobiano(k) for k in nonces])
+        inversos_k = curva.invertir_lote(nonces, curva.q)
+        
+        firmas = []
+        for z, R, k_inv in zip(hashes, puntos_R, inversos_k):
+            r = R[0] % curva.q if R is not None else 0
+            s = (k_inv * (z + r * llave_privada)) % curva.q
+            if r == 0 or s == 0 or math.gcd(s, curva.q) != 1:
+                firmas.append(self._firmar_hash(z, llave_privada))
+            else:
+                firmas.append((r, s))
+        return firmas
+    
+    def verificar(self, mensaje: Mensaje, firma: Tuple[int, int],
+                  llave_publica: Union[PuntoElliptico, LlaveVerificacion]) -> bool:
         """
         Verifica una firma ECDSA
         
         Args:
             mensaje: Mensaje original
             firma: Tupla (r, s)
-            llave_publica: Llave pública Q
+            llave_publica: Llave pública Q (PuntoElliptico o LlaveVerificacion)
+        
+        Returns:
+            True si la firma es válida, False en caso contrario (también si la
+            llave no pasa es_llave_publica_valida())
+        """
+        r, s = firma
+        
+        # Paso 0: Verificar rango de r y s
+        if not (1 <= r <= self.curva.q - 1) or not (1 <= s <= self.curva.q - 1):
+            return False
+        
+        # Calcular hash del mensaje
+        return self._verificar_hash(self.hash_mensaje(mensaje), firma, llave_publica)
+    
+    def verificar_digest(self, digest: Union[bytes, bytearray, memoryview], firma: Tuple[int, int],
+                         llave_publica: Union[PuntoElliptico, LlaveVerificacion]) -> bool:
+        """
+        Verifica una firma sobre un digest ya calculado (sin volver a hashear)
+        
+        Args:
+            digest: Salida de la función hash, convertida igual que en firmar_digest()
+            firma: Tupla (r, s)
+            llave_publica: Llave pública Q (PuntoElliptico o LlaveVerificacion)
+        
+        Returns:
+            True si la firma es válida, False en caso contrario
+        """
+        r, s = firma
+        if not (1 <= r <= self.curva.q - 1) or not (1 <= s <= self.curva.q - 1):
+            return False
+        return self._verificar_hash(self._digest_a_entero(digest), firma, llave_publica)
+    
+    def verificar_archivo(self, nombre_archivo: str, firma: Tuple[int, int],
+                          llave_publica: Union[PuntoElliptico, LlaveVerificacion]) -> bool:
+        """
+        Verifica una firma separada del contenido de un archivo
         
         Returns:
             True si la firma es válida, False en caso contrario
         """
         r, s = firma
+        if not (1 <= r <= self.curva.q - 1) or not (1 <= s <= self.curva.q - 1):
+            return False
+        return self._verificar_hash(self.hash_archivo(nombre_archivo), firma, llave_publica)
+    
+    def _verificar_hash(self, z: int, firma: Tuple[int, int],
+                        llave_publica: Union[PuntoElliptico, LlaveVerificacion]) -> bool:
+        """Pasos 1-4 de la verificación para un hash z ya calculado (r, s en rango)"""
+        r, s = firma
+        
+        # Una llave que no es un punto válido del subgrupo nunca verifica
+        if not self._llave_valida(llave_publica):
+            return False
+        
+        # Paso 1: Calcular w = s^(-1) mod q
+        try:
+            w = self.curva.inverso_modular(s, self.curva.q)
+        except ValueError:
+            # s no tiene inverso modular, la firma es inválida
+            return False
+        
+        # Paso 2: Calcular u₁ = z·w mod q y u₂ = r·w mod q
+        u1 = (z * w) % self.curva.q
+        u2 = (r * w) % self.curva.q
+        
+        # Paso 3: Calcular X = u₁·G + u₂·Q (en coordenadas jacobianas)
+        X = self._calcular_X(u1, u2, llave_publica)
+        
+        # Paso 4: Verificar que x_X ≡ r (mod q)
+        # (si X es el punto en el infinito, la firma es inválida)
+        return self.curva._x_congruente_jacobiano(X, r)
+    
+    # Máximo de firmas por grupo en verificar_lote()
+    MAX_TAM_GRUPO = 256
+    
+    def verificar_lote(self, elementos: Iterable[Tuple[Mensaje, tuple, PuntoElliptico]],
+                       tam_grupo: int = 64) -> List[bool]:
+        """
+        Verifica muchas firmas a la vez
+        
+        La comprobación conjunta solo se aplica a firmas recuperables
+        (r, s, v), como las de firmar_recuperable(): v fija el punto R = k·G
+        (x y paridad de y), así que cada grupo se comprueba con una sola
+        multiplicación multiescalar aleatoria
+            Σ aᵢ·u₁ᵢ·G + Σ aᵢ·u₂ᵢ·Qᵢ − Σ aᵢ·Rᵢ = O
+        Si un grupo falla se divide en mitades hasta aislar las firmas
+        inválidas. Las firmas (r, s) sin v no fijan el signo de R y pasan
+        directamente por verificar(), sin coste añadido.
+        
+        Args:
+            elementos: Iterable de tuplas (mensaje, firma, llave_publica), donde
+                       la firma es (r, s) o (r, s, v) y la llave puede ser un
+                       PuntoElliptico o una LlaveVerificacion
+            tam_grupo: Número de firmas que se comprueban juntas
+                       (se limita a MAX_TAM_GRUPO)
+        
+        Returns:
+            Lista con el resultado de cada firma, en el mismo orden; coincide
+            con verificar() sobre (r, s)
+        
+        Raises:
+            ValueError: Si tam_grupo es menor que 1 o una firma no tiene 2 o 3 valores
+        """
+        if tam_grupo < 1:
+            raise ValueError("tam_grupo debe ser al menos 1")
+        tam_grupo = min(tam_grupo, self.MAX_TAM_GRUPO)
+        
+        curva = self.curva
+        q = curva.q
+        elementos = list(elementos)
+        resultados = [False] * len(elementos)
+        
+        for _, firma, _ in elementos:
+            if len(firma) not in (2, 3):
+                raise ValueError("Cada firma debe ser (r, s) o (r, s, v)")
+        
+        # La combinación aleatoria solo es fiable en grupos grandes de orden primo
+        usar_lote = q.bit_length() >= 128 and curva._tiene_cofactor_uno()
+        
+        # Solo las firmas con v (y un R que exista) van por la comprobación
+        # conjunta; el resto se verifica directamente con verificar()
+        candidatas = []
+        for i, (mensaje, firma, llave_publica) in enumerate(elementos):
+            R = None
+            if (usar_lote and len(firma) == 3 and
+                    1 <= firma[0] <= q - 1 and 1 <= firma[1] <= q - 1):
+                R = self._punto_R(firma)
+            if R is None:
+                resultados[i] = self.verificar(mensaje, firma[:2], llave_publica)
+            else:
+                candidatas.append((i, R))
         
-        # Paso 0: Verificar rango de r y s
-        if not (1 <= r <= self.curva.q - 1) or not (1 <= s <= self.curva.q - 1):
-            return False
+        # Con q primo todos los s en rango son invertibles: un solo inverso para todas
+        inversos_s = curva.invertir_lote([elementos[i][1][1] for i, _ in candidatas], q)
+        pendientes = []
+        for (i, R), w in zip(candidatas, inversos_s):
+            mensaje, firma, llave_publica = elementos[i]
+            if not self._llave_valida(llave_publica):
+                continue
+            z = self.hash_mensaje(mensaje)
+            r = firma[0]
+            pendientes.append((i, (z * w) % q, (r * w) % q, r, llave_publica, R))
         
-        # Calcular hash del mensaje
-        z = self.hash_mensaje(mensaje)
+        for inicio in range(0, len(pendientes), tam_grupo):
+            self._resolver_grupo(pendientes[inicio:inicio + tam_grupo], resultados)
         
-        # Paso 1: Calcular w = s^(-1) mod q
+        return resultados
+    
+    def _punto_R(self, firma: tuple) -> Optional[PuntoElliptico]:
+        """Punto R de una firma (r, s, v), o None si no lleva v o ningún punto le corresponde"""
+        if len(firma) < 3 or not 0 <= firma[2] <= 3:
+            return None
+        r, v = firma[0], firma[2]
         try:
-            w = self.curva.inverso_modular(s, self.curva.q)
+            return self.curva.punto_desde_x(r + (v >> 1) * self.curva.q, v & 1)
         except ValueError:
-            # s no tiene inverso modular, la firma es inválida
-            return False
+            return None
+    
+    def _resolver_grupo(self, grupo: List[tuple], resultados: List[bool]):
+        """Comprueba un grupo; si falla, lo divide en mitades (bisección)"""
+        if len(grupo) == 1:
+            i, u1, u2, r, llave_publica, _ = grupo[0]
+            X = self._calcular_X(u1, u2, llave_publica)
+            resultados[i] = self.curva._x_congruente_jacobiano(X, r)
+            return
         
-        # Paso 2: Calcular u₁ = z·w mod q y u₂ = r·w mod q
-        u1 = (z * w) % self.curva.q
-        u2 = (r * w) % self.curva.q
+        if self._comprobar_grupo(grupo):
+            for elemento in grupo:
+                resultados[elemento[0]] = True
+            return
         
-        # Paso 3: Calcular X = u₁·G + u₂·Q
-        punto1 = self.curva.multiplicar_escalar(u1, self.curva.G)
-        punto2 = self.curva.multiplicar_escalar(u2, llave_publica)
-        X = self.curva.sumar_puntos(punto1, punto2)
+        mitad = len(grupo) // 2
+        self._resolver_grupo(grupo[:mitad], resultados)
+        self._resolver_grupo(grupo[mitad:], resultados)
+    
+    def _comprobar_grupo(self, grupo: List[tuple]) -> bool:
+        """Comprueba Σ aᵢ·u₁ᵢ·G + Σ aᵢ·u₂ᵢ·Qᵢ − Σ aᵢ·Rᵢ = O con aᵢ aleatorios de 64 bits"""
+        curva = self.curva
+        escalar_G = 0
+        escalares = []
+        puntos = []
+        for _, u1, u2, _, llave_publica, R in grupo:
+            a = secrets.randbits(64) | 1
+            escalar_G += a * u1
+            escalares.append((a * u2) % curva.q)
+            puntos.append(_como_punto(llave_publica))
+            escalares.append(a)
+            puntos.append(PuntoElliptico(R.x, curva.p - R.y))
         
-        # Si X es el punto en el infinito, la firma es inválida
-        if X.es_infinito:
-            return False
+        return curva._multiplicar_multiple_jacobiano(escalares, puntos, escalar_G % curva.q)[2] == 0
+    
+    def recuperar_llave_publica(self, mensaje: Mensaje, firma: Tuple[int, int, int]) -> PuntoElliptico:
+        """
+        Calcula la llave pública del firmante a partir de una firma (r, s, v)
         
-        # Paso 4: Verificar que x_X ≡ r (mod q)
-        return (X.x % self.curva.q) == r
+        Para confirmar un firmante esperado basta con comparar el resultado
+        con su llave: Q = r⁻¹·(s·R − z·G) satisface siempre la ecuación de
+        verificación.
+        
+        Raises:
+            ValueError: Si ningún punto corresponde a (r, s, v)
+        """
+        r, s, v = firma
+        return self._recuperar_hash(self.hash_mensaje(mensaje), r, s, v)
+    
+    def candidatos_llave_publica(self, mensaje: Mensaje,
+                                 firma: Tuple[int, int]) -> List[Tuple[int, PuntoElliptico]]:
+        """
+        Todas las llaves públicas con las que (r, s) es válida para el mensaje
+        
+        Returns:
+            Lista de (v, llave_publica); como mucho 2 puntos por cada x ≡ r (mod q)
+        """
+        r, s = firma[0], firma[1]
+        z = self.hash_mensaje(mensaje)
+        candidatos = []
+        for v in range(4):
+            try:
+                candidatos.append((v, self._recuperar_hash(z, r, s, v)))
+            except ValueError:
+                continue
+        return candidatos
+    
+    def _recuperar_hash(self, z: int, r: int, s: int, v: int) -> PuntoElliptico:
+        """Q = r⁻¹·(s·R − z·G), con R el punto de x = r + (v // 2)·q y paridad v % 2"""
+        curva = self.curva
+        if not (1 <= r <= curva.q - 1) or not (1 <= s <= curva.q - 1) or not 0 <= v <= 3:
+            raise ValueError("Firma recuperable fuera de rango")
+        R = curva.punto_desde_x(r + (v >> 1) * curva.q, v & 1)
+        r_inv = curva.inverso_modular(r, curva.q)
+        Q = curva._a_afin(curva._multiplicar_doble_jacobiano(
+            (-z * r_inv) % curva.q, (s * r_inv) % curva.q, R))
+        if Q.es_infinito:
+            raise ValueError("La firma no corresponde a ninguna llave pública")
+        return Q
     
-    def verificar_paso_a_paso(self, mensaje: str, firma: Tuple[int, int], 
+    def verificar_paso_a_paso(self, mensaje: Mensaje, firma: Tuple[int, int], 
                               llave_publica: PuntoElliptico, hash_valor: Optional[int] = None) -> Dict:
         """
         Verifica una firma ECDSA mostrando todos los pasos intermedios
@@ -307,6 +1820,7 @@ class ECDSA:
             Diccionario con todos los pasos y el resultado final
         """
         r, s = firma
+        llave_publica = _como_punto(llave_publica)
         pasos = {}
         
         # Paso 0: Verificar rango
@@ -321,7 +1835,24 @@ class ECDSA:
         }
         
         if not pasos['paso_0']['rango_valido']:
-            pasos['resultado'] = {'valido': False, 'razon': 'r o s fuera de rango'}
+            pasos['resultado'] = {'valido': False, 'razon': 'r o s fuera de rango',
+                                  'conclusion': '✗ La firma es INVÁLIDA (r o s fuera de rango)'}
+            return pasos
+        
+        # Validación de la llave pública, igual que en verificar()
+        llave_valida = self.curva.es_llave_publica_valida(llave_publica)
+        pasos['paso_llave'] = {
+            'titulo': 'Validar la llave pública Q',
+            'detalle': 'Q ≠ O, coordenadas en [0, p), Q en la curva y q·Q = O',
+            'Q': str(llave_publica),
+            'llave_valida': llave_valida,
+            'explicacion': f'Q = {llave_publica} '
+                          f'{"es" if llave_valida else "NO es"} un punto válido del subgrupo de orden q = {self.curva.q}'
+        }
+        
+        if not llave_valida:
+            pasos['resultado'] = {'valido': False, 'razon': 'llave pública inválida',
+                                  'conclusion': '✗ La firma es INVÁLIDA (llave pública inválida)'}
             return pasos
         
         # Calcular hash
@@ -338,7 +1869,12 @@ class ECDSA:
         }
         
         # Paso 1: Calcular w = s^(-1) mod q
-        w = self.curva.inverso_modular(s, self.curva.q)
+        try:
+            w = self.curva.inverso_modular(s, self.curva.q)
+        except ValueError:
+            pasos['resultado'] = {'valido': False, 'razon': 's no tiene inverso módulo q',
+                                  'conclusion': '✗ La firma es INVÁLIDA (s no tiene inverso módulo q)'}
+            return pasos
         pasos['paso_1'] = {
             'titulo': 'Paso 1 - Calcular w = s⁻¹ mod q',
             's': s,
@@ -361,7 +1897,7 @@ class ECDSA:
         }
         
         # Paso 3: Calcular X = u₁·G + u₂·Q
-        punto1 = self.curva.multiplicar_escalar(u1, self.curva.G)
+        punto1 = self.curva.multiplicar_generador(u1)
         punto2 = self.curva.multiplicar_escalar(u2, llave_publica)
         X = self.curva.sumar_puntos(punto1, punto2)
         
@@ -382,7 +1918,8 @@ class ECDSA:
         }
         
         if X.es_infinito:
-            pasos['resultado'] = {'valido': False, 'razon': 'X es el punto en el infinito'}
+            pasos['resultado'] = {'valido': False, 'razon': 'X es el punto en el infinito',
+                                  'conclusion': '✗ La firma es INVÁLIDA (X es el punto en el infinito)'}
             return pasos
         
         # Paso 4: Verificar x_X ≡ r (mod q)
@@ -409,6 +1946,143 @@ class ECDSA:
         return pasos
 
 
+# Curvas estándar (SEC 2 / FIPS 186-4), identificadas por un nombre estable
+CURVAS_ESTANDAR = {
+    'secp256k1': dict(
+        p=0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F,
+        a=0,
+        b=7,
+        G=(0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+           0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8),
+        q=0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141,
+    ),
+    'P-256': dict(
+        p=0xFFFFFFFF00000001000000000000000000000000FFFFFFFFFFFFFFFFFFFFFFFF,
+        a=0xFFFFFFFF00000001000000000000000000000000FFFFFFFFFFFFFFFFFFFFFFFC,
+        b=0x5AC635D8AA3A93E7B3EBBD55769886BC651D06B0CC53B0F63BCE3C3E27D2604B,
+        G=(0x6B17D1F2E12C4247F8BCE6E563A440F277037D812DEB33A0F4A13945D898C296,
+           0x4FE342E2FE1A7F9B8EE7EB4A7C0F9E162BCE33576B315ECECBB6406837BF51F5),
+        q=0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551,
+    ),
+    'P-384': dict(
+        p=int('FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFE'
+              'FFFFFFFF0000000000000000FFFFFFFF', 16),
+        a=int('FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFE'
+              'FFFFFFFF0000000000000000FFFFFFFC', 16),
+        b=int('B3312FA7E23EE7E4988E056BE3F82D19181D9C6EFE8141120314088F5013875A'
+              'C656398D8A2ED19D2A85C8EDD3EC2AEF', 16),
+        G=(int('AA87CA22BE8B05378EB1C71EF320AD746E1D3B628BA79B9859F741E082542A38'
+               '5502F25DBF55296C3A545E3872760AB7', 16),
+           int('3617DE4A96262C6F5D9E98BF9292DC29F8F41DBD289A147CE9DA3113B5F0B8C0'
+               '0A60B1CE1D7E819D7A431D7C90EA0E5F', 16)),
+        q=int('FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFC7634D81F4372DDF'
+              '581A0DB248B0A77AECEC196ACCC52973', 16),
+    ),
+}
+
+# Función hash recomendada para cada curva estándar (digest del tamaño de q)
+_HASH_POR_CURVA = {
+    'secp256k1': 'sha256',
+    'P-256': 'sha256',
+    'P-384': 'sha384',
+}
+
+# Endomorfismos GLV (β, λ) conocidos de las curvas estándar con a = 0
+_ENDOMORFISMOS_ESTANDAR = {
+    'secp256k1': (0x7AE96A2B657C07106E64479EAC3434E99CF0497512F58995C1396C28719501EE,
+                  0x5363AD4CC05C30E0A5261C028812645A122E22EA20816678DF02967C1B23BD72),
+}
+
+# Otros nombres con los que se conocen las mismas curvas
+_ALIAS_CURVAS = {
+    'secp256r1': 'P-256',
+    'prime256v1': 'P-256',
+    'secp384r1': 'P-384',
+}
+
+# Curvas propias (no estándar) que curva_compartida() recuerda; sus parámetros
+# pueden venir de llaves no confiables, así que la tabla es LRU y acotada
+MAX_CURVAS_COMPARTIDAS = 64
+
+# Instancias compartidas: una por nombre y, acotadas, por conjunto de parámetros
+_curvas_por_nombre: Dict[str, CurvaEliptica] = {}
+_curvas_por_parametros: 'OrderedDict[tuple, CurvaEliptica]' = OrderedDict()
+_candado_curvas = threading.Lock()
+
+
+def _clave_parametros(p: int, a: int, b: int, G: Tuple[int, int], q: int) -> tuple:
+    return (p, a % p, b % p, G[0] % p, G[1] % p, q)
+
+
+# Nombre de cada curva estándar según sus parámetros
+_NOMBRES_POR_PARAMETROS = {_clave_parametros(**parametros): nombre
+                           for nombre, parametros in CURVAS_ESTANDAR.items()}
+
+
+def obtener_curva(nombre: str) -> CurvaEliptica:
+    """
+    Devuelve la instancia compartida de una curva estándar
+    
+    La curva se crea la primera vez que se pide; las siguientes llamadas
+    devuelven el mismo objeto, con sus tablas precalculadas.
+    
+    Args:
+        nombre: 'secp256k1', 'P-256' o 'P-384' (o un alias como 'secp256r1')
+    """
+    nombre = _ALIAS_CURVAS.get(nombre, nombre)
+    curva = _curvas_por_nombre.get(nombre)
+    if curva is not None:
+        return curva
+    if nombre not in CURVAS_ESTANDAR:
+        raise ValueError(f"Curva desconocida: {nombre}. Disponibles: {', '.join(CURVAS_ESTANDAR)}")
+    
+    with _candado_curvas:
+        curva = _curvas_por_nombre.get(nombre)
+        if curva is None:
+            curva = CurvaEliptica(nombre=nombre, endomorfismo=_ENDOMORFISMOS_ESTANDAR.get(nombre),
+                                  **CURVAS_ESTANDAR[nombre])
+            _curvas_por_nombre[nombre] = curva
+    return curva
+
+
+def _nombre_estandar(curva: CurvaEliptica) -> Optional[str]:
+    """Nombre de la curva estándar con los mismos parámetros, o None"""
+    if curva.nombre is not None:
+        return curva.nombre
+    return _NOMBRES_POR_PARAMETROS.get(
+        _clave_parametros(curva.p, curva.a, curva.b, (curva.G.x, curva.G.y), curva.q))
+
+
+def curva_compartida(p: int, a: int, b: int, G: Tuple[int, int], q: int) -> CurvaEliptica:
+    """
+    Devuelve una instancia compartida de la curva con estos parámetros
+    
+    Si coinciden con una curva estándar se devuelve esa curva. Si no, se
+    reutiliza la instancia creada antes con los mismos parámetros, de modo
+    que las llaves importadas de la misma curva comparten sus tablas; solo
+    se recuerdan las MAX_CURVAS_COMPARTIDAS curvas propias usadas más
+    recientemente.
+    """
+    clave = _clave_parametros(p, a, b, G, q)
+    nombre = _NOMBRES_POR_PARAMETROS.get(clave)
+    if nombre is not None:
+        return obtener_curva(nombre)
+    
+    with _candado_curvas:
+        curva = _curvas_por_parametros.get(clave)
+        if curva is not None:
+            _curvas_por_parametros.move_to_end(clave)
+            return curva
+    
+    curva = CurvaEliptica(p, a, b, G, q)
+    with _candado_curvas:
+        curva = _curvas_por_parametros.setdefault(clave, curva)
+        _curvas_por_parametros.move_to_end(clave)
+        while len(_curvas_por_parametros) > MAX_CURVAS_COMPARTIDAS:
+            _curvas_por_parametros.popitem(last=False)
+    return curva
+
+
 def crear_curva_ejemplo() -> CurvaEliptica:
     """
     Crea una curva elíptica de ejemplo más grande y realista:
@@ -436,10 +2110,31 @@ def crear_curva_ejemplo_pequena() -> CurvaEliptica:
 
 
 def exportar_llave_publica(llave_publica: PuntoElliptico, curva: CurvaEliptica, 
-                           nombre_archivo: str):
+                           nombre_archivo: str, comprimida: bool = False, formato: str = 'texto'):
     """
-    Exporta una llave pública en formato PEM con Base64 puro.
+    Exporta una llave pública a un archivo.
+    
+    Args:
+        formato: 'texto' (PEM con Base64 de los parámetros, el formato de
+                 siempre), 'pem' (SubjectPublicKeyInfo en PEM), 'der'
+                 (SubjectPublicKeyInfo binario) o 'compacta' (id de curva
+                 + punto comprimido; solo curvas estándar)
+        comprimida: En 'texto', 'pem' y 'der', guardar el punto SEC1
+                    comprimido (la mitad de tamaño)
     """
+    if formato != 'texto':
+        if formato == 'compacta':
+            datos = codificar_llave_publica_compacta(llave_publica, curva)
+        else:
+            datos = codificar_llave_publica_der(llave_publica, curva, comprimida)
+        _escribir_llave(nombre_archivo, datos, formato, "PUBLIC KEY")
+        return
+    
+    if comprimida:
+        llave_texto = f"Q={codificar_punto(llave_publica, curva).hex()}"
+    else:
+        llave_texto = f"Qx={llave_publica.x}\nQy={llave_publica.y}"
+    
     # Datos en formato texto
     datos_texto = (
         f"p={curva.p}\n"
@@ -448,8 +2143,7 @@ def exportar_llave_publica(llave_publica: PuntoElliptico, curva: CurvaEliptica,
         f"Gx={curva.G.x}\n"
         f"Gy={curva.G.y}\n"
         f"q={curva.q}\n"
-        f"Qx={llave_publica.x}\n"
-        f"Qy={llave_publica.y}"
+        f"{llave_texto}"
     )
     
     # Codificar en Base64
@@ -463,54 +2157,40 @@ def exportar_llave_publica(llave_publica: PuntoElliptico, curva: CurvaEliptica,
 
 def importar_llave_publica(nombre_archivo: str) -> Tuple[PuntoElliptico, CurvaEliptica]:
     """
-    Importa una llave pública desde un archivo en formato PEM con Base64.
+    Importa una llave pública de un archivo en cualquiera de los formatos de
+    exportar_llave_publica() (el PEM puede venir partido en varias líneas).
     
     Returns:
         (llave_publica, curva)
-    """
-    with open(nombre_archivo, 'r', encoding='utf-8') as f:
-        contenido = f.read()
-    
-    datos = {}
-    
-    # Buscar y decodificar Base64
-    for linea in contenido.split('\n'):
-        linea = linea.strip()
-        # Saltar headers PEM
-        if linea.startswith('-----'):
-            continue
-        # Si es Base64 (línea larga sin =)
-        if linea and len(linea) > 20:
-            try:
-                # Decodificar Base64
-                datos_decodificados = base64.b64decode(linea).decode('utf-8')
-                # Parsear los datos decodificados
-                for dato_linea in datos_decodificados.split('\n'):
-                    if '=' in dato_linea:
-                        clave, valor = dato_linea.split('=', 1)
-                        datos[clave] = int(valor)
-                break
-            except:
-                pass
-    
-    curva = CurvaEliptica(
-        p=datos['p'],
-        a=datos['a'],
-        b=datos['b'],
-        G=(datos['Gx'], datos['Gy']),
-        q=datos['q']
-    )
-    
-    llave_publica = PuntoElliptico(datos['Qx'], datos['Qy'])
     
-    return llave_publica, curva
+    Raises:
+        ValueError: Si el archivo no contiene exactamente una llave válida
+    """
+    with open(nombre_archivo, 'rb') as f:
+        llaves = cargar_llaves_publicas(f.read())
+    if len(llaves) != 1:
+        raise ValueError(f"Se esperaba una llave pública y el archivo contiene {len(llaves)}")
+    return llaves[0]
 
 
-def exportar_llave_privada(llave_privada: int, curva: CurvaEliptica, nombre_archivo: str):
+def exportar_llave_privada(llave_privada: int, curva: CurvaEliptica, nombre_archivo: str,
+                           formato: str = 'texto'):
     """
-    Exporta una llave privada en formato PEM con Base64 puro.
+    Exporta una llave privada a un archivo.
     ADVERTENCIA: Mantener este archivo seguro y privado.
+    
+    Args:
+        formato: 'texto' (PEM con Base64 de los parámetros), 'pem' (PKCS#8 en
+                 PEM), 'der' (PKCS#8 binario) o 'compacta' (id de curva + d)
     """
+    if formato != 'texto':
+        if formato == 'compacta':
+            datos = codificar_llave_privada_compacta(llave_privada, curva)
+        else:
+            datos = codificar_llave_privada_der(llave_privada, curva)
+        _escribir_llave(nombre_archivo, datos, formato, "PRIVATE KEY")
+        return
+    
     # Datos en formato texto
     datos_texto = (
         f"p={curva.p}\n"
@@ -533,41 +2213,712 @@ def exportar_llave_privada(llave_privada: int, curva: CurvaEliptica, nombre_arch
 
 def importar_llave_privada(nombre_archivo: str) -> Tuple[int, CurvaEliptica]:
     """
-    Importa una llave privada desde un archivo en formato PEM con Base64.
+    Importa una llave privada de un archivo en cualquiera de los formatos de
+    exportar_llave_privada() (también SEC1 "EC PRIVATE KEY").
     
     Returns:
         (llave_privada, curva)
+    
+    Raises:
+        ValueError: Si el archivo no contiene una llave privada válida
+    """
+    with open(nombre_archivo, 'rb') as f:
+        contenido = f.read()
+    
+    if contenido[:1] in _ID_COMPACTO_A_CURVA_BYTES:
+        return decodificar_llave_privada_compacta(contenido)
+    if contenido[:1] == b'\x30':
+        return decodificar_llave_privada_der(contenido)
+    
+    texto = contenido.decode('utf-8')
+    bloques = _bloques_pem(texto)
+    if not bloques:
+        return _llave_desde_campos(_campos_texto(texto.splitlines()), privada=True)
+    if len(bloques) != 1:
+        raise ValueError(f"Se esperaba una llave privada y el archivo contiene {len(bloques)} bloques PEM")
+    etiqueta, cuerpo = bloques[0]
+    if etiqueta in ("PRIVATE KEY", "EC PRIVATE KEY"):
+        return decodificar_llave_privada_der(_base64_de_pem(cuerpo))
+    if etiqueta == "ECDSA PRIVATE KEY":
+        return _llave_desde_campos(_campos_texto(cuerpo.splitlines()), privada=True)
+    raise ValueError(f"Bloque PEM inesperado: {etiqueta}")
+
+
+def exportar_firma(firma: Tuple[int, int], nombre_archivo: str,
+                   metadatos: Optional[Dict[str, Union[str, int]]] = None, *,
+                   algoritmo_hash: str):
+    """
+    Exporta una firma separada en formato PEM con Base64 puro.
+    
+    El archivo contiene solo r, s, el hash con el que se firmó (el nombre_hash
+    del ECDSA firmante) y metadatos (por ejemplo el nombre y tamaño del archivo
+    firmado), nunca el contenido firmado.
+    """
+    r, s = firma
+    lineas = [f"r={r}", f"s={s}", f"hash={algoritmo_hash}"]
+    for clave, valor in (metadatos or {}).items():
+        if '=' in clave or '\n' in clave or '\n' in str(valor):
+            raise ValueError(f"Metadato inválido: {clave!r}")
+        lineas.append(f"{clave}={valor}")
+    
+    # Codificar en Base64
+    datos_base64 = base64.b64encode("\n".join(lineas).encode('utf-8')).decode('utf-8')
+    
+    with open(nombre_archivo, 'w', encoding='utf-8') as f:
+        f.write("-----BEGIN ECDSA SIGNATURE-----\n")
+        f.write(f"{datos_base64}\n")
+        f.write("-----END ECDSA SIGNATURE-----\n")
+
+
+def importar_firma(nombre_archivo: str) -> Tuple[Tuple[int, int], Dict[str, str]]:
+    """
+    Importa una firma separada escrita por exportar_firma().
+    
+    Returns:
+        ((r, s), metadatos)
     """
     with open(nombre_archivo, 'r', encoding='utf-8') as f:
         contenido = f.read()
     
-    # Extraer la línea de Base64 (entre los headers PEM)
-    lineas = contenido.split('\n')
-    datos_base64 = ""
-    for linea in lineas:
-        linea = linea.strip()
-        if linea and not linea.startswith('-----'):
-            datos_base64 = linea
-            break
+    if "-----BEGIN ECDSA SIGNATURE-----" not in contenido:
+        raise ValueError("El archivo no contiene una firma separada")
     
-    # Decodificar Base64
+    # Base64 entre los headers PEM (puede venir partido en varias líneas)
+    datos_base64 = "".join(
+        linea.strip() for linea in contenido.split('\n')
+        if linea.strip() and not linea.strip().startswith('-----')
+    )
     datos_decodificados = base64.b64decode(datos_base64).decode('utf-8')
     
-    # Parsear los datos
-    datos = {}
+    metadatos = {}
     for dato_linea in datos_decodificados.split('\n'):
         if '=' in dato_linea:
             clave, valor = dato_linea.split('=', 1)
-            datos[clave] = int(valor)
-    
-    curva = CurvaEliptica(
-        p=datos['p'],
-        a=datos['a'],
-        b=datos['b'],
-        G=(datos['Gx'], datos['Gy']),
-        q=datos['q']
-    )
+            metadatos[clave] = valor
+    
+    firma = (int(metadatos.pop('r')), int(metadatos.pop('s')))
+    return firma, metadatos
+
+
+# ---------------------------------------------------------------------------
+# Codificación SEC1 de puntos (llaves públicas), comprimida y sin comprimir
+# ---------------------------------------------------------------------------
+
+def ancho_coordenada(curva: CurvaEliptica) -> int:
+    """Bytes de una coordenada módulo p"""
+    return (curva.p.bit_length() + 7) // 8
+
+
+def codificar_punto(punto: PuntoElliptico, curva: CurvaEliptica, comprimido: bool = True) -> bytes:
+    """
+    Codifica un punto según SEC1 (sección 2.3.3)
+    
+    Comprimido: 0x02/0x03 (paridad de y) || x. Sin comprimir: 0x04 || x || y.
+    El punto en el infinito es el byte 0x00.
+    """
+    if punto.es_infinito:
+        return b'\x00'
+    ancho = ancho_coordenada(curva)
+    x, y = punto.x % curva.p, punto.y % curva.p
+    if comprimido:
+        return bytes([0x02 | (y & 1)]) + x.to_bytes(ancho, 'big')
+    return b'\x04' + x.to_bytes(ancho, 'big') + y.to_bytes(ancho, 'big')
+
+
+def decodificar_punto(datos: Union[bytes, bytearray, memoryview], curva: CurvaEliptica) -> PuntoElliptico:
+    """
+    Inverso de codificar_punto(); acepta ambas formas
+    
+    Raises:
+        ValueError: Si la codificación es inválida o el punto no está en la curva
+    """
+    ancho = ancho_coordenada(curva)
+    if len(datos) == 1 and datos[0] == 0:
+        return PuntoElliptico(None, None)
+    if len(datos) == 1 + ancho and datos[0] in (0x02, 0x03):
+        return curva.punto_desde_x(int.from_bytes(datos[1:], 'big'), datos[0] == 0x03)
+    if len(datos) == 1 + 2 * ancho and datos[0] == 0x04:
+        x = int.from_bytes(datos[1:1 + ancho], 'big')
+        y = int.from_bytes(datos[1 + ancho:], 'big')
+        punto = PuntoElliptico(x, y)
+        if x >= curva.p or y >= curva.p or not curva.esta_en_curva(punto):
+            raise ValueError("El punto no está en la curva")
+        return punto
+    raise ValueError("Codificación SEC1 de punto inválida")
+
+
+# ---------------------------------------------------------------------------
+# Codificaciones binarias de firmas: r||s de ancho fijo y ASN.1 DER
+# ---------------------------------------------------------------------------
+
+def _der_longitud(n: int) -> bytes:
+    """Longitud DER (forma corta o larga)"""
+    if n < 0x80:
+        return bytes([n])
+    octetos = n.to_bytes((n.bit_length() + 7) // 8, 'big')
+    return bytes([0x80 | len(octetos)]) + octetos
+
+
+def _der_tlv(etiqueta: int, contenido: bytes) -> bytes:
+    """Elemento DER etiqueta-longitud-valor"""
+    return bytes([etiqueta]) + _der_longitud(len(contenido)) + contenido
+
+
+def _der_entero(valor: int) -> bytes:
+    """INTEGER DER de un entero no negativo"""
+    if valor < 0:
+        raise ValueError("Solo se codifican enteros no negativos")
+    return _der_tlv(0x02, valor.to_bytes(valor.bit_length() // 8 + 1, 'big'))
+
+
+def _der_leer(datos, pos: int, etiqueta: int) -> Tuple[int, int]:
+    """
+    Lee la cabecera de un elemento DER con la etiqueta indicada en datos[pos:]
+    
+    Returns:
+        (inicio, fin) del contenido; exige longitudes mínimas (DER estricto)
+    """
+    if pos + 2 > len(datos) or datos[pos] != etiqueta:
+        raise ValueError(f"DER inválido: se esperaba la etiqueta 0x{etiqueta:02x} en {pos}")
+    longitud = datos[pos + 1]
+    pos += 2
+    if longitud & 0x80:
+        num_octetos = longitud & 0x7F
+        if num_octetos == 0 or num_octetos > 4 or pos + num_octetos > len(datos):
+            raise ValueError("DER inválido: longitud mal formada")
+        longitud = int.from_bytes(datos[pos:pos + num_octetos], 'big')
+        if longitud < 0x80 or datos[pos] == 0:
+            raise ValueError("DER inválido: longitud no mínima")
+        pos += num_octetos
+    if pos + longitud > len(datos):
+        raise ValueError("DER inválido: contenido truncado")
+    return pos, pos + longitud
+
+
+def _der_leer_entero(datos, pos: int) -> Tuple[int, int]:
+    """Lee un INTEGER DER no negativo; devuelve (valor, posición siguiente)"""
+    inicio, fin = _der_leer(datos, pos, 0x02)
+    if inicio == fin:
+        raise ValueError("DER inválido: INTEGER vacío")
+    if datos[inicio] & 0x80:
+        raise ValueError("DER inválido: INTEGER negativo")
+    if fin - inicio > 1 and datos[inicio] == 0 and not datos[inicio + 1] & 0x80:
+        raise ValueError("DER inválido: INTEGER con ceros de sobra")
+    return int.from_bytes(datos[inicio:fin], 'big'), fin
+
+
+def _ancho_escalar(curva: CurvaEliptica) -> int:
+    """Bytes de un escalar módulo q en las codificaciones de ancho fijo"""
+    return (curva.q.bit_length() + 7) // 8
+
+
+def codificar_firma_raw(firma: Tuple[int, int], curva: CurvaEliptica) -> bytes:
+    """Codifica (r, s) como r||s, cada uno big-endian con el ancho de q"""
+    r, s = firma
+    ancho = _ancho_escalar(curva)
+    return r.to_bytes(ancho, 'big') + s.to_bytes(ancho, 'big')
+
+
+def decodificar_firma_raw(datos: Union[bytes, bytearray, memoryview], curva: CurvaEliptica) -> Tuple[int, int]:
+    """Inverso de codificar_firma_raw()"""
+    ancho = _ancho_escalar(curva)
+    if len(datos) != 2 * ancho:
+        raise ValueError(f"La firma r||s debe tener {2 * ancho} bytes, no {len(datos)}")
+    return int.from_bytes(datos[:ancho], 'big'), int.from_bytes(datos[ancho:], 'big')
+
+
+def codificar_firma_recuperable(firma: Tuple[int, int, int], curva: CurvaEliptica) -> bytes:
+    """Codifica (r, s, v) como r||s||v (65 bytes en curvas de 256 bits)"""
+    r, s, v = firma
+    if not 0 <= v <= 3:
+        raise ValueError("El identificador de recuperación debe estar en [0, 3]")
+    return codificar_firma_raw((r, s), curva) + bytes([v])
+
+
+def decodificar_firma_recuperable(datos: Union[bytes, bytearray, memoryview],
+                                  curva: CurvaEliptica) -> Tuple[int, int, int]:
+    """Inverso de codificar_firma_recuperable()"""
+    ancho = _ancho_escalar(curva)
+    if len(datos) != 2 * ancho + 1:
+        raise ValueError(f"La firma r||s||v debe tener {2 * ancho + 1} bytes, no {len(datos)}")
+    if datos[-1] > 3:
+        raise ValueError("El identificador de recuperación debe estar en [0, 3]")
+    r, s = decodificar_firma_raw(datos[:-1], curva)
+    return r, s, datos[-1]
+
+
+def codificar_firma_der(firma: Tuple[int, int]) -> bytes:
+    """Codifica (r, s) como SEQUENCE { INTEGER r, INTEGER s } en DER"""
+    r, s = firma
+    return _der_tlv(0x30, _der_entero(r) + _der_entero(s))
+
+
+def _leer_firma_der(datos, pos: int) -> Tuple[Tuple[int, int], int]:
+    """Lee una firma DER en datos[pos:]; devuelve ((r, s), posición siguiente)"""
+    inicio, fin = _der_leer(datos, pos, 0x30)
+    r, siguiente = _der_leer_entero(datos, inicio)
+    s, siguiente = _der_leer_entero(datos, siguiente)
+    if siguiente != fin:
+        raise ValueError("DER inválido: datos de sobra dentro de la firma")
+    return (r, s), fin
+
+
+def decodificar_firma_der(datos: Union[bytes, bytearray, memoryview]) -> Tuple[int, int]:
+    """Inverso de codificar_firma_der(); rechaza codificaciones no estrictas"""
+    firma, fin = _leer_firma_der(datos, 0)
+    if fin != len(datos):
+        raise ValueError("DER inválido: datos de sobra tras la firma")
+    return firma
+
+
+def codificar_firmas_raw(firmas: Iterable[Tuple[int, int]], curva: CurvaEliptica) -> bytes:
+    """Concatena muchas firmas r||s en un único buffer de ancho fijo por firma"""
+    ancho = _ancho_escalar(curva)
+    return b''.join(r.to_bytes(ancho, 'big') + s.to_bytes(ancho, 'big') for r, s in firmas)
+
+
+def decodificar_firmas_raw(buffer: Union[bytes, bytearray, memoryview],
+                           curva: CurvaEliptica) -> List[Tuple[int, int]]:
+    """
+    Separa un buffer de firmas r||s concatenadas
+    
+    Se recorre con un memoryview, sin copiar ni pasar por cadenas cada firma.
+    """
+    ancho = _ancho_escalar(curva)
+    if len(buffer) % (2 * ancho):
+        raise ValueError(f"El buffer no es múltiplo de {2 * ancho} bytes")
+    vista = memoryview(buffer).cast('B')
+    desde_bytes = int.from_bytes
+    return [(desde_bytes(vista[i:i + ancho], 'big'), desde_bytes(vista[i + ancho:i + 2 * ancho], 'big'))
+            for i in range(0, len(vista), 2 * ancho)]
+
+
+def codificar_firmas_der(firmas: Iterable[Tuple[int, int]]) -> bytes:
+    """Concatena muchas firmas DER en un único buffer"""
+    return b''.join(codificar_firma_der(firma) for firma in firmas)
+
+
+def decodificar_firmas_der(buffer: Union[bytes, bytearray, memoryview]) -> List[Tuple[int, int]]:
+    """Separa un buffer de firmas DER concatenadas (cada una delimita su longitud)"""
+    vista = memoryview(buffer).cast('B')
+    firmas = []
+    pos = 0
+    while pos < len(vista):
+        firma, pos = _leer_firma_der(vista, pos)
+        firmas.append(firma)
+    return firmas
+
+
+# ---------------------------------------------------------------------------
+# Formatos de llaves: SubjectPublicKeyInfo / PKCS#8 (DER y PEM) y compacto
+# ---------------------------------------------------------------------------
+
+_OID_EC_PUBLIC_KEY = '1.2.840.10045.2.1'
+_OID_CAMPO_PRIMO = '1.2.840.10045.1.1'
+
+# OID namedCurve de las curvas estándar (RFC 5480, SEC2)
+_OID_CURVAS = {
+    'secp256k1': '1.3.132.0.10',
+    'P-256': '1.2.840.10045.3.1.7',
+    'P-384': '1.3.132.0.34',
+}
+_CURVAS_POR_OID = {oid: nombre for nombre, oid in _OID_CURVAS.items()}
+
+# Primer byte del formato compacto: identificador de la curva estándar
+_ID_COMPACTO_CURVAS = {'secp256k1': 1, 'P-256': 2, 'P-384': 3}
+_CURVAS_POR_ID_COMPACTO = {id_curva: nombre for nombre, id_curva in _ID_COMPACTO_CURVAS.items()}
+_ID_COMPACTO_A_CURVA_BYTES = {bytes([id_curva]) for id_curva in _CURVAS_POR_ID_COMPACTO}
+
+# Campos del formato de texto clásico (p=..., Qx=..., ...)
+_CAMPOS_TEXTO = re.compile(r'^(p|a|b|Gx|Gy|q|Qx|Qy|Q|d)=(.*)$')
+_BLOQUE_PEM = re.compile(r'-----BEGIN ([A-Z0-9 ]+)-----(.*?)-----END \1-----', re.DOTALL)
+
+
+def _der_oid(oid: str) -> bytes:
+    """OBJECT IDENTIFIER DER a partir de su forma con puntos"""
+    partes = [int(parte) for parte in oid.split('.')]
+    contenido = bytearray()
+    for valor in [40 * partes[0] + partes[1]] + partes[2:]:
+        grupo = [valor & 0x7F]
+        valor >>= 7
+        while valor:
+            grupo.append(0x80 | (valor & 0x7F))
+            valor >>= 7
+        contenido.extend(reversed(grupo))
+    return _der_tlv(0x06, bytes(contenido))
+
+
+def _der_leer_oid(datos, pos: int) -> Tuple[str, int]:
+    """Lee un OBJECT IDENTIFIER DER; devuelve (oid con puntos, posición siguiente)"""
+    inicio, fin = _der_leer(datos, pos, 0x06)
+    if inicio == fin or datos[fin - 1] & 0x80:
+        raise ValueError("DER inválido: OBJECT IDENTIFIER mal formado")
+    valores = []
+    valor = 0
+    for octeto in datos[inicio:fin]:
+        valor = (valor << 7) | (octeto & 0x7F)
+        if not octeto & 0x80:
+            valores.append(valor)
+            valor = 0
+    primero = min(valores[0] // 40, 2)
+    return '.'.join(map(str, [primero, valores[0] - 40 * primero] + valores[1:])), fin
+
+
+def _der_parametros_curva(curva: CurvaEliptica) -> bytes:
+    """ECParameters: OID namedCurve para las curvas estándar, explícitos para el resto"""
+    if curva.nombre in _OID_CURVAS:
+        return _der_oid(_OID_CURVAS[curva.nombre])
+    ancho = ancho_coordenada(curva)
+    campo = _der_tlv(0x30, _der_oid(_OID_CAMPO_PRIMO) + _der_entero(curva.p))
+    coeficientes = _der_tlv(0x30, _der_tlv(0x04, (curva.a % curva.p).to_bytes(ancho, 'big')) +
+                            _der_tlv(0x04, (curva.b % curva.p).to_bytes(ancho, 'big')))
+    base = _der_tlv(0x04, codificar_punto(curva.G, curva, comprimido=False))
+    return _der_tlv(0x30, _der_entero(1) + campo + coeficientes + base + _der_entero(curva.q))
+
+
+def _der_leer_parametros_curva(datos, pos: int) -> Tuple[CurvaEliptica, int]:
+    """Lee ECParameters (namedCurve o explícitos); devuelve (curva, posición siguiente)"""
+    if pos < len(datos) and datos[pos] == 0x06:
+        oid, fin = _der_leer_oid(datos, pos)
+        if oid not in _CURVAS_POR_OID:
+            raise ValueError(f"Curva con OID desconocido: {oid}")
+        return obtener_curva(_CURVAS_POR_OID[oid]), fin
+    
+    inicio, fin = _der_leer(datos, pos, 0x30)
+    _, pos = _der_leer_entero(datos, inicio)
+    inicio_campo, fin_campo = _der_leer(datos, pos, 0x30)
+    oid, pos = _der_leer_oid(datos, inicio_campo)
+    if oid != _OID_CAMPO_PRIMO:
+        raise ValueError(f"Solo se admiten campos primos, no {oid}")
+    p, _ = _der_leer_entero(datos, pos)
+    inicio_coef, fin_coef = _der_leer(datos, fin_campo, 0x30)
+    inicio_a, fin_a = _der_leer(datos, inicio_coef, 0x04)
+    inicio_b, fin_b = _der_leer(datos, fin_a, 0x04)
+    inicio_G, fin_G = _der_leer(datos, fin_coef, 0x04)
+    q, _ = _der_leer_entero(datos, fin_G)
+    
+    ancho = (fin_G - inicio_G - 1) // 2
+    if datos[inicio_G] != 0x04 or fin_G - inicio_G != 1 + 2 * ancho:
+        raise ValueError("El generador debe venir sin comprimir")
+    G = (int.from_bytes(datos[inicio_G + 1:inicio_G + 1 + ancho], 'big'),
+         int.from_bytes(datos[inicio_G + 1 + ancho:fin_G], 'big'))
+    a = int.from_bytes(datos[inicio_a:fin_a], 'big')
+    b = int.from_bytes(datos[inicio_b:fin_b], 'big')
+    
+    # Todo se comprueba antes de pedir la instancia compartida
+    if p < 5 or not _es_primo_probable(p):
+        raise ValueError("El módulo p de la curva no es primo")
+    if not (0 <= a < p and 0 <= b < p and 0 <= G[0] < p and 0 <= G[1] < p):
+        raise ValueError("Los parámetros de la curva deben estar en [0, p)")
+    if q < 2:
+        raise ValueError("El orden q del generador debe ser al menos 2")
+    if (G[1] * G[1] - (G[0] * G[0] + a) * G[0] - b) % p != 0:
+        raise ValueError("El generador no está en la curva")
+    if (4 * a ** 3 + 27 * b * b) % p == 0:
+        raise ValueError("La curva es singular (discriminante = 0)")
+    return curva_compartida(p, a, b, G, q), fin
+
+
+def codificar_parametros_curva_der(curva: CurvaEliptica) -> bytes:
+    """
+    ECParameters en DER (RFC 5480): OID namedCurve para las curvas estándar
+    y parámetros explícitos para el resto
+    """
+    return _der_parametros_curva(curva)
+
+
+def decodificar_parametros_curva_der(datos: Union[bytes, bytearray, memoryview]) -> CurvaEliptica:
+    """Inverso de codificar_parametros_curva_der(); devuelve la instancia compartida de la curva"""
+    vista = memoryview(datos).cast('B')
+    curva, fin = _der_leer_parametros_curva(vista, 0)
+    if fin != len(vista):
+        raise ValueError("DER inválido: datos de sobra tras los parámetros de la curva")
+    return curva
+
+
+def _der_algoritmo(curva: CurvaEliptica) -> bytes:
+    """AlgorithmIdentifier { id-ecPublicKey, ECParameters }"""
+    return _der_tlv(0x30, _der_oid(_OID_EC_PUBLIC_KEY) + _der_parametros_curva(curva))
+
+
+def _der_leer_algoritmo(datos, pos: int) -> Tuple[CurvaEliptica, int]:
+    """Lee el AlgorithmIdentifier de una llave EC; devuelve (curva, posición siguiente)"""
+    inicio, fin = _der_leer(datos, pos, 0x30)
+    oid, pos = _der_leer_oid(datos, inicio)
+    if oid != _OID_EC_PUBLIC_KEY:
+        raise ValueError(f"La llave no es de curva elíptica (OID {oid})")
+    curva, pos = _der_leer_parametros_curva(datos, pos)
+    if pos != fin:
+        raise ValueError("DER inválido: datos de sobra en AlgorithmIdentifier")
+    return curva, fin
+
+
+def codificar_llave_publica_der(llave_publica: PuntoElliptico, curva: CurvaEliptica,
+                                comprimida: bool = False) -> bytes:
+    """SubjectPublicKeyInfo DER (RFC 5480) de una llave pública"""
+    punto = codificar_punto(llave_publica, curva, comprimida)
+    return _der_tlv(0x30, _der_algoritmo(curva) + _der_tlv(0x03, b'\x00' + punto))
+
+
+def _leer_llave_publica_der(datos, pos: int) -> Tuple[Tuple[PuntoElliptico, CurvaEliptica], int]:
+    """Lee un SubjectPublicKeyInfo en datos[pos:]; devuelve ((llave, curva), posición siguiente)"""
+    inicio, fin = _der_leer(datos, pos, 0x30)
+    curva, pos = _der_leer_algoritmo(datos, inicio)
+    inicio_bits, fin_bits = _der_leer(datos, pos, 0x03)
+    if fin_bits != fin or inicio_bits == fin_bits or datos[inicio_bits] != 0:
+        raise ValueError("DER inválido: BIT STRING de la llave pública")
+    llave = decodificar_punto(datos[inicio_bits + 1:fin_bits], curva)
+    _comprobar_llave_publica(llave, curva)
+    return (llave, curva), fin
+
+
+def decodificar_llave_publica_der(datos: Union[bytes, bytearray, memoryview]) -> Tuple[PuntoElliptico, CurvaEliptica]:
+    """Inverso de codificar_llave_publica_der()"""
+    llave, fin = _leer_llave_publica_der(memoryview(datos).cast('B'), 0)
+    if fin != len(datos):
+        raise ValueError("DER inválido: datos de sobra tras la llave")
+    return llave
+
+
+def codificar_llave_privada_der(llave_privada: int, curva: CurvaEliptica) -> bytes:
+    """PKCS#8 (RFC 5208) con un ECPrivateKey de SEC1 (RFC 5915) que incluye la llave pública"""
+    if not 1 <= llave_privada < curva.q:
+        raise ValueError("La llave privada debe estar en [1, q-1]")
+    publica = codificar_punto(curva.multiplicar_generador(llave_privada), curva, comprimido=False)
+    ec_privada = _der_tlv(0x30, _der_entero(1) +
+                          _der_tlv(0x04, llave_privada.to_bytes(_ancho_escalar(curva), 'big')) +
+                          _der_tlv(0xA1, _der_tlv(0x03, b'\x00' + publica)))
+    return _der_tlv(0x30, _der_entero(0) + _der_algoritmo(curva) + _der_tlv(0x04, ec_privada))
+
+
+def _leer_ec_privada(datos, inicio: int, fin: int,
+                     curva: Optional[CurvaEliptica]) -> Tuple[int, CurvaEliptica]:
+    """Lee un ECPrivateKey de SEC1 que ocupa exactamente datos[inicio:fin]"""
+    inicio_seq, fin_seq = _der_leer(datos, inicio, 0x30)
+    if fin_seq != fin:
+        raise ValueError("DER inválido: datos de sobra tras ECPrivateKey")
+    version, pos = _der_leer_entero(datos, inicio_seq)
+    if version != 1:
+        raise ValueError(f"Versión de ECPrivateKey no soportada: {version}")
+    inicio_d, pos = _der_leer(datos, pos, 0x04)
+    d = int.from_bytes(datos[inicio_d:pos], 'big')
+    
+    # [0] ECParameters y [1] llave pública, ambos opcionales
+    if pos < fin_seq and datos[pos] == 0xA0:
+        inicio_param, fin_param = _der_leer(datos, pos, 0xA0)
+        curva_param, _ = _der_leer_parametros_curva(datos, inicio_param)
+        if curva is not None and curva_param is not curva:
+            raise ValueError("Los parámetros de ECPrivateKey no coinciden con los de PKCS#8")
+        curva = curva_param
+        pos = fin_param
+    if pos < fin_seq and datos[pos] == 0xA1:
+        _, pos = _der_leer(datos, pos, 0xA1)
+    if pos != fin_seq:
+        raise ValueError("DER inválido: campos inesperados en ECPrivateKey")
+    if curva is None:
+        raise ValueError("ECPrivateKey sin parámetros de curva")
+    if not 1 <= d < curva.q:
+        raise ValueError("La llave privada debe estar en [1, q-1]")
+    return d, curva
+
+
+def decodificar_llave_privada_der(datos: Union[bytes, bytearray, memoryview]) -> Tuple[int, CurvaEliptica]:
+    """Lee una llave privada PKCS#8 o ECPrivateKey (SEC1) en DER"""
+    vista = memoryview(datos).cast('B')
+    inicio, fin = _der_leer(vista, 0, 0x30)
+    if fin != len(vista):
+        raise ValueError("DER inválido: datos de sobra tras la llave")
+    version, pos = _der_leer_entero(vista, inicio)
+    if version == 1:
+        return _leer_ec_privada(vista, 0, fin, None)
+    if version != 0:
+        raise ValueError(f"Versión de PKCS#8 no soportada: {version}")
+    curva, pos = _der_leer_algoritmo(vista, pos)
+    inicio_octetos, fin_octetos = _der_leer(vista, pos, 0x04)
+    return _leer_ec_privada(vista, inicio_octetos, fin_octetos, curva)
+
+
+def codificar_llave_publica_compacta(llave_publica: PuntoElliptico, curva: CurvaEliptica) -> bytes:
+    """Formato compacto: id de la curva estándar (1 byte) || punto SEC1 comprimido"""
+    if curva.nombre not in _ID_COMPACTO_CURVAS:
+        raise ValueError("El formato compacto solo admite curvas estándar")
+    return bytes([_ID_COMPACTO_CURVAS[curva.nombre]]) + codificar_punto(llave_publica, curva)
+
+
+def decodificar_llave_publica_compacta(datos: Union[bytes, bytearray, memoryview]) -> Tuple[PuntoElliptico, CurvaEliptica]:
+    """Inverso de codificar_llave_publica_compacta()"""
+    if not datos or datos[0] not in _CURVAS_POR_ID_COMPACTO:
+        raise ValueError("Identificador de curva compacto desconocido")
+    curva = obtener_curva(_CURVAS_POR_ID_COMPACTO[datos[0]])
+    llave = decodificar_punto(datos[1:], curva)
+    _comprobar_llave_publica(llave, curva)
+    return llave, curva
+
+
+def codificar_llave_privada_compacta(llave_privada: int, curva: CurvaEliptica) -> bytes:
+    """Formato compacto: id de la curva estándar (1 byte) || d con el ancho de q"""
+    if curva.nombre not in _ID_COMPACTO_CURVAS:
+        raise ValueError("El formato compacto solo admite curvas estándar")
+    if not 1 <= llave_privada < curva.q:
+        raise ValueError("La llave privada debe estar en [1, q-1]")
+    return bytes([_ID_COMPACTO_CURVAS[curva.nombre]]) + llave_privada.to_bytes(_ancho_escalar(curva), 'big')
+
+
+def decodificar_llave_privada_compacta(datos: Union[bytes, bytearray, memoryview]) -> Tuple[int, CurvaEliptica]:
+    """Inverso de codificar_llave_privada_compacta()"""
+    if not datos or datos[0] not in _CURVAS_POR_ID_COMPACTO:
+        raise ValueError("Identificador de curva compacto desconocido")
+    curva = obtener_curva(_CURVAS_POR_ID_COMPACTO[datos[0]])
+    if len(datos) != 1 + _ancho_escalar(curva):
+        raise ValueError("Longitud de llave privada compacta incorrecta")
+    d = int.from_bytes(datos[1:], 'big')
+    if not 1 <= d < curva.q:
+        raise ValueError("La llave privada debe estar en [1, q-1]")
+    return d, curva
+
+
+def der_a_pem(der: bytes, etiqueta: str) -> str:
+    """PEM con el Base64 partido en líneas de 64 columnas"""
+    texto = base64.b64encode(der).decode('ascii')
+    lineas = [texto[i:i + 64] for i in range(0, len(texto), 64)]
+    return f"-----BEGIN {etiqueta}-----\n" + "\n".join(lineas) + f"\n-----END {etiqueta}-----\n"
+
+
+def _bloques_pem(texto: str) -> List[Tuple[str, str]]:
+    """(etiqueta, cuerpo) de cada bloque PEM del texto"""
+    return [(m.group(1), m.group(2)) for m in _BLOQUE_PEM.finditer(texto)]
+
+
+def _base64_de_pem(cuerpo: str) -> bytes:
+    """Base64 de un bloque PEM, aunque venga partido en varias líneas"""
+    return base64.b64decode(''.join(cuerpo.split()), validate=True)
+
+
+def _campos_texto(lineas: Iterable[str]) -> Dict[str, str]:
+    """
+    Campos del formato de texto clásico
+    
+    Las líneas clave=valor con un campo conocido se leen tal cual; los
+    comentarios (#) y cabeceras (Formato: ...) se ignoran; el resto se toma
+    como Base64 (puede venir en varias líneas) de más campos clave=valor.
+    """
+    campos = {}
+    trozos_base64 = []
+    for linea in lineas:
+        linea = linea.strip()
+        if not linea or linea.startswith('#'):
+            continue
+        coincidencia = _CAMPOS_TEXTO.match(linea)
+        if coincidencia:
+            campos[coincidencia.group(1)] = coincidencia.group(2).strip()
+        elif ':' in linea:
+            continue
+        else:
+            trozos_base64.append(linea)
+    
+    if trozos_base64:
+        try:
+            decodificado = base64.b64decode(''.join(trozos_base64), validate=True).decode('utf-8')
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError(f"Base64 inválido en la llave: {e}")
+        for linea in decodificado.split('\n'):
+            coincidencia = _CAMPOS_TEXTO.match(linea.strip())
+            if coincidencia:
+                campos[coincidencia.group(1)] = coincidencia.group(2).strip()
+            elif linea.strip():
+                raise ValueError(f"Campo desconocido en la llave: {linea.strip()!r}")
+    return campos
+
+
+def _llave_desde_campos(campos: Dict[str, str], privada: bool):
+    """Construye (llave, curva) a partir de los campos del formato de texto"""
+    try:
+        curva = curva_compartida(
+            p=int(campos['p']),
+            a=int(campos['a']),
+            b=int(campos['b']),
+            G=(int(campos['Gx']), int(campos['Gy'])),
+            q=int(campos['q'])
+        )
+        if privada:
+            d = int(campos['d'])
+            if not 1 <= d < curva.q:
+                raise ValueError("La llave privada debe estar en [1, q-1]")
+            return d, curva
+        if 'Q' in campos:
+            llave = decodificar_punto(bytes.fromhex(campos['Q']), curva)
+        else:
+            llave = PuntoElliptico(int(campos['Qx']), int(campos['Qy']))
+    except KeyError as e:
+        raise ValueError(f"Falta el campo {e} en la llave")
+    _comprobar_llave_publica(llave, curva)
+    return llave, curva
+
+
+def _comprobar_llave_publica(llave: PuntoElliptico, curva: CurvaEliptica):
+    """ValueError si la llave no pasa CurvaEliptica.es_llave_publica_valida()"""
+    if not curva.es_llave_publica_valida(llave):
+        raise ValueError("La llave pública no es un punto válido del subgrupo de la curva")
+
+
+def cargar_llaves_publicas(contenido: Union[str, bytes, bytearray, memoryview]) -> List[Tuple[PuntoElliptico, CurvaEliptica]]:
+    """
+    Carga todas las llaves públicas de un buffer
     
-    llave_privada = datos['d']
+    Admite bloques PEM concatenados ("PUBLIC KEY" y el "ECDSA PUBLIC KEY" de
+    texto), SubjectPublicKeyInfo DER concatenados, llaves compactas
+    concatenadas o un único archivo de texto clave=valor.
     
-    return llave_privada, curva
+    Returns:
+        Lista de (llave_publica, curva) en el orden del buffer
+    """
+    if isinstance(contenido, str):
+        contenido = contenido.encode('utf-8')
+    vista = memoryview(contenido).cast('B')
+    llaves = []
+    
+    if len(vista) and vista[0] == 0x30:
+        pos = 0
+        while pos < len(vista):
+            llave, pos = _leer_llave_publica_der(vista, pos)
+            llaves.append(llave)
+        return llaves
+    
+    if len(vista) and vista[0] in _CURVAS_POR_ID_COMPACTO:
+        pos = 0
+        while pos < len(vista):
+            nombre = _CURVAS_POR_ID_COMPACTO.get(vista[pos])
+            if nombre is None:
+                raise ValueError(f"Identificador de curva compacto desconocido en el byte {pos}")
+            curva = obtener_curva(nombre)
+            tam = 2 + ancho_coordenada(curva)
+            llaves.append(decodificar_llave_publica_compacta(vista[pos:pos + tam]))
+            pos += tam
+        return llaves
+    
+    texto = bytes(vista).decode('utf-8')
+    bloques = _bloques_pem(texto)
+    if not bloques:
+        return [_llave_desde_campos(_campos_texto(texto.splitlines()), privada=False)]
+    for etiqueta, cuerpo in bloques:
+        if etiqueta == "PUBLIC KEY":
+            llaves.append(decodificar_llave_publica_der(_base64_de_pem(cuerpo)))
+        elif etiqueta == "ECDSA PUBLIC KEY":
+            llaves.append(_llave_desde_campos(_campos_texto(cuerpo.splitlines()), privada=False))
+        else:
+            raise ValueError(f"Bloque PEM inesperado: {etiqueta}")
+    return llaves
+
+
+def _escribir_llave(nombre_archivo: str, datos: bytes, formato: str, etiqueta: str):
+    """Escribe una llave binaria como DER/compacta o envuelta en PEM"""
+    if formato == 'pem':
+        if datos[:1] != b'\x30':
+            raise ValueError("El formato compacto no se puede guardar como PEM")
+        with open(nombre_archivo, 'w', encoding='utf-8') as f:
+            f.write(der_a_pem(datos, etiqueta))
+    elif formato in ('der', 'compacta'):
+        with open(nombre_archivo, 'wb') as f:
+            f.write(datos)
+    else:
+        raise ValueError(f"Formato de llave desconocido: {formato}")
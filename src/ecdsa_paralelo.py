@@ -0,0 +1,223 @@
+"""
+Firma y verificación masiva en varios procesos
+
+ECDSA es Python puro y el GIL lo limita a un núcleo. MotorParalelo reparte
+bloques de firmas o verificaciones entre procesos de un ProcessPoolExecutor.
+Cada proceso recibe la curva y las llaves una sola vez, al arrancar, y
+construye ahí sus tablas de precomputación.
+"""
+
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Tuple, Optional, List, Dict, Iterable, Iterator, Union, Hashable
+
+# Agregar el directorio actual al path para importar ecdsa_core
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ecdsa_core import (
+    CurvaEliptica, ECDSA, PuntoElliptico, LlaveVerificacion, CacheLlavesVerificacion, Mensaje,
+    obtener_curva, curva_compartida
+)
+
+
+# Estado de cada proceso trabajador (lo fija _inicializar_trabajador)
+_ecdsa_trabajador = None
+_llaves_trabajador = {}
+_llave_privada_trabajador = None
+
+
+def _describir_curva(curva: CurvaEliptica) -> tuple:
+    """Descripción serializable de la curva: su nombre o sus parámetros"""
+    if curva.nombre is not None:
+        return ('nombre', curva.nombre)
+    return ('parametros', curva.p, curva.a, curva.b, (curva.G.x, curva.G.y), curva.q)
+
+
+def _reconstruir_curva(descripcion: tuple) -> CurvaEliptica:
+    """Inverso de _describir_curva, dentro del proceso trabajador"""
+    if descripcion[0] == 'nombre':
+        return obtener_curva(descripcion[1])
+    _, p, a, b, G, q = descripcion
+    return curva_compartida(p, a, b, G, q)
+
+
+def _inicializar_trabajador(descripcion_curva: tuple, algoritmo_hash, nonces_deterministas: bool,
+                            llaves: Dict[Hashable, Tuple[int, int]], llave_privada: Optional[int],
+                            ventana: int):
+    """Se ejecuta una vez por proceso: curva, llaves y tablas precalculadas"""
+    global _ecdsa_trabajador, _llaves_trabajador, _llave_privada_trabajador
+    curva = _reconstruir_curva(descripcion_curva)
+    _ecdsa_trabajador = ECDSA(curva, cache_llaves=CacheLlavesVerificacion(ventana=ventana),
+                              algoritmo_hash=algoritmo_hash,
+                              nonces_deterministas=nonces_deterministas)
+    _llaves_trabajador = {
+        id_llave: _ecdsa_trabajador.cache_llaves.obtener(PuntoElliptico(x, y), curva)
+        for id_llave, (x, y) in llaves.items()
+    }
+    _llave_privada_trabajador = llave_privada
+
+
+def _verificar_bloque(bloque: List[tuple]) -> List[bool]:
+    """Verifica un bloque de (mensaje, firma, llave) en el trabajador"""
+    elementos = []
+    for mensaje, firma, llave in bloque:
+        if not isinstance(llave, PuntoElliptico):
+            llave = _llaves_trabajador[llave]
+        elementos.append((mensaje, firma, llave))
+    return _ecdsa_trabajador.verificar_lote(elementos)
+
+
+def _firmar_bloque(mensajes: List[Mensaje]) -> List[Tuple[int, int]]:
+    """Firma un bloque de mensajes con la llave privada del trabajador"""
+    return _ecdsa_trabajador.firmar_lote(mensajes, _llave_privada_trabajador)
+
+
+def _serializable(mensaje: Mensaje) -> Union[str, bytes, bytearray]:
+    """memoryview no se puede enviar a otro proceso; se copia a bytes"""
+    if isinstance(mensaje, memoryview):
+        return mensaje.tobytes()
+    return mensaje
+
+
+class MotorParalelo:
+    """
+    Motor de firma y verificación masiva sobre un pool de procesos
+    
+    Las entradas se consumen de forma perezosa en bloques de tam_bloque; como
+    mucho hay max_pendientes bloques en vuelo, así que la memoria no crece con
+    el tamaño de la entrada. Los resultados se devuelven en orden o según van
+    terminando.
+    """
+    
+    def __init__(self, curva: CurvaEliptica,
+                 llaves_publicas: Optional[Dict[Hashable, PuntoElliptico]] = None,
+                 llave_privada: Optional[int] = None, procesos: Optional[int] = None,
+                 tam_bloque: int = 256, max_pendientes: Optional[int] = None,
+                 algoritmo_hash=None, nonces_deterministas: bool = False,
+                 ventana: int = LlaveVerificacion.VENTANA_POR_DEFECTO):
+        """
+        Args:
+            curva: Curva elíptica de todas las firmas
+            llaves_publicas: Llaves conocidas {identificador: punto}; se envían
+                             una vez a cada proceso y en las verificaciones
+                             basta con indicar su identificador
+            llave_privada: Llave con la que firma firmar()
+            procesos: Número de procesos (por defecto os.cpu_count())
+            tam_bloque: Elementos por tarea enviada a un proceso
+            max_pendientes: Bloques en vuelo como máximo (por defecto 2 por proceso)
+            algoritmo_hash: Como en ECDSA (un nombre de hashlib o un constructor serializable)
+            nonces_deterministas: Como en ECDSA
+            ventana: Ancho de ventana de las tablas de las llaves públicas
+        """
+        if tam_bloque < 1:
+            raise ValueError("tam_bloque debe ser al menos 1")
+        self.curva = curva
+        self.procesos = procesos or os.cpu_count() or 1
+        self.tam_bloque = tam_bloque
+        self.max_pendientes = max_pendientes or 2 * self.procesos
+        self._tiene_llave_privada = llave_privada is not None
+        
+        llaves = {
+            id_llave: _como_coordenadas(llave)
+            for id_llave, llave in (llaves_publicas or {}).items()
+        }
+        self._ejecutor = ProcessPoolExecutor(
+            max_workers=self.procesos,
+            initializer=_inicializar_trabajador,
+            initargs=(_describir_curva(curva), algoritmo_hash, nonces_deterministas,
+                      llaves, llave_privada, ventana)
+        )
+    
+    def _bloques(self, elementos: Iterable) -> Iterator[list]:
+        """Agrupa la entrada en listas de tam_bloque elementos"""
+        bloque = []
+        for elemento in elementos:
+            bloque.append(elemento)
+            if len(bloque) == self.tam_bloque:
+                yield bloque
+                bloque = []
+        if bloque:
+            yield bloque
+    
+    def _ejecutar(self, funcion, bloques: Iterator[list], ordenado: bool) -> Iterator:
+        """
+        Envía los bloques al pool con como mucho max_pendientes en vuelo
+        
+        Con ordenado=True devuelve los resultados en el orden de la entrada;
+        si no, devuelve (indice, resultado) según terminan los bloques.
+        """
+        pendientes = deque()
+        inicio = 0
+        for bloque in bloques:
+            pendientes.append((inicio, self._ejecutor.submit(funcion, bloque)))
+            inicio += len(bloque)
+            while len(pendientes) >= self.max_pendientes:
+                yield from self._recoger(pendientes, ordenado)
+        while pendientes:
+            yield from self._recoger(pendientes, ordenado)
+    
+    @staticmethod
+    def _recoger(pendientes: deque, ordenado: bool) -> Iterator:
+        """Espera a que termine un bloque y devuelve sus resultados"""
+        if ordenado:
+            _, futuro = pendientes.popleft()
+            yield from futuro.result()
+            return
+        
+        terminados, _ = wait([futuro for _, futuro in pendientes], return_when=FIRST_COMPLETED)
+        for inicio, futuro in [par for par in pendientes if par[1] in terminados]:
+            pendientes.remove((inicio, futuro))
+            for desplazamiento, resultado in enumerate(futuro.result()):
+                yield inicio + desplazamiento, resultado
+    
+    def verificar(self, elementos: Iterable[Tuple[Mensaje, Tuple[int, int], object]],
+                  ordenado: bool = True) -> Iterator:
+        """
+        Verifica muchas firmas en paralelo
+        
+        Args:
+            elementos: Iterable de (mensaje, firma, llave), donde la llave es
+                       un identificador de llaves_publicas o un PuntoElliptico
+                       (que entonces viaja con cada elemento)
+            ordenado: Si es True se devuelven los bool en el orden de entrada;
+                      si no, pares (indice, bool) según terminan
+        """
+        preparados = (
+            (_serializable(mensaje), tuple(firma),
+             llave.punto if isinstance(llave, LlaveVerificacion) else llave)
+            for mensaje, firma, llave in elementos
+        )
+        return self._ejecutar(_verificar_bloque, self._bloques(preparados), ordenado)
+    
+    def firmar(self, mensajes: Iterable[Mensaje], ordenado: bool = True) -> Iterator:
+        """
+        Firma muchos mensajes en paralelo con la llave privada del motor
+        
+        Args:
+            mensajes: Iterable de mensajes
+            ordenado: Si es True se devuelven las firmas en el orden de entrada;
+                      si no, pares (indice, firma) según terminan
+        """
+        if not self._tiene_llave_privada:
+            raise ValueError("El motor no tiene llave privada")
+        preparados = (_serializable(mensaje) for mensaje in mensajes)
+        return self._ejecutar(_firmar_bloque, self._bloques(preparados), ordenado)
+    
+    def cerrar(self):
+        """Detiene los procesos trabajadores"""
+        self._ejecutor.shutdown(wait=True)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def _como_coordenadas(llave: PuntoElliptico) -> Tuple[int, int]:
+    """Coordenadas (x, y) de una llave pública, para enviarla a los trabajadores"""
+    if llave.es_infinito:
+        raise ValueError("La llave pública no puede ser el punto en el infinito")
+    return (llave.x, llave.y)
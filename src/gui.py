@@ -15,10 +15,11 @@ import base64
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from ecdsa_core import (
-    CurvaEliptica, ECDSA, PuntoElliptico,
+    ECDSA, PuntoElliptico,
     exportar_llave_publica, importar_llave_publica,
     exportar_llave_privada, importar_llave_privada,
-    crear_curva_ejemplo
+    exportar_firma, importar_firma, decodificar_firma_der, decodificar_firma_raw,
+    crear_curva_ejemplo, obtener_curva, curva_compartida, CURVAS_ESTANDAR
 )
 
 
@@ -143,6 +144,8 @@ class AplicacionECDSA:
                   command=self.firmar_mensaje).pack(side='left', padx=5)
         ttk.Button(frame_botones, text="Guardar Firma", 
                   command=self.guardar_firma).pack(side='left', padx=5)
+        ttk.Button(frame_botones, text="Firmar Archivo (Firma Separada)", 
+                  command=self.firmar_archivo).pack(side='left', padx=5)
     
     def crear_tab_verificar(self):
         """Crea la pestaña de verificación de firmas"""
@@ -206,6 +209,10 @@ class AplicacionECDSA:
         
         ttk.Button(frame_botones, text="Verificar Firma (Paso a Paso)", 
                   command=self.verificar_firma).pack(side='left', padx=5)
+        ttk.Button(frame_botones, text="Verificar Archivo (Firma Separada)", 
+                  command=self.verificar_archivo).pack(side='left', padx=5)
+        ttk.Button(frame_botones, text="Identificar Firmante", 
+                  command=self.identificar_firmante).pack(side='left', padx=5)
     
     def crear_tab_curva(self):
         """Crea la pestaña de configuración de curva"""
@@ -249,6 +256,13 @@ class AplicacionECDSA:
         ttk.Button(frame_botones, text="Aplicar Curva", 
                   command=self.aplicar_curva).pack(side='left', padx=5)
         
+        # Curvas estándar (secp256k1, P-256, P-384)
+        self.var_curva_estandar = tk.StringVar(value=next(iter(CURVAS_ESTANDAR)))
+        ttk.Combobox(frame_botones, textvariable=self.var_curva_estandar, state='readonly',
+                     values=list(CURVAS_ESTANDAR), width=12).pack(side='left', padx=(20, 5))
+        ttk.Button(frame_botones, text="Cargar Curva Estándar", 
+                  command=self.cargar_curva_estandar).pack(side='left', padx=5)
+        
         # Mostrar curva actual
         self.actualizar_info_curva()
     
@@ -285,6 +299,8 @@ class AplicacionECDSA:
         curva = self.curva_defecto
         
         texto = f"=== CURVA ELÍPTICA ACTUAL ===\n\n"
+        if curva.nombre:
+            texto += f"Curva estándar: {curva.nombre}\n"
         texto += f"Ecuación: y² = x³ + {curva.a}x + {curva.b} (mod {curva.p})\n\n"
         texto += f"Parámetros:\n"
         texto += f"  • Primo p = {curva.p}\n"
@@ -326,7 +342,7 @@ class AplicacionECDSA:
         
         nombre_archivo = filedialog.asksaveasfilename(
             defaultextension=".pem",
-            filetypes=[("Archivos PEM", "*.pem"), ("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")],
+            filetypes=[("Archivos PEM", "*.pem"), ("Archivos DER", "*.der"), ("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")],
             initialfile=f"llave_publica_{usuario}.pem"
         )
         
@@ -357,7 +373,7 @@ class AplicacionECDSA:
         
         nombre_archivo = filedialog.asksaveasfilename(
             defaultextension=".pem",
-            filetypes=[("Archivos PEM", "*.pem"), ("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")],
+            filetypes=[("Archivos PEM", "*.pem"), ("Archivos DER", "*.der"), ("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")],
             initialfile=f"llave_privada_{usuario}.pem"
         )
         
@@ -368,7 +384,7 @@ class AplicacionECDSA:
     def importar_publica(self):
         """Importa una llave pública"""
         nombre_archivo = filedialog.askopenfilename(
-            filetypes=[("Archivos PEM", "*.pem"), ("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")]
+            filetypes=[("Archivos PEM", "*.pem"), ("Archivos DER", "*.der"), ("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")]
         )
         
         if nombre_archivo:
@@ -387,7 +403,7 @@ class AplicacionECDSA:
     def importar_privada(self):
         """Importa una llave privada"""
         nombre_archivo = filedialog.askopenfilename(
-            filetypes=[("Archivos PEM", "*.pem"), ("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")]
+            filetypes=[("Archivos PEM", "*.pem"), ("Archivos DER", "*.der"), ("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")]
         )
         
         if nombre_archivo:
@@ -400,7 +416,7 @@ class AplicacionECDSA:
                 
                 # Calcular llave pública
                 ecdsa = ECDSA(curva)
-                llave_publica = curva.multiplicar_escalar(llave_privada, curva.G)
+                llave_publica = curva.multiplicar_generador(llave_privada)
                 self.usuarios[usuario]['llave_publica'] = llave_publica
                 
                 self.actualizar_info_llaves()
@@ -460,18 +476,46 @@ class AplicacionECDSA:
     def cargar_firma(self):
         """Carga una firma desde un archivo"""
         nombre_archivo = filedialog.askopenfilename(
-            filetypes=[("Archivos de firma", "*.sig"), ("Archivos de texto", "*.txt"), ("Todos los archivos", "*.*")]
+            filetypes=[("Archivos de firma", "*.sig"), ("Firma binaria DER", "*.der"),
+                       ("Firma binaria r||s", "*.raw"), ("Archivos de texto", "*.txt"),
+                       ("Todos los archivos", "*.*")]
         )
         
-        if nombre_archivo:
+        if nombre_archivo and nombre_archivo.lower().endswith(('.der', '.raw')):
+            # Firmas binarias: DER o r||s con el ancho de q de la curva del firmante
+            try:
+                with open(nombre_archivo, 'rb') as f:
+                    datos = f.read()
+                if nombre_archivo.lower().endswith('.der'):
+                    r, s = decodificar_firma_der(datos)
+                else:
+                    firmante = self.var_firmante.get()
+                    curva = self.usuarios.get(firmante, {}).get('curva') or self.curva_defecto
+                    r, s = decodificar_firma_raw(datos, curva)
+                self.entry_r.delete(0, tk.END)
+                self.entry_r.insert(0, str(r))
+                self.entry_s.delete(0, tk.END)
+                self.entry_s.insert(0, str(s))
+                messagebox.showinfo("Éxito", "Firma cargada desde archivo")
+            except Exception as e:
+                messagebox.showerror("Error", f"Error al cargar firma:\n{e}")
+        elif nombre_archivo:
             try:
                 with open(nombre_archivo, 'r', encoding='utf-8') as f:
                     contenido = f.read()
                 
                 lineas = contenido.strip().split('\n')
                 
+                if "-----BEGIN ECDSA SIGNATURE-----" in contenido:
+                    # Firma separada: solo r, s y metadatos
+                    (r, s), _ = importar_firma(nombre_archivo)
+                    self.entry_r.delete(0, tk.END)
+                    self.entry_r.insert(0, str(r))
+                    self.entry_s.delete(0, tk.END)
+                    self.entry_s.insert(0, str(s))
+                
                 # Formato nuevo: primera línea = mensaje, segunda línea = Base64
-                if len(lineas) >= 2:
+                elif len(lineas) >= 2:
                     # Decodificar Base64 de la última línea
                     firma_base64 = lineas[-1].strip()
                     firma_decodificada = base64.b64decode(firma_base64).decode('utf-8')
@@ -491,6 +535,85 @@ class AplicacionECDSA:
             except Exception as e:
                 messagebox.showerror("Error", f"Error al cargar firma:\n{e}")
     
+    def firmar_archivo(self):
+        """Firma un archivo y guarda la firma separada (.sig) sin el contenido"""
+        usuario = self.usuario_actual.get()
+        info = self.usuarios[usuario]
+        
+        if not info['llave_privada']:
+            messagebox.showerror("Error", f"{usuario} no tiene llave privada.\nGenera o importa una primero.")
+            return
+        
+        archivo = filedialog.askopenfilename(title="Archivo a firmar")
+        if not archivo:
+            return
+        
+        nombre_firma = filedialog.asksaveasfilename(
+            defaultextension=".sig",
+            filetypes=[("Archivos de firma", "*.sig"), ("Todos los archivos", "*.*")],
+            initialfile=os.path.basename(archivo) + ".sig"
+        )
+        if not nombre_firma:
+            return
+        
+        try:
+            ecdsa = ECDSA(info['curva'])
+            r, s = ecdsa.firmar_archivo(archivo, info['llave_privada'])
+            exportar_firma((r, s), nombre_firma, {
+                'archivo': os.path.basename(archivo),
+                'tamano': os.path.getsize(archivo),
+                'firmante': usuario,
+            }, algoritmo_hash=ecdsa.nombre_hash)
+            
+            self.texto_firma.delete(1.0, tk.END)
+            self.texto_firma.insert(1.0, f"Archivo: {archivo}\nr={r}\ns={s}")
+            messagebox.showinfo("Éxito", f"Firma separada guardada en:\n{nombre_firma}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al firmar archivo:\n{e}")
+    
+    def verificar_archivo(self):
+        """Verifica un archivo contra su firma separada (.sig)"""
+        firmante = self.var_firmante.get()
+        if firmante == "Otra (importar)":
+            messagebox.showinfo("Importar", "Por favor importa la llave pública del firmante en la pestaña 'Gestión de Llaves'")
+            return
+        
+        info = self.usuarios[firmante]
+        if not info['llave_publica']:
+            messagebox.showerror("Error", f"{firmante} no tiene llave pública.\nImporta o genera una primero.")
+            return
+        
+        archivo = filedialog.askopenfilename(title="Archivo a verificar")
+        if not archivo:
+            return
+        nombre_firma = filedialog.askopenfilename(
+            title="Firma separada",
+            filetypes=[("Archivos de firma", "*.sig"), ("Todos los archivos", "*.*")]
+        )
+        if not nombre_firma:
+            return
+        
+        try:
+            firma, metadatos = importar_firma(nombre_firma)
+            if 'tamano' in metadatos and int(metadatos['tamano']) != os.path.getsize(archivo):
+                valida = False
+            else:
+                ecdsa = ECDSA(info['curva'], algoritmo_hash=metadatos.get('hash'))
+                valida = ecdsa.verificar_archivo(archivo, firma, info['llave_publica'])
+            
+            resultado = f"Archivo: {archivo}\nFirma: {nombre_firma}\n"
+            resultado += f"Firmante: {firmante}\n(r={firma[0]}, s={firma[1]})\n\n"
+            resultado += f"RESULTADO FINAL: {'FIRMA VÁLIDA' if valida else 'FIRMA INVÁLIDA'}\n"
+            self.texto_verificacion.delete(1.0, tk.END)
+            self.texto_verificacion.insert(1.0, resultado)
+            
+            if valida:
+                messagebox.showinfo("Verificación", "✓ La firma es VÁLIDA")
+            else:
+                messagebox.showwarning("Verificación", "✗ La firma es INVÁLIDA")
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al verificar archivo:\n{e}")
+    
     def verificar_firma(self):
         """Verifica una firma paso a paso"""
         mensaje = self.texto_mensaje_verificar.get(1.0, tk.END).strip()
@@ -547,7 +670,7 @@ class AplicacionECDSA:
             resultado += "=" * 60 + "\n\n"
             
             # Mostrar cada paso
-            for key in ['paso_0', 'hash', 'paso_1', 'paso_2', 'paso_3', 'paso_4']:
+            for key in ['paso_0', 'paso_llave', 'hash', 'paso_1', 'paso_2', 'paso_3', 'paso_4']:
                 if key in pasos:
                     paso = pasos[key]
                     resultado += f"{paso['titulo']}\n"
@@ -580,10 +703,36 @@ class AplicacionECDSA:
         except Exception as e:
             messagebox.showerror("Error", f"Error al verificar firma:\n{e}")
     
+    def identificar_firmante(self):
+        """Recupera las llaves candidatas de la firma y selecciona al usuario que coincide"""
+        mensaje = self.texto_mensaje_verificar.get(1.0, tk.END).strip()
+        try:
+            r = int(self.entry_r.get())
+            s = int(self.entry_s.get())
+        except ValueError:
+            messagebox.showerror("Error", "r y s deben ser números enteros")
+            return
+        
+        for usuario, info in self.usuarios.items():
+            if not info['llave_publica']:
+                continue
+            candidatos = ECDSA(info['curva']).candidatos_llave_publica(mensaje, (r, s))
+            if any(llave == info['llave_publica'] for _, llave in candidatos):
+                self.var_firmante.set(usuario)
+                messagebox.showinfo("Firmante", f"La firma corresponde a la llave de {usuario}")
+                return
+        messagebox.showwarning("Firmante", "La firma no corresponde a ninguna llave conocida")
+    
     def cargar_curva_ejemplo(self):
         """Carga los parámetros de la curva de ejemplo"""
-        curva = crear_curva_ejemplo()
-        
+        self.mostrar_parametros_curva(crear_curva_ejemplo())
+    
+    def cargar_curva_estandar(self):
+        """Carga los parámetros de la curva estándar seleccionada"""
+        self.mostrar_parametros_curva(obtener_curva(self.var_curva_estandar.get()))
+    
+    def mostrar_parametros_curva(self, curva):
+        """Copia los parámetros de una curva a las entradas de la pestaña"""
         self.entries_curva['p'].delete(0, tk.END)
         self.entries_curva['p'].insert(0, str(curva.p))
         
@@ -612,7 +761,7 @@ class AplicacionECDSA:
             Gy = int(self.entries_curva['Gy'].get())
             q = int(self.entries_curva['q'].get())
             
-            self.curva_defecto = CurvaEliptica(p, a, b, (Gx, Gy), q)
+            self.curva_defecto = curva_compartida(p, a, b, (Gx, Gy), q)
             self.actualizar_info_curva()
             
             messagebox.showinfo("Éxito", "Curva actualizada exitosamente")
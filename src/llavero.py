@@ -0,0 +1,292 @@
+"""
+Llavero en disco para millones de llaves públicas
+
+Un solo archivo con una tabla hash de índices y un arreglo de ranuras de
+ancho fijo, abierto con mmap. Buscar una llave es leer unas pocas entradas
+del índice y dos coordenadas: no se analiza texto ni se cargan las demás
+llaves en memoria.
+
+Formato del archivo:
+    cabecera   MAGIA, versión, tamaño de los parámetros, capacidad, ranuras
+               usadas y activas; después los ECParameters DER de la curva
+    índice     2 * capacidad entradas de 4 bytes (0 = libre, si no ranura + 1),
+               direccionamiento abierto con sondeo lineal
+    ranuras    capacidad ranuras: estado (1 byte) || clave (32) || x || y
+
+La clave de cada llave es el SHA-256 de su identificador (por defecto la
+huella de la llave). Eliminar solo marca la ranura; compactar() reescribe
+el archivo sin las ranuras eliminadas. Al llenarse, el archivo se reescribe
+con el doble de capacidad. Las reescrituras sustituyen el archivo: otros
+procesos que lo tengan abierto siguen viendo la versión anterior hasta que
+lo vuelvan a abrir.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from typing import Tuple, Optional, Iterator, Union
+
+# Agregar el directorio actual al path para importar ecdsa_core
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ecdsa_core import (
+    CurvaEliptica, PuntoElliptico, codificar_punto, ancho_coordenada,
+    codificar_parametros_curva_der, decodificar_parametros_curva_der
+)
+
+
+MAGIA = b'ECDSALLV'
+VERSION = 1
+_CABECERA = struct.Struct('<8sIIQQQ')
+_ENTRADA = struct.Struct('<I')
+_TAM_CLAVE = 32
+
+# Estado de una ranura (las que aún no se han usado están a cero)
+_ACTIVA, _ELIMINADA = 1, 2
+
+Identificador = Union[str, bytes, bytearray]
+
+
+def huella_llave(llave_publica: PuntoElliptico, curva: CurvaEliptica) -> bytes:
+    """Huella de una llave pública: SHA-256 de su codificación SEC1 comprimida"""
+    return hashlib.sha256(codificar_punto(llave_publica, curva)).digest()
+
+
+def _clave(identificador: Identificador) -> bytes:
+    """Clave de 32 bytes con la que se indexa un identificador"""
+    if isinstance(identificador, str):
+        identificador = identificador.encode('utf-8')
+    return hashlib.sha256(identificador).digest()
+
+
+def _parametros(curva: CurvaEliptica) -> tuple:
+    """(p, a, b, Gx, Gy, q) reducidos módulo p, para comparar curvas"""
+    p = curva.p
+    return (p, curva.a % p, curva.b % p, curva.G.x % p, curva.G.y % p, curva.q)
+
+
+class Llavero:
+    """
+    Almacén de llaves públicas de una curva en un archivo mapeado en memoria
+    
+    Si el archivo no existe se crea (hace falta la curva). Abierto en
+    solo_lectura, las búsquedas funcionan pero agregar, eliminar y compactar
+    lanzan ValueError.
+    """
+    
+    def __init__(self, ruta: str, curva: Optional[CurvaEliptica] = None,
+                 capacidad: int = 1024, solo_lectura: bool = False):
+        """
+        Args:
+            ruta: Archivo del llavero
+            curva: Curva de las llaves (obligatoria al crear; si se da al
+                   abrir, debe coincidir con la del archivo)
+            capacidad: Ranuras iniciales al crear el archivo
+            solo_lectura: Abrir sin permiso de escritura
+        """
+        self.ruta = ruta
+        self.solo_lectura = solo_lectura
+        if not os.path.exists(ruta):
+            if curva is None:
+                raise ValueError("Para crear un llavero hace falta la curva")
+            if solo_lectura:
+                raise FileNotFoundError(ruta)
+            self._escribir_archivo(ruta, curva, max(capacidad, 1), iter(()))
+        self._abrir()
+        if curva is not None and _parametros(curva) != _parametros(self.curva):
+            self.cerrar()
+            raise ValueError("La curva no coincide con la del llavero")
+    
+    @staticmethod
+    def _escribir_archivo(ruta: str, curva: CurvaEliptica, capacidad: int,
+                          llaves: Iterator[Tuple[bytes, bytes]]):
+        """Escribe un llavero nuevo con las ranuras (clave, coordenadas) dadas"""
+        parametros = codificar_parametros_curva_der(curva)
+        inicio_indice = -(-(_CABECERA.size + len(parametros)) // 64) * 64
+        capacidad = 1 << (capacidad - 1).bit_length()
+        tam_ranura = 1 + _TAM_CLAVE + 2 * ancho_coordenada(curva)
+        mascara = 2 * capacidad - 1
+        
+        indice = bytearray(4 * 2 * capacidad)
+        ranuras = bytearray()
+        usadas = 0
+        for clave, coordenadas in llaves:
+            i = int.from_bytes(clave[:8], 'little') & mascara
+            while _ENTRADA.unpack_from(indice, 4 * i)[0]:
+                i = (i + 1) & mascara
+            _ENTRADA.pack_into(indice, 4 * i, usadas + 1)
+            ranuras += bytes([_ACTIVA]) + clave + coordenadas
+            usadas += 1
+        
+        with open(ruta, 'wb') as f:
+            f.write(_CABECERA.pack(MAGIA, VERSION, len(parametros), capacidad, usadas, usadas))
+            f.write(parametros)
+            f.write(bytes(inicio_indice - _CABECERA.size - len(parametros)))
+            f.write(indice)
+            f.write(ranuras)
+            f.truncate(inicio_indice + len(indice) + capacidad * tam_ranura)
+    
+    def _abrir(self):
+        """Mapea el archivo y lee la cabecera"""
+        self._archivo = open(self.ruta, 'rb' if self.solo_lectura else 'r+b')
+        acceso = mmap.ACCESS_READ if self.solo_lectura else mmap.ACCESS_WRITE
+        self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=acceso)
+        magia, version, tam_parametros, self.capacidad, self._usadas, self._activas = \
+            _CABECERA.unpack_from(self._mapa, 0)
+        if magia != MAGIA or version != VERSION:
+            self.cerrar()
+            raise ValueError("El archivo no es un llavero de esta versión")
+        fin_parametros = _CABECERA.size + tam_parametros
+        self.curva = decodificar_parametros_curva_der(self._mapa[_CABECERA.size:fin_parametros])
+        self._ancho = ancho_coordenada(self.curva)
+        self._tam_ranura = 1 + _TAM_CLAVE + 2 * self._ancho
+        self._mascara = 2 * self.capacidad - 1
+        self._inicio_indice = -(-fin_parametros // 64) * 64
+        self._inicio_ranuras = self._inicio_indice + 4 * 2 * self.capacidad
+    
+    def _buscar(self, clave: bytes) -> Tuple[int, int]:
+        """Posición en el índice de la clave y su ranura (-1 si no está)"""
+        mapa = self._mapa
+        i = int.from_bytes(clave[:8], 'little') & self._mascara
+        while True:
+            valor = _ENTRADA.unpack_from(mapa, self._inicio_indice + 4 * i)[0]
+            if not valor:
+                return i, -1
+            inicio = self._inicio_ranuras + (valor - 1) * self._tam_ranura + 1
+            if mapa[inicio:inicio + _TAM_CLAVE] == clave:
+                return i, valor - 1
+            i = (i + 1) & self._mascara
+    
+    def _llave_de_ranura(self, ranura: int) -> PuntoElliptico:
+        inicio = self._inicio_ranuras + ranura * self._tam_ranura + 1 + _TAM_CLAVE
+        mitad = inicio + self._ancho
+        return PuntoElliptico(int.from_bytes(self._mapa[inicio:mitad], 'big'),
+                              int.from_bytes(self._mapa[mitad:mitad + self._ancho], 'big'))
+    
+    def _estado(self, ranura: int) -> int:
+        return self._mapa[self._inicio_ranuras + ranura * self._tam_ranura]
+    
+    def obtener(self, identificador: Identificador) -> Optional[PuntoElliptico]:
+        """Llave pública del identificador, o None si no está en el llavero"""
+        _, ranura = self._buscar(_clave(identificador))
+        if ranura < 0 or self._estado(ranura) != _ACTIVA:
+            return None
+        return self._llave_de_ranura(ranura)
+    
+    def agregar(self, llave_publica: PuntoElliptico,
+                identificador: Optional[Identificador] = None) -> Identificador:
+        """
+        Agrega una llave pública
+        
+        Args:
+            llave_publica: Punto de la curva del llavero
+            identificador: Nombre con el que se buscará la llave (por defecto
+                           su huella_llave())
+        
+        Returns:
+            El identificador usado
+        
+        Raises:
+            ValueError: Si la llave no es válida o el identificador ya existe
+        """
+        self._comprobar_escritura()
+        if not self.curva.es_llave_publica_valida(llave_publica):
+            raise ValueError("La llave pública no es un punto válido de la curva")
+        if identificador is None:
+            identificador = huella_llave(llave_publica, self.curva)
+        clave = _clave(identificador)
+        posicion, ranura = self._buscar(clave)
+        if ranura >= 0 and self._estado(ranura) == _ACTIVA:
+            raise ValueError("El identificador ya está en el llavero")
+        
+        if self._usadas == self.capacidad:
+            self._reescribir(2 * self.capacidad)
+            posicion, _ = self._buscar(clave)
+        
+        # Primero la ranura, luego el índice y por último los contadores
+        inicio = self._inicio_ranuras + self._usadas * self._tam_ranura
+        self._mapa[inicio:inicio + self._tam_ranura] = (
+            bytes([_ACTIVA]) + clave +
+            (llave_publica.x % self.curva.p).to_bytes(self._ancho, 'big') +
+            (llave_publica.y % self.curva.p).to_bytes(self._ancho, 'big')
+        )
+        _ENTRADA.pack_into(self._mapa, self._inicio_indice + 4 * posicion, self._usadas + 1)
+        self._usadas += 1
+        self._activas += 1
+        self._guardar_contadores()
+        return identificador
+    
+    def eliminar(self, identificador: Identificador) -> bool:
+        """Marca como eliminada la llave del identificador; devuelve si estaba"""
+        self._comprobar_escritura()
+        _, ranura = self._buscar(_clave(identificador))
+        if ranura < 0 or self._estado(ranura) != _ACTIVA:
+            return False
+        self._mapa[self._inicio_ranuras + ranura * self._tam_ranura] = _ELIMINADA
+        self._activas -= 1
+        self._guardar_contadores()
+        return True
+    
+    def compactar(self):
+        """Reescribe el archivo sin las ranuras eliminadas"""
+        self._comprobar_escritura()
+        self._reescribir(max(self._activas, 1))
+    
+    def _reescribir(self, capacidad: int):
+        """Copia las ranuras activas a un archivo nuevo y lo pone en lugar del actual"""
+        temporal = self.ruta + '.tmp'
+        fin_clave = 1 + _TAM_CLAVE
+        self._escribir_archivo(temporal, self.curva, capacidad, (
+            (bytes(self._mapa[inicio + 1:inicio + fin_clave]),
+             bytes(self._mapa[inicio + fin_clave:inicio + self._tam_ranura]))
+            for inicio in range(self._inicio_ranuras,
+                                self._inicio_ranuras + self._usadas * self._tam_ranura,
+                                self._tam_ranura)
+            if self._mapa[inicio] == _ACTIVA
+        ))
+        self.cerrar()
+        os.replace(temporal, self.ruta)
+        self._abrir()
+    
+    def _guardar_contadores(self):
+        struct.pack_into('<QQ', self._mapa, _CABECERA.size - 16, self._usadas, self._activas)
+    
+    def _comprobar_escritura(self):
+        if self.solo_lectura:
+            raise ValueError("El llavero está abierto en solo lectura")
+    
+    def __contains__(self, identificador: Identificador) -> bool:
+        return self.obtener(identificador) is not None
+    
+    def __len__(self) -> int:
+        return self._activas
+    
+    def __iter__(self) -> Iterator[Tuple[bytes, PuntoElliptico]]:
+        """(clave, llave) de cada llave activa, en orden de inserción"""
+        for ranura in range(self._usadas):
+            if self._estado(ranura) == _ACTIVA:
+                inicio = self._inicio_ranuras + ranura * self._tam_ranura + 1
+                yield bytes(self._mapa[inicio:inicio + _TAM_CLAVE]), self._llave_de_ranura(ranura)
+    
+    def sincronizar(self):
+        """Fuerza la escritura a disco de los cambios"""
+        if not self.solo_lectura:
+            self._mapa.flush()
+    
+    def cerrar(self):
+        """Cierra el mapeo y el archivo"""
+        if getattr(self, '_mapa', None) is not None:
+            self.sincronizar()
+            self._mapa.close()
+            self._mapa = None
+        if getattr(self, '_archivo', None) is not None:
+            self._archivo.close()
+            self._archivo = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.cerrar()
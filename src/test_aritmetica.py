@@ -0,0 +1,498 @@
+"""
+Pruebas de la aritmética optimizada de la curva elíptica.
+
+Los resultados se comparan contra una referencia en coordenadas afines
+(duplicación y suma con sumar_puntos), que es la implementación original.
+
+Ejecutar: python src/test_aritmetica.py  (o con pytest)
+"""
+
+import sys
+import os
+import pickle
+import secrets
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ecdsa_core
+from ecdsa_core import (
+    CurvaEliptica, ECDSA, PuntoElliptico, CURVAS_ESTANDAR,
+    crear_curva_ejemplo, crear_curva_ejemplo_pequena, obtener_curva
+)
+
+
+# Parámetros de secp256k1 para probar con tamaños reales
+SECP256K1 = dict(
+    p=0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F,
+    a=0,
+    b=7,
+    G=(0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+       0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8),
+    q=0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141,
+)
+
+
+def multiplicar_referencia(curva: CurvaEliptica, k: int, P: PuntoElliptico) -> PuntoElliptico:
+    """Duplicación y suma en coordenadas afines (algoritmo original)"""
+    if P.es_infinito:
+        return P
+    if k < 0:
+        k = -k
+        P = PuntoElliptico(P.x, (-P.y) % curva.p)
+    resultado = PuntoElliptico(None, None)
+    sumando = P
+    while k > 0:
+        if k & 1:
+            resultado = curva.sumar_puntos(resultado, sumando)
+        sumando = curva.sumar_puntos(sumando, sumando)
+        k >>= 1
+    return resultado
+
+
+def curvas_de_prueba():
+    return [crear_curva_ejemplo(), crear_curva_ejemplo_pequena(), CurvaEliptica(**SECP256K1)]
+
+
+def test_multiplicar_escalar_curvas_pequenas():
+    """Todos los escalares (incluidos negativos y mayores que q) coinciden"""
+    for curva in curvas_de_prueba()[:2]:
+        for k in range(-3 * curva.q, 3 * curva.q + 1):
+            assert curva.multiplicar_escalar(k, curva.G) == multiplicar_referencia(curva, k, curva.G), k
+
+
+def test_multiplicar_escalar_puntos_arbitrarios():
+    """Puntos que no generan el subgrupo (p. ej. de orden 2) también coinciden"""
+    curva = crear_curva_ejemplo()
+    puntos = [PuntoElliptico(x, y) for x in range(curva.p) for y in range(curva.p)
+              if curva.esta_en_curva(PuntoElliptico(x, y))]
+    for P in puntos:
+        for k in range(0, 12):
+            assert curva.multiplicar_escalar(k, P) == multiplicar_referencia(curva, k, P), (k, P)
+
+
+def test_multiplicar_escalar_secp256k1():
+    curva = CurvaEliptica(**SECP256K1)
+    for _ in range(5):
+        k = secrets.randbelow(curva.q)
+        esperado = multiplicar_referencia(curva, k, curva.G)
+        assert curva.multiplicar_escalar(k, curva.G) == esperado
+        assert curva.esta_en_curva(esperado)
+    assert curva.multiplicar_escalar(curva.q, curva.G).es_infinito
+    assert curva.multiplicar_escalar(0, curva.G).es_infinito
+
+
+def test_multiplicar_escalar_ventana_explicita():
+    """El resultado no depende del ancho de ventana elegido"""
+    curva = CurvaEliptica(**SECP256K1)
+    P = curva.multiplicar_generador(secrets.randbelow(curva.q))
+    k = secrets.randbelow(curva.q)
+    esperado = multiplicar_referencia(curva, k, P)
+    for w in range(2, 9):
+        assert curva.multiplicar_escalar(k, P, ventana=w) == esperado
+        assert curva.multiplicar_escalar(-k, P, ventana=w) == multiplicar_referencia(curva, -k, P)
+    curva = crear_curva_ejemplo()
+    for w in range(2, 7):
+        for k in range(-20, 21):
+            assert curva.multiplicar_escalar(k, curva.G, ventana=w) == multiplicar_referencia(curva, k, curva.G)
+    try:
+        curva.multiplicar_escalar(3, curva.G, ventana=1)
+        assert False, "Debería rechazar w < 2"
+    except ValueError:
+        pass
+
+
+def test_inverso_modular():
+    """La versión iterativa y pow(a, -1, m) dan lo mismo y fallan igual"""
+    curva = crear_curva_ejemplo()
+    original = ecdsa_core._POW_CON_INVERSO
+    try:
+        for usar_pow in (True, False):
+            ecdsa_core._POW_CON_INVERSO = usar_pow
+            for m in (97, 10, SECP256K1['p']):
+                for a in list(range(-5, 30)) + [m - 1, m + 3, 2 * m + 7]:
+                    try:
+                        x = curva.inverso_modular(a, m)
+                        assert (a * x) % m == 1 and 0 <= x < m
+                    except ValueError:
+                        assert ecdsa_core.math.gcd(a, m) != 1
+    finally:
+        ecdsa_core._POW_CON_INVERSO = original
+
+
+def test_invertir_lote():
+    curva = CurvaEliptica(**SECP256K1)
+    valores = [secrets.randbelow(curva.p - 1) + 1 for _ in range(50)]
+    assert curva.invertir_lote(valores, curva.p) == [curva.inverso_modular(v, curva.p) for v in valores]
+    assert curva.invertir_lote([], curva.p) == []
+    try:
+        curva.invertir_lote([3, 4, 7], 10)
+        assert False, "4 no es invertible módulo 10"
+    except ValueError as e:
+        assert "4" in str(e)
+
+
+def test_multiplicar_generador():
+    """La tabla fija de G da lo mismo que el método general"""
+    for curva in curvas_de_prueba():
+        escalares = list(range(0, 4 * curva.q)) if curva.q < 100 else \
+            [secrets.randbelow(curva.q) for _ in range(10)] + [1, curva.q - 1, curva.q, 2 * curva.q + 5]
+        for k in escalares + [-1]:
+            assert curva.multiplicar_generador(k) == curva.multiplicar_escalar(k, curva.G), k
+
+
+def test_multiplicar_multiple():
+    """Strauss (pocos puntos) y Pippenger (muchos) coinciden con la suma directa"""
+    curva = crear_curva_ejemplo_pequena()
+    puntos = puntos_de_curva(curva)
+    for n in (1, 3, curva.UMBRAL_PIPPENGER + 5):
+        escalares = [secrets.randbelow(50) - 10 for _ in range(n)]
+        elegidos = [puntos[secrets.randbelow(len(puntos))] for _ in range(n)]
+        esperado = PuntoElliptico(None, None)
+        for k, P in zip(escalares, elegidos):
+            esperado = curva.sumar_puntos(esperado, multiplicar_referencia(curva, k, P))
+        assert curva.multiplicar_multiple(escalares, elegidos) == esperado
+
+    curva = CurvaEliptica(**SECP256K1)
+    for n in (2, curva.UMBRAL_PIPPENGER):
+        escalares = [secrets.randbelow(curva.q) for _ in range(n)]
+        elegidos = [curva.multiplicar_generador(secrets.randbelow(curva.q)) for _ in range(n)]
+        esperado = PuntoElliptico(None, None)
+        for k, P in zip(escalares, elegidos):
+            esperado = curva.sumar_puntos(esperado, curva.multiplicar_escalar(k, P))
+        assert curva.multiplicar_multiple(escalares, elegidos) == esperado
+
+
+def test_raiz_cuadrada_modular():
+    """(p+1)/4 para p ≡ 3 (mod 4) y Tonelli-Shanks para p = 97"""
+    for curva in (crear_curva_ejemplo(), crear_curva_ejemplo_pequena()):
+        cuadrados = {(y * y) % curva.p for y in range(curva.p)}
+        for a in range(curva.p):
+            raiz = curva._raiz_cuadrada_modular(a)
+            if a in cuadrados:
+                assert raiz is not None and (raiz * raiz) % curva.p == a
+            else:
+                assert raiz is None
+
+
+def test_glv_secp256k1():
+    """Con el endomorfismo GLV los resultados son idénticos al método genérico"""
+    curva = CurvaEliptica(**SECP256K1)
+    glv = curva._parametros_glv()
+    assert glv is not None
+    for _ in range(20):
+        k = secrets.randbelow(curva.q)
+        k1, k2 = curva._descomponer_glv(k)
+        assert (k1 + k2 * glv[1] - k) % curva.q == 0
+        assert max(abs(k1), abs(k2)).bit_length() <= 129
+
+    generica = CurvaEliptica(**SECP256K1)
+    generica._glv = False
+    P = curva.multiplicar_generador(secrets.randbelow(curva.q))
+    for k in [secrets.randbelow(curva.q) for _ in range(5)] + [1, -7, curva.q, 3 * curva.q + 2]:
+        assert curva.multiplicar_escalar(k, P) == generica.multiplicar_escalar(k, P)
+    u1, u2 = secrets.randbelow(curva.q), secrets.randbelow(curva.q)
+    assert curva.multiplicar_doble(u1, u2, P) == generica.multiplicar_doble(u1, u2, P)
+    escalares = [secrets.randbelow(curva.q << 64) for _ in range(4)]
+    puntos = [curva.multiplicar_generador(secrets.randbelow(curva.q)) for _ in range(4)]
+    assert curva.multiplicar_multiple(escalares, puntos) == generica.multiplicar_multiple(escalares, puntos)
+
+    # Un punto fuera de la curva no usa el endomorfismo
+    fuera = PuntoElliptico(P.x, (P.y + 1) % curva.p)
+    assert curva.multiplicar_escalar(5, fuera) == generica.multiplicar_escalar(5, fuera)
+
+
+def test_glv_indicado_y_no_aplicable():
+    beta, lam = obtener_curva('secp256k1')._parametros_glv()[:2]
+    assert CurvaEliptica(**SECP256K1, endomorfismo=(beta, lam))._parametros_glv() is not None
+    try:
+        CurvaEliptica(**SECP256K1, endomorfismo=(beta, (lam * lam) % SECP256K1['q']))._parametros_glv()
+        assert False, "El par (β, λ²) no corresponde"
+    except ValueError:
+        pass
+    assert obtener_curva('P-256')._parametros_glv() is None
+    assert crear_curva_ejemplo()._parametros_glv() is None
+
+
+def verificar_referencia(curva: CurvaEliptica, z: int, firma, Q: PuntoElliptico) -> bool:
+    """Verificación ECDSA original con dos multiplicaciones independientes"""
+    r, s = firma
+    if not (1 <= r < curva.q and 1 <= s < curva.q):
+        return False
+    try:
+        w = curva.inverso_modular(s, curva.q)
+    except ValueError:
+        return False
+    X = curva.sumar_puntos(multiplicar_referencia(curva, (z * w) % curva.q, curva.G),
+                           multiplicar_referencia(curva, (r * w) % curva.q, Q))
+    return not X.es_infinito and X.x % curva.q == r
+
+
+def puntos_de_curva(curva: CurvaEliptica):
+    return [PuntoElliptico(None, None)] + [
+        PuntoElliptico(x, y) for x in range(curva.p) for y in range(curva.p)
+        if curva.esta_en_curva(PuntoElliptico(x, y))]
+
+
+def test_multiplicar_doble():
+    """u1·G + u2·Q coincide con la suma de las dos multiplicaciones"""
+    for curva in curvas_de_prueba()[:2]:
+        for Q in puntos_de_curva(curva):
+            for u1 in range(0, 2 * curva.q):
+                for u2 in (0, 1, 2, 3, 7, 2 * curva.q - 1):
+                    esperado = curva.sumar_puntos(multiplicar_referencia(curva, u1, curva.G),
+                                                  multiplicar_referencia(curva, u2, Q))
+                    assert curva.multiplicar_doble(u1, u2, Q) == esperado, (u1, u2, Q)
+    curva = CurvaEliptica(**SECP256K1)
+    Q = curva.multiplicar_escalar(secrets.randbelow(curva.q), curva.G)
+    u1, u2 = secrets.randbelow(curva.q), secrets.randbelow(curva.q)
+    assert curva.multiplicar_doble(u1, u2, Q) == curva.sumar_puntos(
+        curva.multiplicar_escalar(u1, curva.G), curva.multiplicar_escalar(u2, Q))
+
+
+def test_verificar_equivale_a_referencia():
+    """verificar (con la comprobación proyectiva de x) acepta exactamente lo mismo"""
+    for curva in curvas_de_prueba()[:2]:
+        ecdsa = ECDSA(curva)
+        z = ecdsa.hash_mensaje("mensaje")
+        for Q in puntos_de_curva(curva):
+            # Las llaves fuera del subgrupo de orden q se rechazan siempre
+            en_subgrupo = not Q.es_infinito and multiplicar_referencia(curva, curva.q, Q).es_infinito
+            for r in range(0, curva.q + 1):
+                for s in range(0, curva.q + 1):
+                    assert ecdsa.verificar("mensaje", (r, s), Q) == \
+                        (en_subgrupo and verificar_referencia(curva, z, (r, s), Q)), (r, s, Q)
+
+
+def test_x_congruente_con_q_mucho_menor_que_p():
+    """Con q ≪ p la comparación de x pasa a afín en vez de recorrer ~p/q candidatos"""
+    p = (1 << 127) - 1
+    curva = CurvaEliptica(p=p, a=1, b=1, G=(0, 1), q=1009)
+    x, y, Z = 123456789123456789123456789, 987654321, 0xC0FFEE
+    P = ((x * Z * Z) % p, (y * Z * Z * Z) % p, Z)
+    assert curva._x_congruente_jacobiano(P, x % 1009)
+    assert not curva._x_congruente_jacobiano(P, (x + 1) % 1009)
+    assert not curva._x_congruente_jacobiano((1, 1, 0), 0)
+
+
+def test_firma_secp256k1():
+    curva = CurvaEliptica(**SECP256K1)
+    ecdsa = ECDSA(curva)
+    d, Q = ecdsa.generar_llaves()
+    firma = ecdsa.firmar("Hola mundo", d)
+    assert ecdsa.verificar("Hola mundo", firma, Q)
+    assert not ecdsa.verificar("Hola mundo!", firma, Q)
+
+
+def test_punto_inmutable_y_compacto():
+    """PuntoElliptico no tiene __dict__, es inmutable, hashable y serializable"""
+    P = PuntoElliptico(3, 6)
+    assert not hasattr(P, "__dict__")
+    for accion in (lambda: setattr(P, "x", 4), lambda: delattr(P, "y")):
+        try:
+            accion()
+            assert False, "se esperaba AttributeError"
+        except AttributeError:
+            pass
+    assert P == PuntoElliptico(3, 6) and hash(P) == hash(PuntoElliptico(3, 6))
+    assert len({P, PuntoElliptico(3, 6), PuntoElliptico(None, None)}) == 2
+    assert pickle.loads(pickle.dumps(P)) == P
+    assert pickle.loads(pickle.dumps(PuntoElliptico(None, None))).es_infinito
+
+
+def test_mensajes_binarios():
+    """bytes, bytearray y memoryview se firman igual que su equivalente en str"""
+    curva = CurvaEliptica(**SECP256K1)
+    ecdsa = ECDSA(curva)
+    d, Q = ecdsa.generar_llaves()
+    datos = "Hola ñandú".encode("utf-8")
+    z = ecdsa.hash_mensaje("Hola ñandú")
+    for mensaje in (datos, bytearray(datos), memoryview(datos)):
+        assert ecdsa.hash_mensaje(mensaje) == z
+    
+    binario = bytes(range(256)) * 64
+    firma = ecdsa.firmar(memoryview(binario), d)
+    assert ecdsa.verificar(binario, firma, Q)
+    assert ecdsa.verificar(bytearray(binario), firma, Q)
+    assert ecdsa.verificar_paso_a_paso(memoryview(binario), firma, Q)['resultado']['valido']
+    assert not ecdsa.verificar(binario[:-1], firma, Q)
+
+
+def test_firmar_y_verificar_digest():
+    """Las variantes con digest equivalen a firmar/verificar y truncan a los bits de q"""
+    import hashlib
+    curva = CurvaEliptica(**SECP256K1)
+    ecdsa = ECDSA(curva)
+    d, Q = ecdsa.generar_llaves()
+    digest = hashlib.sha256(b"datos").digest()
+    firma = ecdsa.firmar_digest(digest, d)
+    assert ecdsa.verificar(b"datos", firma, Q)
+    assert ecdsa.verificar_digest(memoryview(digest), firma, Q)
+    assert not ecdsa.verificar_digest(hashlib.sha256(b"otros").digest(), firma, Q)
+    
+    # Un digest más largo que q se trunca por la izquierda
+    largo = hashlib.sha512(b"datos").digest()
+    assert ecdsa.verificar_digest(largo[:32], ecdsa.firmar_digest(largo, d), Q)
+    
+    # En las curvas de juguete el digest se reduce módulo q, igual que en hash_mensaje
+    curva_pequena = crear_curva_ejemplo()
+    assert ECDSA(curva_pequena)._digest_a_entero(b"\xff\x00") == 0xFF00 % curva_pequena.q
+
+
+def test_digest_y_mensaje_coinciden():
+    """firmar/verificar y sus variantes _digest dan el mismo resultado en cualquier curva"""
+    import hashlib
+    for curva in (crear_curva_ejemplo_pequena(), crear_curva_ejemplo(), obtener_curva("P-256")):
+        ecdsa = ECDSA(curva)
+        for i in range(20):
+            mensaje = b"mensaje %d" % i
+            assert ecdsa.hash_mensaje(mensaje) == ecdsa._digest_a_entero(hashlib.sha256(mensaje).digest())
+
+    for curva in (crear_curva_ejemplo(), obtener_curva("P-256")):
+        ecdsa = ECDSA(curva)
+        d, Q = ecdsa.generar_llaves()
+        for i in range(20):
+            mensaje = b"mensaje %d" % i
+            digest = hashlib.sha256(mensaje).digest()
+            try:
+                firma = ecdsa.firmar(mensaje, d)
+            except RuntimeError:
+                continue  # con q = 5 algunos hashes no admiten firma con esta llave
+            assert ecdsa.verificar_digest(digest, firma, Q)
+            assert ecdsa.verificar(mensaje, ecdsa.firmar_digest(digest, d), Q)
+
+
+def test_truncado_segun_parametros():
+    """Una curva estándar sin nombre hashea igual que la instancia con nombre"""
+    for nombre in ("P-256", "P-384"):
+        con_nombre = ECDSA(obtener_curva(nombre))
+        sin_nombre = ECDSA(CurvaEliptica(**CURVAS_ESTANDAR[nombre]))
+        assert sin_nombre.truncar_hash and sin_nombre.nombre_hash == con_nombre.nombre_hash
+        assert sin_nombre.hash_mensaje(b"hola") == con_nombre.hash_mensaje(b"hola")
+        d, Q = con_nombre.generar_llaves()
+        assert sin_nombre.verificar(b"hola", con_nombre.firmar(b"hola", d), Q)
+    assert not ECDSA(crear_curva_ejemplo()).truncar_hash
+
+
+def test_funciones_hash_configurables():
+    """Hash por nombre o constructor, con valor por defecto según la curva"""
+    import hashlib
+    assert ECDSA(obtener_curva("secp256k1")).nombre_hash == "sha256"
+    assert ECDSA(obtener_curva("P-384")).nombre_hash == "sha384"
+    assert ECDSA(crear_curva_ejemplo()).nombre_hash == "sha256"
+    
+    curva = obtener_curva("secp256k1")
+    d = 0x1234567890ABCDEF
+    Q = curva.multiplicar_generador(d)
+    for algoritmo in ("sha512", "sha3_256", "blake2b", hashlib.blake2b, "SHA384"):
+        ecdsa = ECDSA(curva, algoritmo_hash=algoritmo)
+        firma = ecdsa.firmar(b"mensaje", d)
+        assert ecdsa.verificar(b"mensaje", firma, Q)
+        # Truncamiento estándar: los 256 bits de la izquierda del digest
+        digest = hashlib.new(ecdsa.nombre_hash, b"mensaje").digest()
+        assert ecdsa.hash_mensaje(b"mensaje") == (int.from_bytes(digest, "big") >> (8 * len(digest) - 256)) % curva.q
+        assert ecdsa.verificar_digest(digest, firma, Q)
+    
+    assert not ECDSA(curva, algoritmo_hash="sha512").verificar(
+        b"mensaje", ECDSA(curva).firmar(b"mensaje", d), Q)
+    
+    for invalido in ("no_existe", "shake_128"):
+        try:
+            ECDSA(curva, algoritmo_hash=invalido)
+            assert False, "se esperaba ValueError"
+        except ValueError:
+            pass
+
+
+def test_hash_curva_propia_reduce_modulo_q():
+    """En curvas sin nombre se conserva H(M) mod q (ejemplos didácticos)"""
+    import hashlib
+    curva = crear_curva_ejemplo()
+    z = int.from_bytes(hashlib.sha256(b"Hola").digest(), "big") % curva.q
+    assert ECDSA(curva).hash_mensaje("Hola") == z
+
+
+def test_recuperar_llave_publica():
+    """(r, s, v) identifica la llave del firmante, también con x_R ≥ q"""
+    for curva in (obtener_curva("secp256k1"), obtener_curva("P-256"), crear_curva_ejemplo()):
+        ecdsa = ECDSA(curva)
+        for _ in range(10):
+            d, Q = ecdsa.generar_llaves()
+            try:
+                r, s, v = ecdsa.firmar_recuperable("hola", d)
+            except RuntimeError:
+                continue  # hash sin firma posible en la curva de ejemplo
+            assert ecdsa.verificar("hola", (r, s), Q)
+            assert ecdsa.recuperar_llave_publica("hola", (r, s, v)) == Q
+            candidatos = ecdsa.candidatos_llave_publica("hola", (r, s))
+            assert (v, Q) in candidatos
+            assert all(ecdsa.verificar("hola", (r, s), llave) for _, llave in candidatos)
+    
+    # Curva de orden primo q = 97 < p = 103: algunos R tienen x_R ≥ q
+    curva = CurvaEliptica(p=103, a=0, b=5, G=(2, 42), q=97)
+    ecdsa = ECDSA(curva)
+    vistos = set()
+    for k in range(1, curva.q):
+        try:
+            firma = ecdsa.firmar_recuperable("hola", 7, k=k)
+        except ValueError:
+            continue
+        vistos.add(firma[2])
+        assert ecdsa.recuperar_llave_publica("hola", firma) == curva.multiplicar_generador(7)
+    assert vistos == {0, 1, 2, 3}
+    
+    ecdsa = ECDSA(obtener_curva("secp256k1"))
+    d, Q = ecdsa.generar_llaves()
+    r, s, v = ecdsa.firmar_recuperable("hola", d)
+    assert ecdsa.recuperar_llave_publica("adiós", (r, s, v)) != Q
+    for firma in ((0, s, v), (r, s, 4)):
+        try:
+            ecdsa.recuperar_llave_publica("hola", firma)
+            assert False, "se esperaba ValueError"
+        except ValueError:
+            pass
+
+
+def test_validacion_llave_publica():
+    """Llaves fuera de la curva, en el infinito o fuera del subgrupo se rechazan"""
+    curva = crear_curva_ejemplo_pequena()
+    for Q in puntos_de_curva(curva):
+        en_subgrupo = not Q.es_infinito and multiplicar_referencia(curva, curva.q, Q).es_infinito
+        assert curva.es_llave_publica_valida(Q) == en_subgrupo
+    
+    curva = obtener_curva("secp256k1")
+    ecdsa = ECDSA(curva)
+    d, Q = ecdsa.generar_llaves()
+    firma = ecdsa.firmar("hola", d)
+    # Punto fuera de la curva (ataque de curva inválida) y coordenada sin reducir
+    invalido = PuntoElliptico(Q.x, (Q.y + 1) % curva.p)
+    for llave in (invalido, PuntoElliptico(Q.x + curva.p, Q.y), PuntoElliptico(None, None)):
+        assert not curva.es_llave_publica_valida(llave)
+        assert not ecdsa.verificar("hola", firma, llave)
+        assert ecdsa.verificar_lote([("hola", firma, llave), ("hola", firma, Q)]) == [False, True]
+        pasos = ecdsa.verificar_paso_a_paso("hola", firma, llave)
+        assert pasos['paso_llave']['llave_valida'] is False
+        assert pasos['resultado']['valido'] is False and 'paso_1' not in pasos
+    assert ecdsa.verificar_paso_a_paso("hola", firma, Q)['paso_llave']['llave_valida']
+    
+    # Paso a paso acepta exactamente lo mismo que verificar, también con
+    # llaves fuera del subgrupo
+    curva = crear_curva_ejemplo_pequena()
+    ecdsa = ECDSA(curva)
+    for Q in puntos_de_curva(curva):
+        for r in range(1, curva.q):
+            for s in range(1, curva.q):
+                assert ecdsa.verificar_paso_a_paso("hola", (r, s), Q)['resultado']['valido'] == \
+                    ecdsa.verificar("hola", (r, s), Q), (r, s, Q)
+    
+    # El resultado se recuerda por llave
+    curva = obtener_curva("secp256k1")
+    Q = ECDSA(curva).generar_llaves()[1]
+    assert curva.es_llave_publica_valida(Q)
+    assert curva._llaves_validadas[(Q.x, Q.y)] is True
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✓ {nombre}")
+    print("\n✓ TODAS LAS PRUEBAS DE ARITMÉTICA PASARON")
@@ -0,0 +1,134 @@
+"""
+Pruebas de la API asyncio (ECDSAAsincrono).
+
+Ejecutar: python src/test_async.py  (o con pytest)
+"""
+
+import sys
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ecdsa_core import ECDSA, obtener_curva
+from ecdsa_async import ECDSAAsincrono
+
+
+class ECDSAContador(ECDSA):
+    """ECDSA que cuenta las llamadas por lote (una por tarea del executor)"""
+
+    llamadas = 0
+
+    def verificar_lote(self, elementos, tam_grupo=8):
+        self.llamadas += 1
+        return super().verificar_lote(elementos, tam_grupo)
+
+    def firmar_lote(self, mensajes, llave_privada):
+        self.llamadas += 1
+        return super().firmar_lote(mensajes, llave_privada)
+
+
+def test_peticiones_agrupadas():
+    """Peticiones simultáneas se resuelven en una sola tarea por grupo"""
+    ecdsa = ECDSAContador(obtener_curva("secp256k1"))
+    d, Q = ecdsa.generar_llaves()
+
+    async def principal():
+        async with ECDSAAsincrono(ecdsa, espera_agrupacion=0.05, max_agrupacion=100) as api:
+            mensajes = [b"m%d" % i for i in range(10)]
+            firmas = await asyncio.gather(*(api.firmar_async(m, d) for m in mensajes))
+            assert ecdsa.llamadas == 1
+            validas = await asyncio.gather(*(api.verificar_async(m, f, Q) for m, f in zip(mensajes, firmas)))
+            assert validas == [True] * 10
+            assert ecdsa.llamadas == 2
+            assert not await api.verificar_async(b"otro", firmas[0], Q)
+
+            assert await api.verificar_lote_async([(m, f, Q) for m, f in zip(mensajes, firmas)]) == [True] * 10
+            assert len(await api.firmar_lote_async(mensajes, d)) == 10
+
+    asyncio.run(principal())
+
+
+def test_grupo_lleno_y_cancelacion():
+    """max_agrupacion envía el grupo sin esperar; las canceladas no se calculan"""
+    ecdsa = ECDSAContador(obtener_curva("secp256k1"))
+    d, Q = ecdsa.generar_llaves()
+    firma = ecdsa.firmar(b"m", d)
+
+    async def principal():
+        api = ECDSAAsincrono(ecdsa, espera_agrupacion=10.0, max_agrupacion=4)
+        resultados = await asyncio.wait_for(
+            asyncio.gather(*(api.verificar_async(b"m", firma, Q) for _ in range(4))), timeout=5)
+        assert resultados == [True] * 4
+
+        cancelada = asyncio.ensure_future(api.verificar_async(b"m", firma, Q))
+        viva = asyncio.ensure_future(api.verificar_async(b"m", firma, Q))
+        await asyncio.sleep(0)
+        cancelada.cancel()
+        await api.cerrar()
+        assert await viva
+        assert cancelada.cancelled()
+        assert ecdsa.llamadas == 2
+
+    asyncio.run(principal())
+
+
+def test_errores_se_propagan():
+    """Una petición inválida solo hace fallar su propia llamada"""
+    ecdsa = ECDSAContador(obtener_curva("secp256k1"))
+    d, Q = ecdsa.generar_llaves()
+    firma = ecdsa.firmar(b"m", d)
+
+    async def principal():
+        api = ECDSAAsincrono(ecdsa, espera_agrupacion=0.05, max_agrupacion=100)
+        resultados = await asyncio.gather(
+            api.verificar_async(b"m", firma, Q),
+            api.verificar_async(b"m", (1,), Q),
+            api.verificar_async(b"otro", firma, Q),
+            return_exceptions=True)
+        assert resultados[0] is True
+        assert isinstance(resultados[1], ValueError)
+        assert resultados[2] is False
+
+        resultados = await asyncio.gather(
+            api.firmar_async(b"a", d), api.firmar_async(12345, d), api.firmar_async(b"b", d),
+            return_exceptions=True)
+        assert isinstance(resultados[1], TypeError)
+        assert ecdsa.verificar(b"a", resultados[0], Q) and ecdsa.verificar(b"b", resultados[2], Q)
+
+        try:
+            await api.firmar_async(12345, 1)  # un entero no es un mensaje
+            assert False, "se esperaba TypeError"
+        except TypeError:
+            pass
+
+    asyncio.run(principal())
+
+
+def test_ejecutor_de_hilos():
+    """Se acepta un ThreadPoolExecutor propio; los de procesos se rechazan al construir"""
+    ecdsa = ECDSA(obtener_curva("secp256k1"))
+    d, Q = ecdsa.generar_llaves()
+    with ThreadPoolExecutor(max_workers=2) as hilos:
+        async def principal():
+            async with ECDSAAsincrono(ecdsa, ejecutor=hilos) as api:
+                assert await api.verificar_async(b"m", await api.firmar_async(b"m", d), Q)
+
+        asyncio.run(principal())
+
+    procesos = ProcessPoolExecutor(max_workers=1)
+    try:
+        ECDSAAsincrono(ecdsa, ejecutor=procesos)
+        assert False, "se esperaba TypeError"
+    except TypeError:
+        pass
+    finally:
+        procesos.shutdown()
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✓ {nombre}")
+    print("\n✓ TODAS LAS PRUEBAS DE LA API ASYNCIO PASARON")
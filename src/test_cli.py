@@ -0,0 +1,246 @@
+"""
+Pruebas de la herramienta de línea de comandos (ecdsa_cli).
+
+Ejecutar: python src/test_cli.py  (o con pytest)
+"""
+
+import sys
+import os
+import io
+import json
+import base64
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ecdsa_cli
+from ecdsa_core import ECDSA, obtener_curva, exportar_llave_publica, exportar_llave_privada
+from llavero import Llavero
+
+
+def preparar_llaves(directorio):
+    """Crea un par de llaves secp256k1 en archivos PEM"""
+    curva = obtener_curva("secp256k1")
+    d, Q = ECDSA(curva).generar_llaves()
+    privada = os.path.join(directorio, "priv.pem")
+    publica = os.path.join(directorio, "pub.pem")
+    exportar_llave_privada(d, curva, privada)
+    exportar_llave_publica(Q, curva, publica)
+    return privada, publica
+
+
+def escribir_jsonl(ruta, registros):
+    with open(ruta, "w", encoding="utf-8") as f:
+        for registro in registros:
+            f.write((registro if isinstance(registro, str) else json.dumps(registro)) + "\n")
+
+
+def leer_jsonl(ruta):
+    with open(ruta, encoding="utf-8") as f:
+        return [json.loads(linea) for linea in f if linea.strip()]
+
+
+def ejecutar(argv):
+    """Ejecuta la CLI capturando el resumen de stderr"""
+    stderr, sys.stderr = sys.stderr, io.StringIO()
+    try:
+        codigo = ecdsa_cli.main(argv)
+        return codigo, sys.stderr.getvalue()
+    finally:
+        sys.stderr = stderr
+
+
+def test_firmar_y_verificar_jsonl():
+    """Firma un flujo JSONL y lo verifica, con registros erróneos en medio"""
+    for procesos in ("0", "1"):
+        with tempfile.TemporaryDirectory() as directorio:
+            privada, publica = preparar_llaves(directorio)
+            mensajes = os.path.join(directorio, "mensajes.jsonl")
+            firmas = os.path.join(directorio, "firmas.jsonl")
+            resultados = os.path.join(directorio, "resultados.jsonl")
+            escribir_jsonl(mensajes, [
+                {"id": 1, "mensaje": "hola"},
+                {"id": 2, "mensaje_b64": base64.b64encode(b"\x00\xff").decode()},
+                "esto no es json",
+                {"id": 4},
+                {"id": 5, "mensaje": "adiós"},
+            ])
+            codigo, resumen = ejecutar(["firmar", "--llave-privada", privada, "--entrada", mensajes,
+                                        "--salida", firmas, "--procesos", procesos, "--tam-bloque", "2"])
+            assert codigo == 1 and "5 registros" in resumen
+            salida = leer_jsonl(firmas)
+            assert [r.get("id") for r in salida] == [1, 2, None, 4, 5]
+            assert "error" in salida[2] and "error" in salida[3]
+
+            firmadas = [dict(r, mensaje=m) for r, m in ((salida[0], "hola"), (salida[4], "adiós"))]
+            firmadas.append(dict(salida[0], mensaje="otro"))
+            escribir_jsonl(firmas, firmadas)
+            codigo, resumen = ejecutar(["verificar", "--llave-publica", publica, "--entrada", firmas,
+                                        "--salida", resultados, "--procesos", procesos])
+            assert codigo == 1 and "válidas: 2  inválidas: 1" in resumen
+            assert [r["valida"] for r in leer_jsonl(resultados)] == [True, True, False]
+
+
+def test_reanudar_con_estado():
+    """Con --estado se continúa tras los registros ya escritos"""
+    with tempfile.TemporaryDirectory() as directorio:
+        privada, _ = preparar_llaves(directorio)
+        mensajes = os.path.join(directorio, "mensajes.jsonl")
+        firmas = os.path.join(directorio, "firmas.jsonl")
+        estado = os.path.join(directorio, "estado.json")
+        escribir_jsonl(mensajes, [{"id": i, "mensaje": str(i)} for i in range(5)])
+
+        # Simular una ejecución anterior que se cortó tras 3 registros
+        escribir_jsonl(firmas, [{"id": i, "r": "1", "s": "1"} for i in range(3)])
+        with open(estado, "w") as f:
+            json.dump({"completados": 3}, f)
+
+        codigo, resumen = ejecutar(["firmar", "--llave-privada", privada, "--entrada", mensajes,
+                                    "--salida", firmas, "--procesos", "0", "--estado", estado])
+        assert codigo == 0 and "2 registros" in resumen
+        assert [r["id"] for r in leer_jsonl(firmas)] == [0, 1, 2, 3, 4]
+        with open(estado) as f:
+            assert json.load(f) == {"completados": 5, "bytes_salida": os.path.getsize(firmas)}
+
+
+def test_reanudar_descarta_salida_tras_el_estado():
+    """Lo escrito después del último estado (y una línea a medias) no se duplica"""
+    with tempfile.TemporaryDirectory() as directorio:
+        privada, _ = preparar_llaves(directorio)
+        mensajes = os.path.join(directorio, "mensajes.jsonl")
+        firmas = os.path.join(directorio, "firmas.jsonl")
+        estado = os.path.join(directorio, "estado.json")
+        escribir_jsonl(mensajes, [{"id": i, "mensaje": str(i)} for i in range(6)])
+
+        # Estado guardado tras 2 registros; la ejecución siguió escribiendo
+        # otros 2 y se cortó a mitad del quinto
+        escribir_jsonl(firmas, [{"id": i, "r": "1", "s": "1"} for i in range(2)])
+        with open(estado, "w") as f:
+            json.dump({"completados": 2, "bytes_salida": os.path.getsize(firmas)}, f)
+        with open(firmas, "a", encoding="utf-8") as f:
+            f.write('{"id": 2, "r": "1", "s": "1"}\n{"id": 3, "r": "1", "s": "1"}\n{"id": 4, "r"')
+
+        codigo, resumen = ejecutar(["firmar", "--llave-privada", privada, "--entrada", mensajes,
+                                    "--salida", firmas, "--procesos", "0", "--estado", estado])
+        assert codigo == 0 and "4 registros" in resumen
+        assert [r["id"] for r in leer_jsonl(firmas)] == [0, 1, 2, 3, 4, 5]
+
+
+def test_directorio():
+    """Firma separada de cada archivo de un directorio y su verificación"""
+    with tempfile.TemporaryDirectory() as directorio:
+        privada, publica = preparar_llaves(directorio)
+        datos = os.path.join(directorio, "datos")
+        os.mkdir(datos)
+        for nombre in ("a.bin", "b.bin"):
+            with open(os.path.join(datos, nombre), "wb") as f:
+                f.write(os.urandom(1000))
+        salida = os.path.join(directorio, "salida.jsonl")
+
+        codigo, _ = ejecutar(["firmar", "--llave-privada", privada, "--directorio", datos,
+                              "--salida", salida, "--procesos", "2"])
+        assert codigo == 0 and os.path.exists(os.path.join(datos, "a.bin.sig"))
+
+        with open(os.path.join(datos, "b.bin"), "ab") as f:
+            f.write(b"!")
+        codigo, _ = ejecutar(["verificar", "--llave-publica", publica, "--directorio", datos,
+                              "--salida", salida])
+        assert codigo == 1
+        assert leer_jsonl(salida) == [{"archivo": "a.bin", "valida": True},
+                                      {"archivo": "b.bin", "valida": False}]
+
+
+def test_reanudar_directorio_por_nombre():
+    """Al reanudar se sigue tras el último archivo aunque el directorio cambie"""
+    with tempfile.TemporaryDirectory() as directorio:
+        privada, _ = preparar_llaves(directorio)
+        datos = os.path.join(directorio, "datos")
+        os.mkdir(datos)
+        for nombre in ("b.bin", "d.bin"):
+            with open(os.path.join(datos, nombre), "wb") as f:
+                f.write(nombre.encode())
+        salida = os.path.join(directorio, "salida.jsonl")
+        estado = os.path.join(directorio, "estado.json")
+        with open(estado, "w") as f:
+            json.dump({"completados": 1, "ultimo_archivo": "b.bin"}, f)
+
+        # Antes de reanudar aparece un archivo que se ordena delante de b.bin
+        with open(os.path.join(datos, "a.bin"), "wb") as f:
+            f.write(b"a")
+        codigo, _ = ejecutar(["firmar", "--llave-privada", privada, "--directorio", datos,
+                              "--salida", salida, "--estado", estado])
+        assert codigo == 0
+        assert [r["archivo"] for r in leer_jsonl(salida)] == ["d.bin"]
+        with open(estado) as f:
+            assert json.load(f)["ultimo_archivo"] == "d.bin"
+
+
+def test_llave_id_sin_llavero_es_error():
+    """Un registro con "llave_id" no se verifica con la llave de --llave-publica"""
+    with tempfile.TemporaryDirectory() as directorio:
+        privada, publica = preparar_llaves(directorio)
+        d, _ = ecdsa_cli.importar_llave_privada(privada)
+        ecdsa = ECDSA(obtener_curva("secp256k1"))
+        r, s = ecdsa.firmar("hola", d)
+        firmas = os.path.join(directorio, "firmas.jsonl")
+        resultados = os.path.join(directorio, "resultados.jsonl")
+        escribir_jsonl(firmas, [{"id": 1, "mensaje": "hola", "r": r, "s": s},
+                                {"id": 2, "mensaje": "hola", "r": r, "s": s, "llave_id": "ana"}])
+        codigo, resumen = ejecutar(["verificar", "--llave-publica", publica, "--entrada", firmas,
+                                    "--salida", resultados, "--procesos", "0"])
+        assert codigo == 1 and "válidas: 1  inválidas: 0  errores: 1" in resumen
+        salida = leer_jsonl(resultados)
+        assert salida[0]["valida"] is True and "--llavero" in salida[1]["error"]
+
+
+def test_curva_sin_llave_es_error():
+    """Con --curva, un registro sin qx/qy es un error y no una firma inválida"""
+    curva = obtener_curva("secp256k1")
+    ecdsa = ECDSA(curva)
+    d, Q = ecdsa.generar_llaves()
+    r, s = ecdsa.firmar("hola", d)
+    with tempfile.TemporaryDirectory() as directorio:
+        firmas = os.path.join(directorio, "firmas.jsonl")
+        resultados = os.path.join(directorio, "resultados.jsonl")
+        escribir_jsonl(firmas, [{"id": 1, "mensaje": "hola", "r": r, "s": s, "qx": Q.x, "qy": Q.y},
+                                {"id": 2, "mensaje": "hola", "r": r, "s": s}])
+        codigo, resumen = ejecutar(["verificar", "--curva", "secp256k1", "--entrada", firmas,
+                                    "--salida", resultados, "--procesos", "0"])
+        assert codigo == 1 and "válidas: 1  inválidas: 0  errores: 1" in resumen
+        salida = leer_jsonl(resultados)
+        assert salida[0]["valida"] is True
+        assert "valida" not in salida[1] and "llave pública" in salida[1]["error"]
+
+
+def test_verificar_con_llavero():
+    """Con --llavero cada registro nombra la llave de su firmante"""
+    curva = obtener_curva("secp256k1")
+    ecdsa = ECDSA(curva)
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_llavero = os.path.join(directorio, "llaves.llv")
+        registros = []
+        with Llavero(ruta_llavero, curva) as llavero:
+            for nombre in ("ana", "luis"):
+                d, Q = ecdsa.generar_llaves()
+                llavero.agregar(Q, nombre)
+                r, s = ecdsa.firmar(nombre, d)
+                registros.append({"id": nombre, "mensaje": nombre, "r": r, "s": s, "llave_id": nombre})
+        registros.append(dict(registros[0], id="cruzada", llave_id="luis"))
+        registros.append(dict(registros[0], id="nadie", llave_id="nadie"))
+        firmas = os.path.join(directorio, "firmas.jsonl")
+        resultados = os.path.join(directorio, "resultados.jsonl")
+        escribir_jsonl(firmas, registros)
+
+        codigo, resumen = ejecutar(["verificar", "--llavero", ruta_llavero, "--entrada", firmas,
+                                    "--salida", resultados, "--procesos", "0"])
+        assert codigo == 1 and "válidas: 2  inválidas: 1  errores: 1" in resumen
+        salida = leer_jsonl(resultados)
+        assert [r.get("valida") for r in salida] == [True, True, False, None]
+        assert "llave desconocida" in salida[3]["error"]
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✓ {nombre}")
+    print("\n✓ TODAS LAS PRUEBAS DE LA LÍNEA DE COMANDOS PASARON")
@@ -0,0 +1,266 @@
+"""
+Pruebas del registro de curvas estándar (secp256k1, P-256, P-384).
+
+Ejecutar: python src/test_curvas_estandar.py  (o con pytest)
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ecdsa_core import (
+    CURVAS_ESTANDAR, ECDSA, obtener_curva, curva_compartida, crear_curva_ejemplo,
+    exportar_llave_publica, importar_llave_publica,
+    exportar_llave_privada, importar_llave_privada,
+    PuntoElliptico, codificar_punto, decodificar_punto,
+    codificar_llave_publica_der, decodificar_llave_publica_der,
+    codificar_llave_privada_der, decodificar_llave_privada_der,
+    codificar_llave_publica_compacta, der_a_pem, cargar_llaves_publicas,
+    codificar_parametros_curva_der, decodificar_parametros_curva_der
+)
+from test_aritmetica import puntos_de_curva
+
+
+def test_parametros_curvas_estandar():
+    """G está en la curva y tiene orden q"""
+    for nombre in CURVAS_ESTANDAR:
+        curva = obtener_curva(nombre)
+        assert curva.nombre == nombre
+        assert curva.esta_en_curva(curva.G)
+        assert curva.multiplicar_escalar(curva.q, curva.G).es_infinito
+
+
+def test_instancias_compartidas():
+    assert obtener_curva('P-256') is obtener_curva('secp256r1') is obtener_curva('prime256v1')
+    assert curva_compartida(**CURVAS_ESTANDAR['secp256k1']) is obtener_curva('secp256k1')
+    ejemplo = crear_curva_ejemplo()
+    parametros = dict(p=ejemplo.p, a=ejemplo.a, b=ejemplo.b, G=(ejemplo.G.x, ejemplo.G.y), q=ejemplo.q)
+    assert curva_compartida(**parametros) is curva_compartida(**parametros)
+    try:
+        obtener_curva('P-999')
+        assert False, "Debería rechazar curvas desconocidas"
+    except ValueError:
+        pass
+
+
+def test_curvas_compartidas_acotadas():
+    """Solo se recuerdan las MAX_CURVAS_COMPARTIDAS curvas propias más recientes"""
+    import ecdsa_core
+    ejemplo = crear_curva_ejemplo()
+    primera = curva_compartida(ejemplo.p, ejemplo.a, ejemplo.b, (ejemplo.G.x, ejemplo.G.y), 1000)
+    for q in range(1001, 1001 + ecdsa_core.MAX_CURVAS_COMPARTIDAS):
+        ultima = curva_compartida(ejemplo.p, ejemplo.a, ejemplo.b, (ejemplo.G.x, ejemplo.G.y), q)
+    assert len(ecdsa_core._curvas_por_parametros) == ecdsa_core.MAX_CURVAS_COMPARTIDAS
+    assert curva_compartida(ejemplo.p, ejemplo.a, ejemplo.b, (ejemplo.G.x, ejemplo.G.y), q) is ultima
+    assert curva_compartida(ejemplo.p, ejemplo.a, ejemplo.b, (ejemplo.G.x, ejemplo.G.y), 1000) is not primera
+    # Las curvas estándar no ocupan sitio en la tabla y nunca se descartan
+    assert curva_compartida(**CURVAS_ESTANDAR['P-384']) is obtener_curva('P-384')
+
+
+def test_importar_resuelve_curva_compartida():
+    """Las llaves importadas comparten la instancia (y las tablas) de su curva"""
+    curva = obtener_curva('P-256')
+    ecdsa = ECDSA(curva)
+    d, Q = ecdsa.generar_llaves()
+    with tempfile.TemporaryDirectory() as directorio:
+        publica = os.path.join(directorio, 'pub.pem')
+        privada = os.path.join(directorio, 'priv.pem')
+        exportar_llave_publica(Q, curva, publica)
+        exportar_llave_privada(d, curva, privada)
+        Q2, curva2 = importar_llave_publica(publica)
+        d2, curva3 = importar_llave_privada(privada)
+    assert curva2 is curva and curva3 is curva
+    assert Q2 == Q and d2 == d
+
+
+def test_firma_curvas_estandar():
+    for nombre in CURVAS_ESTANDAR:
+        ecdsa = ECDSA(obtener_curva(nombre))
+        d, Q = ecdsa.generar_llaves()
+        firma = ecdsa.firmar("mensaje", d)
+        assert ecdsa.verificar("mensaje", firma, Q)
+        assert not ecdsa.verificar("otro mensaje", firma, Q)
+
+
+def test_codificacion_sec1():
+    """Puntos comprimidos y sin comprimir en curvas con p ≡ 3 y p ≡ 1 (mod 4)"""
+    for nombre in CURVAS_ESTANDAR:
+        curva = obtener_curva(nombre)
+        ancho = (curva.p.bit_length() + 7) // 8
+        for d in (1, 2, 12345, curva.q - 1):
+            Q = curva.multiplicar_generador(d)
+            comprimido = codificar_punto(Q, curva)
+            assert len(comprimido) == 1 + ancho and comprimido[0] in (2, 3)
+            assert decodificar_punto(comprimido, curva) == Q
+            sin_comprimir = codificar_punto(Q, curva, comprimido=False)
+            assert len(sin_comprimir) == 1 + 2 * ancho
+            assert decodificar_punto(sin_comprimir, curva) == Q
+    
+    # p = 97 ≡ 1 (mod 4): la descompresión usa Tonelli-Shanks
+    curva = crear_curva_ejemplo()
+    for P in puntos_de_curva(curva):
+        for comprimido in (True, False):
+            assert decodificar_punto(codificar_punto(P, curva, comprimido), curva) == P
+    assert decodificar_punto(b"\x00", curva).es_infinito
+
+
+def test_codificacion_sec1_invalida():
+    """Se rechazan prefijos, longitudes y puntos que no están en la curva"""
+    curva = obtener_curva("P-256")
+    Q = curva.multiplicar_generador(7)
+    malo = bytearray(codificar_punto(Q, curva, comprimido=False))
+    malo[-1] ^= 1
+    # Una x sin punto en la curva: x³ + ax + b no es residuo cuadrático
+    x = 0
+    while curva._levantar_x(x) is not None:
+        x += 1
+    for datos in (bytes(malo), b"\x05" + bytes(32), b"\x02" + bytes(31),
+                  b"\x02" + x.to_bytes(32, "big"), b"\x02" + curva.p.to_bytes(32, "big")):
+        try:
+            decodificar_punto(datos, curva)
+            assert False, f"se aceptó {datos.hex()}"
+        except ValueError:
+            pass
+
+
+def test_exportar_llave_comprimida():
+    """La llave pública se puede exportar comprimida e importar de vuelta"""
+    curva = obtener_curva("secp256k1")
+    _, Q = ECDSA(curva).generar_llaves()
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "pub.pem")
+        exportar_llave_publica(Q, curva, ruta, comprimida=True)
+        llave, curva_leida = importar_llave_publica(ruta)
+        assert llave == Q and curva_leida is curva
+
+
+def test_formatos_de_llave():
+    """Las llaves se exportan e importan en texto, PEM, DER y compacto"""
+    with tempfile.TemporaryDirectory() as directorio:
+        for curva in [obtener_curva(nombre) for nombre in CURVAS_ESTANDAR] + [crear_curva_ejemplo()]:
+            d, Q = ECDSA(curva).generar_llaves()
+            formatos = ['texto', 'pem', 'der'] + (['compacta'] if curva.nombre else [])
+            for formato in formatos:
+                ruta = os.path.join(directorio, f"llave.{formato}")
+                exportar_llave_publica(Q, curva, ruta, formato=formato)
+                llave, curva_leida = importar_llave_publica(ruta)
+                assert llave == Q and curva_leida.p == curva.p and curva_leida.q == curva.q
+                exportar_llave_privada(d, curva, ruta, formato=formato)
+                assert importar_llave_privada(ruta)[0] == d
+
+
+def test_der_llaves_interoperable():
+    """SubjectPublicKeyInfo y PKCS#8 con la estructura estándar"""
+    curva = obtener_curva("P-256")
+    d = 0xC9AFA9D845BA75166B5C215767B1D6934E50C3DB36E89B127B8A622B120F6721
+    Q = curva.multiplicar_generador(d)
+    der = codificar_llave_publica_der(Q, curva)
+    # SEQUENCE { SEQUENCE { id-ecPublicKey, prime256v1 }, BIT STRING 04 || x || y }
+    assert der[:27] == bytes.fromhex("3059301306072a8648ce3d020106082a8648ce3d03010703420004")
+    assert decodificar_llave_publica_der(der) == (Q, curva)
+    assert decodificar_llave_publica_der(codificar_llave_publica_der(Q, curva, True)) == (Q, curva)
+    assert decodificar_llave_privada_der(codificar_llave_privada_der(d, curva)) == (d, curva)
+    
+    # ECPrivateKey de SEC1 ("EC PRIVATE KEY") con parámetros [0]
+    sec1 = bytes.fromhex("30310201010420") + d.to_bytes(32, 'big') + bytes.fromhex("a00a06082a8648ce3d030107")
+    assert decodificar_llave_privada_der(sec1) == (d, curva)
+    
+    for invalida in (der + b"\x00", der[:-1], b"\x30\x00"):
+        try:
+            decodificar_llave_publica_der(invalida)
+            assert False, "se esperaba ValueError"
+        except ValueError:
+            pass
+
+
+def test_der_parametros_curva():
+    """ECParameters: OID para las curvas estándar, explícitos para las propias"""
+    curva = obtener_curva("P-256")
+    assert codificar_parametros_curva_der(curva) == bytes.fromhex("06082a8648ce3d030107")
+    propia = crear_curva_ejemplo()
+    for c in (curva, obtener_curva("secp256k1"), propia):
+        der = codificar_parametros_curva_der(c)
+        assert decodificar_parametros_curva_der(der) is curva_compartida(c.p, c.a, c.b, (c.G.x, c.G.y), c.q)
+        try:
+            decodificar_parametros_curva_der(der + b"\x00")
+            assert False, "se esperaba ValueError"
+        except ValueError:
+            pass
+    
+    # Un generador fuera de la curva se rechaza sin llegar a la tabla compartida
+    import ecdsa_core
+    der = codificar_parametros_curva_der(propia)
+    G = codificar_punto(propia.G, propia, comprimido=False)
+    malo = der.replace(G, G[:-1] + bytes([G[-1] ^ 1]))
+    antes = dict(ecdsa_core._curvas_por_parametros)
+    try:
+        decodificar_parametros_curva_der(malo)
+        assert False, "se esperaba ValueError"
+    except ValueError:
+        pass
+    assert dict(ecdsa_core._curvas_por_parametros) == antes
+
+
+def test_cargar_llaves_en_bloque():
+    """Un solo buffer con muchas llaves en PEM partido, DER o compacto"""
+    curva = obtener_curva("secp256k1")
+    ecdsa = ECDSA(curva)
+    llaves = [ecdsa.generar_llaves()[1] for _ in range(5)]
+    esperado = [(Q, curva) for Q in llaves]
+    
+    pem = "".join(der_a_pem(codificar_llave_publica_der(Q, curva), "PUBLIC KEY") for Q in llaves)
+    assert max(len(linea) for linea in pem.splitlines()) <= 64
+    assert cargar_llaves_publicas(pem) == esperado
+    assert cargar_llaves_publicas(b"".join(codificar_llave_publica_der(Q, curva) for Q in llaves)) == esperado
+    assert cargar_llaves_publicas(b"".join(codificar_llave_publica_compacta(Q, curva) for Q in llaves)) == esperado
+    
+    try:
+        cargar_llaves_publicas("-----BEGIN PUBLIC KEY-----\nno es base64!\n-----END PUBLIC KEY-----\n")
+        assert False, "se esperaba ValueError"
+    except ValueError:
+        pass
+
+
+def test_formatos_rechazan_datos_fuera_de_rango():
+    """Ids de curva desconocidos y llaves privadas fuera de [1, q-1] dan ValueError"""
+    curva = obtener_curva("secp256k1")
+    llaves = [ECDSA(curva).generar_llaves()[1] for _ in range(3)]
+    compactas = [codificar_llave_publica_compacta(Q, curva) for Q in llaves]
+    try:
+        cargar_llaves_publicas(compactas[0] + b"\xee" + compactas[1][1:] + compactas[2])
+        assert False, "se esperaba ValueError"
+    except ValueError:
+        pass
+    
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "priv.pem")
+        for d in (0, curva.q, curva.q + 1):
+            exportar_llave_privada(d, curva, ruta, formato='texto')
+            try:
+                importar_llave_privada(ruta)
+                assert False, "se esperaba ValueError"
+            except ValueError:
+                pass
+
+
+def test_importar_rechaza_llave_invalida():
+    """Una llave pública que no está en la curva no se importa"""
+    curva = obtener_curva("P-256")
+    _, Q = ECDSA(curva).generar_llaves()
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "pub.pem")
+        exportar_llave_publica(PuntoElliptico(Q.x, (Q.y + 1) % curva.p), curva, ruta)
+        try:
+            importar_llave_publica(ruta)
+            assert False, "se esperaba ValueError"
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✓ {nombre}")
+    print("\n✓ TODAS LAS PRUEBAS DE CURVAS ESTÁNDAR PASARON")
@@ -0,0 +1,155 @@
+"""
+Pruebas de firmas separadas de archivos (hash por bloques y archivo .sig).
+
+Ejecutar: python src/test_firma_archivos.py  (o con pytest)
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ecdsa_core import (
+    ECDSA, obtener_curva, crear_curva_ejemplo, exportar_firma, importar_firma,
+    codificar_firma_raw, decodificar_firma_raw, codificar_firma_der, decodificar_firma_der,
+    codificar_firmas_raw, decodificar_firmas_raw, codificar_firmas_der, decodificar_firmas_der,
+    codificar_firma_recuperable, decodificar_firma_recuperable
+)
+
+
+def test_hash_archivo_equivale_a_hash_mensaje():
+    """El hash por bloques coincide con hash_mensaje sobre el contenido completo"""
+    ecdsa = ECDSA(obtener_curva("secp256k1"))
+    ecdsa.TAM_BLOQUE_ARCHIVO = 1000  # varios bloques y un último bloque parcial
+    contenido = os.urandom(4321)
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "datos.bin")
+        with open(ruta, "wb") as f:
+            f.write(contenido)
+        assert ecdsa.hash_archivo(ruta) == ecdsa.hash_mensaje(contenido)
+
+        vacio = os.path.join(directorio, "vacio.bin")
+        open(vacio, "wb").close()
+        assert ecdsa.hash_archivo(vacio) == ecdsa.hash_mensaje(b"")
+
+
+def test_firma_separada_de_archivo():
+    """firmar_archivo / verificar_archivo con la firma guardada aparte"""
+    ecdsa = ECDSA(obtener_curva("secp256k1"))
+    d, Q = ecdsa.generar_llaves()
+    contenido = b"linea 1\nlinea 2\n" * 1000
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "artefacto.tar")
+        with open(ruta, "wb") as f:
+            f.write(contenido)
+
+        firma = ecdsa.firmar_archivo(ruta, d)
+        assert ecdsa.verificar(contenido, firma, Q)
+
+        ruta_firma = ruta + ".sig"
+        exportar_firma(firma, ruta_firma, {"archivo": "artefacto.tar", "tamano": len(contenido)},
+                       algoritmo_hash=ecdsa.nombre_hash)
+        with open(ruta_firma, "rb") as f:
+            assert contenido not in f.read()
+
+        firma_leida, metadatos = importar_firma(ruta_firma)
+        assert firma_leida == firma
+        assert metadatos == {"hash": "sha256", "archivo": "artefacto.tar",
+                             "tamano": str(len(contenido))}
+        assert ecdsa.verificar_archivo(ruta, firma_leida, Q)
+
+        with open(ruta, "ab") as f:
+            f.write(b"x")
+        assert not ecdsa.verificar_archivo(ruta, firma_leida, Q)
+
+        ecdsa = ECDSA(obtener_curva("P-384"))
+        d, Q = ecdsa.generar_llaves()
+        exportar_firma(ecdsa.firmar_archivo(ruta, d), ruta_firma, algoritmo_hash=ecdsa.nombre_hash)
+        firma_leida, metadatos = importar_firma(ruta_firma)
+        assert metadatos == {"hash": "sha384"}
+        assert ecdsa.verificar_archivo(ruta, firma_leida, Q)
+
+
+def test_metadatos_invalidos():
+    """Los metadatos no pueden romper el formato clave=valor"""
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "f.sig")
+        try:
+            exportar_firma((1, 2), ruta, {"nota": "dos\nlineas"}, algoritmo_hash="sha256")
+            assert False, "se esperaba ValueError"
+        except ValueError:
+            pass
+
+
+def test_codificacion_raw_y_der():
+    """r||s de ancho fijo y DER, sueltas y en un buffer"""
+    curva = obtener_curva("secp256k1")
+    ecdsa = ECDSA(curva)
+    d, _ = ecdsa.generar_llaves()
+    firmas = ecdsa.firmar_lote([b"%d" % i for i in range(50)], d) + [(1, 0x80), (curva.q - 1, 1)]
+    
+    for firma in firmas:
+        raw = codificar_firma_raw(firma, curva)
+        assert len(raw) == 64 and decodificar_firma_raw(raw, curva) == firma
+        der = codificar_firma_der(firma)
+        assert len(der) <= 72 and decodificar_firma_der(der) == firma
+    assert codificar_firma_der((1, 0x80)) == bytes.fromhex("3007020101020200 80".replace(" ", ""))
+    
+    buffer_raw = codificar_firmas_raw(firmas, curva)
+    assert len(buffer_raw) == 64 * len(firmas)
+    assert decodificar_firmas_raw(buffer_raw, curva) == firmas
+    assert decodificar_firmas_raw(memoryview(bytearray(buffer_raw)), curva) == firmas
+    assert decodificar_firmas_der(codificar_firmas_der(firmas)) == firmas
+    
+    assert decodificar_firma_raw(codificar_firma_raw((3, 4), crear_curva_ejemplo()),
+                                 crear_curva_ejemplo()) == (3, 4)
+
+
+def test_der_estricto():
+    """Se rechazan codificaciones DER no mínimas, negativas o truncadas"""
+    invalidas = [
+        "3005020101020101",          # longitud de la secuencia incorrecta
+        "300702020001020101",        # cero de sobra en r
+        "30060201ff020101",          # r negativo
+        "3081060201010201 01",       # longitud larga innecesaria
+        "300602010102010100",        # datos de sobra
+        "3006020101020201",          # truncada
+        "310602010102 0101",         # etiqueta incorrecta
+    ]
+    for hexadecimal in invalidas:
+        try:
+            decodificar_firma_der(bytes.fromhex(hexadecimal.replace(" ", "")))
+            assert False, f"se aceptó {hexadecimal}"
+        except ValueError:
+            pass
+    for datos in (b"\x00" * 63, b"\x00" * 65):
+        try:
+            decodificar_firma_raw(datos, obtener_curva("secp256k1"))
+            assert False, "se esperaba ValueError"
+        except ValueError:
+            pass
+
+
+def test_firma_recuperable_compacta():
+    """r||s||v en 65 bytes basta para verificar sin enviar la llave"""
+    curva = obtener_curva("secp256k1")
+    ecdsa = ECDSA(curva)
+    d, Q = ecdsa.generar_llaves()
+    firma = ecdsa.firmar_recuperable(b"paquete", d)
+    datos = codificar_firma_recuperable(firma, curva)
+    assert len(datos) == 65 and decodificar_firma_recuperable(datos, curva) == firma
+    assert ecdsa.recuperar_llave_publica(b"paquete", decodificar_firma_recuperable(datos, curva)) == Q
+    for invalida in (datos[:-1], datos[:-1] + b"\x04"):
+        try:
+            decodificar_firma_recuperable(invalida, curva)
+            assert False, "se esperaba ValueError"
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✓ {nombre}")
+    print("\n✓ TODAS LAS PRUEBAS DE FIRMAS DE ARCHIVOS PASARON")
@@ -0,0 +1,106 @@
+"""
+Pruebas del llavero en disco (llavero).
+
+Ejecutar: python src/test_llavero.py  (o con pytest)
+"""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ecdsa_core import ECDSA, PuntoElliptico, obtener_curva, crear_curva_ejemplo, curva_compartida
+from llavero import Llavero, huella_llave
+
+
+def test_agregar_y_buscar():
+    """Las llaves se encuentran por huella o por nombre tras reabrir el archivo"""
+    curva = obtener_curva("secp256k1")
+    ecdsa = ECDSA(curva)
+    llaves = [ecdsa.generar_llaves()[1] for _ in range(40)]
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "llaves.llv")
+        with Llavero(ruta, curva, capacidad=4) as llavero:
+            for i, Q in enumerate(llaves):
+                assert llavero.agregar(Q) == huella_llave(Q, curva)
+                llavero.agregar(Q, f"usuario{i}")
+            assert llavero.capacidad == 128 and len(llavero) == 80
+            try:
+                llavero.agregar(llaves[0], "usuario0")
+                assert False, "se esperaba ValueError"
+            except ValueError:
+                pass
+        
+        with Llavero(ruta, solo_lectura=True) as llavero:
+            assert llavero.curva is curva
+            for i, Q in enumerate(llaves):
+                assert llavero.obtener(huella_llave(Q, curva)) == Q
+                assert llavero.obtener(f"usuario{i}") == Q
+            assert llavero.obtener("nadie") is None and "nadie" not in llavero
+            assert [Q for _, Q in llavero][1::2] == llaves
+            try:
+                llavero.agregar(llaves[0], "otro")
+                assert False, "se esperaba ValueError"
+            except ValueError:
+                pass
+
+
+def test_eliminar_y_compactar():
+    """Eliminar libera el identificador y compactar quita las ranuras muertas"""
+    curva = crear_curva_ejemplo()
+    puntos = [curva.multiplicar_generador(k) for k in range(1, curva.q)]
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "ejemplo.llv")
+        with Llavero(ruta, curva) as llavero:
+            for i, P in enumerate(puntos):
+                llavero.agregar(P, f"p{i}")
+            assert llavero.eliminar("p1") and not llavero.eliminar("p1")
+            assert llavero.obtener("p1") is None and len(llavero) == 3
+            llavero.agregar(puntos[0], "p1")
+            assert llavero.obtener("p1") == puntos[0]
+            
+            tamano = os.path.getsize(ruta)
+            llavero.eliminar("p2")
+            llavero.compactar()
+            assert os.path.getsize(ruta) < tamano and len(llavero) == 3
+            esperado = {"p0": puntos[0], "p1": puntos[0], "p3": puntos[3]}
+            for nombre, P in esperado.items():
+                assert llavero.obtener(nombre) == P
+            
+            for invalida in (PuntoElliptico(None, None), PuntoElliptico(1, 1)):
+                try:
+                    llavero.agregar(invalida, "mala")
+                    assert False, "se esperaba ValueError"
+                except ValueError:
+                    pass
+        
+        try:
+            Llavero(ruta, obtener_curva("P-256"))
+            assert False, "se esperaba ValueError"
+        except ValueError:
+            pass
+
+
+def test_curva_distinta_se_rechaza():
+    """Al abrir con otra curva (aunque solo cambie G) se lanza ValueError"""
+    curva = crear_curva_ejemplo()
+    G2 = curva.multiplicar_escalar(2, curva.G)
+    otra = curva_compartida(curva.p, curva.a, curva.b, (G2.x, G2.y), curva.q)
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, "llaves.llv")
+        Llavero(ruta, curva).cerrar()
+        with Llavero(ruta, curva) as llavero:
+            assert llavero.curva.G == curva.G
+        try:
+            Llavero(ruta, otra)
+            assert False, "se esperaba ValueError"
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✓ {nombre}")
+    print("\n✓ TODAS LAS PRUEBAS DEL LLAVERO PASARON")
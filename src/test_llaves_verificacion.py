@@ -0,0 +1,71 @@
+"""
+Pruebas de LlaveVerificacion y de la caché LRU de llaves públicas.
+
+Ejecutar: python src/test_llaves_verificacion.py  (o con pytest)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ecdsa_core import (
+    CurvaEliptica, ECDSA, LlaveVerificacion, CacheLlavesVerificacion,
+    crear_curva_ejemplo
+)
+from test_aritmetica import SECP256K1, puntos_de_curva
+
+
+def test_llave_verificacion_equivale_al_punto():
+    ecdsa = ECDSA(CurvaEliptica(**SECP256K1))
+    d, Q = ecdsa.generar_llaves()
+    firma = ecdsa.firmar("hola", d)
+    for w in (2, 5, 8):
+        llave = LlaveVerificacion(Q, ecdsa.curva, ventana=w)
+        assert ecdsa.verificar("hola", firma, llave)
+        assert not ecdsa.verificar("adiós", firma, llave)
+    assert ecdsa.verificar_lote([("hola", firma, llave), ("adiós", firma, llave)]) == [True, False]
+
+
+def test_llave_verificacion_curva_pequena():
+    """Con cualquier punto (incluso O o de orden 2) el resultado no cambia"""
+    curva = crear_curva_ejemplo()
+    ecdsa = ECDSA(curva)
+    for Q in puntos_de_curva(curva):
+        llave = LlaveVerificacion(Q, curva, ventana=3)
+        for r in range(1, curva.q):
+            for s in range(1, curva.q):
+                assert ecdsa.verificar("m", (r, s), llave) == ecdsa.verificar("m", (r, s), Q)
+
+
+def test_cache_lru():
+    curva = CurvaEliptica(**SECP256K1)
+    cache = CacheLlavesVerificacion(max_llaves=3)
+    ecdsa = ECDSA(curva, cache_llaves=cache)
+    pares = ecdsa.generar_llaves_lote(5)
+    for d, Q in pares:
+        assert ecdsa.verificar("x", ecdsa.firmar("x", d), Q)
+    assert len(cache) == 3 and cache.fallos == 5
+    assert (curva, pares[0][1]) not in cache and (curva, pares[4][1]) in cache
+
+    llave = cache.obtener(pares[4][1], curva)
+    assert cache.obtener(pares[4][1], curva) is llave and cache.aciertos == 2
+
+
+def test_cache_limite_memoria():
+    curva = CurvaEliptica(**SECP256K1)
+    d, Q = ECDSA(curva).generar_llaves()
+    tamano = LlaveVerificacion(Q, curva).tamano_bytes()
+    cache = CacheLlavesVerificacion(max_llaves=100, max_bytes=int(tamano * 2.5))
+    for _, Q in ECDSA(curva).generar_llaves_lote(6):
+        cache.obtener(Q, curva)
+    assert len(cache) == 2 and cache.bytes_usados <= cache.max_bytes
+    cache.limpiar()
+    assert len(cache) == 0 and cache.bytes_usados == 0
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✓ {nombre}")
+    print("\n✓ TODAS LAS PRUEBAS DE LLAVES DE VERIFICACIÓN PASARON")
@@ -0,0 +1,126 @@
+"""
+Pruebas de la generación de nonces (RFC 6979 y PoolNonces).
+
+Ejecutar: python src/test_nonces.py  (o con pytest)
+"""
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ecdsa_core import ECDSA, PoolNonces, obtener_curva, crear_curva_ejemplo
+
+
+# RFC 6979, apéndice A.2.5 (P-256 con SHA-256)
+X_P256 = 0xC9AFA9D845BA75166B5C215767B1D6934E50C3DB36E89B127B8A622B120F6721
+VECTORES_P256 = [
+    (b"sample",
+     0xA6E3C57DD01ABE90086538398355DD4C3B17AA873382B0F24D6129493D8AAD60,
+     0xEFD48B2AACB6A8FD1140DD9CD45E81D69D2C877B56AAF991C34D0EA84EAF3716,
+     0xF7CB1C942D657C41D436C7A1B6E29F65F3E900DBB9AFF4064DC4AB2F843ACDA8),
+    (b"test",
+     0xD16B6AE827F17175E040871A1C7EC3500192C4C92677336EC2537ACAEE0008E0,
+     0xF1ABB023518351CD71D881567B1EA663ED3EFCF6C5132B354F28D3B0B7D38367,
+     0x019F4113742A2B14BD25926B49C649155F267E60D3814B4C0CC84250E46F0083),
+]
+
+
+def test_vectores_rfc6979_p256():
+    """Los nonces y las firmas coinciden con los vectores del RFC"""
+    ecdsa = ECDSA(obtener_curva("P-256"), nonces_deterministas=True)
+    for mensaje, k, r, s in VECTORES_P256:
+        z = ecdsa.hash_mensaje(mensaje)
+        assert next(ecdsa._nonces_rfc6979(z, X_P256)) == k
+        assert ecdsa.firmar(mensaje, X_P256) == (r, s)
+        assert ecdsa.firmar_lote([mensaje], X_P256) == [(r, s)]
+
+
+def test_estado_hmac_por_llave():
+    """El estado HMAC inicial se reutiliza entre firmas con la misma llave"""
+    ecdsa = ECDSA(obtener_curva("secp256k1"), nonces_deterministas=True)
+    ecdsa.MAX_ESTADOS_RFC6979 = 2
+    d, Q = ecdsa.generar_llaves()
+    firma = ecdsa.firmar("uno", d)
+    assert len(ecdsa._estados_rfc6979) == 1
+    assert ecdsa.firmar("uno", d) == firma
+    assert ecdsa.verificar("uno", firma, Q)
+    assert len(ecdsa._estados_rfc6979) == 1
+    for llave in (d + 1, d + 2, d + 3):
+        ecdsa.firmar("uno", llave)
+    assert len(ecdsa._estados_rfc6979) == 2
+
+
+def test_reintentos_curva_pequena():
+    """En la curva de ejemplo los reintentos siguen la secuencia del RFC"""
+    curva = crear_curva_ejemplo()
+    ecdsa = ECDSA(curva, nonces_deterministas=True)
+    for d in range(1, curva.q):
+        Q = curva.multiplicar_generador(d)
+        for mensaje in ("a", "b", "c", "Hola"):
+            try:
+                firma = ecdsa.firmar(mensaje, d)
+            except RuntimeError:
+                continue  # hash sin firma posible en una curva tan pequeña
+            assert firma == ecdsa.firmar(mensaje, d)
+            assert ecdsa.verificar(mensaje, firma, Q)
+
+
+def esperar_llenado(pool, limite=10.0):
+    """Espera a que el hilo de fondo llene la reserva"""
+    fin = time.time() + limite
+    while len(pool) < pool.profundidad and time.time() < fin:
+        time.sleep(0.01)
+    assert len(pool) == pool.profundidad
+
+
+def test_pool_nonces():
+    """Las firmas con nonces precalculados son válidas y cada nonce se usa una vez"""
+    curva = obtener_curva("secp256k1")
+    with PoolNonces(curva, profundidad=40, marca_recarga=10, tam_lote=16) as pool:
+        esperar_llenado(pool)
+        for k, r, k_inv in list(pool._nonces):
+            assert curva.multiplicar_generador(k).x % curva.q == r
+            assert (k * k_inv) % curva.q == 1
+        
+        ecdsa = ECDSA(curva, pool_nonces=pool)
+        d, Q = ecdsa.generar_llaves()
+        firmas = [ecdsa.firmar(b"mensaje %d" % i, d) for i in range(100)]
+        assert all(ecdsa.verificar(b"mensaje %d" % i, f, Q) for i, f in enumerate(firmas))
+        assert len({r for r, _ in firmas}) == 100
+        
+        # Tras vaciarse por debajo de la marca, el hilo vuelve a llenarla
+        esperar_llenado(pool)
+    
+    try:
+        pool.tomar()
+        assert False, "se esperaba RuntimeError"
+    except RuntimeError:
+        pass
+
+
+def test_pool_nonces_argumentos():
+    """Validación de parámetros y combinaciones incompatibles"""
+    curva = obtener_curva("secp256k1")
+    for argumentos in ({"profundidad": 0}, {"profundidad": 4, "marca_recarga": 4}):
+        try:
+            PoolNonces(curva, **argumentos)
+            assert False, "se esperaba ValueError"
+        except ValueError:
+            pass
+    with PoolNonces(curva, profundidad=4) as pool:
+        for argumentos in ({"nonces_deterministas": True}, {}):
+            otra = curva if argumentos else obtener_curva("P-256")
+            try:
+                ECDSA(otra, pool_nonces=pool, **argumentos)
+                assert False, "se esperaba ValueError"
+            except ValueError:
+                pass
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✓ {nombre}")
+    print("\n✓ TODAS LAS PRUEBAS DE NONCES PASARON")
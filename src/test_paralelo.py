@@ -0,0 +1,72 @@
+"""
+Pruebas del motor de firma y verificación en varios procesos.
+
+Ejecutar: python src/test_paralelo.py  (o con pytest)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ecdsa_core import ECDSA, obtener_curva, crear_curva_ejemplo
+from ecdsa_paralelo import MotorParalelo
+
+
+def test_verificar_en_paralelo():
+    """Resultados iguales a verificar(), en orden y sin orden"""
+    curva = obtener_curva("secp256k1")
+    ecdsa = ECDSA(curva)
+    llaves = [ecdsa.generar_llaves() for _ in range(3)]
+    elementos = []
+    esperado = []
+    for i in range(60):
+        d, Q = llaves[i % 3]
+        mensaje = b"mensaje %d" % i
+        firma = ecdsa.firmar(mensaje, d)
+        if i % 7 == 0:
+            mensaje += b"!"
+        # Unas veces la llave va por identificador y otras como punto
+        elementos.append((memoryview(mensaje), firma, i % 3 if i % 2 else Q))
+        esperado.append(i % 7 != 0)
+    
+    with MotorParalelo(curva, {j: Q for j, (_, Q) in enumerate(llaves)},
+                       procesos=2, tam_bloque=7, max_pendientes=3) as motor:
+        assert list(motor.verificar(elementos)) == esperado
+        desordenado = dict(motor.verificar(iter(elementos), ordenado=False))
+        assert [desordenado[i] for i in range(len(elementos))] == esperado
+
+
+def test_firmar_en_paralelo():
+    """Las firmas del motor son válidas y deterministas con RFC 6979"""
+    curva = obtener_curva("P-256")
+    ecdsa = ECDSA(curva, nonces_deterministas=True)
+    d, Q = ecdsa.generar_llaves()
+    mensajes = ["uno", b"dos", bytearray(b"tres")] * 5
+    with MotorParalelo(curva, llave_privada=d, procesos=2, tam_bloque=4,
+                       nonces_deterministas=True) as motor:
+        firmas = list(motor.firmar(mensajes))
+    assert firmas == [ecdsa.firmar(m, d) for m in mensajes]
+
+
+def test_curva_propia_y_errores():
+    """Curvas sin nombre viajan por parámetros; firmar exige llave privada"""
+    curva = crear_curva_ejemplo()
+    ecdsa = ECDSA(curva)
+    Q = curva.multiplicar_generador(2)
+    z_firma = [(m, (r, s)) for m in ("a", "b") for r in range(1, 5) for s in range(1, 5)]
+    with MotorParalelo(curva, {"q": Q}, procesos=1) as motor:
+        resultados = list(motor.verificar((m, f, "q") for m, f in z_firma))
+        assert resultados == [ecdsa.verificar(m, f, Q) for m, f in z_firma]
+        try:
+            motor.firmar(["a"])
+            assert False, "se esperaba ValueError"
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✓ {nombre}")
+    print("\n✓ TODAS LAS PRUEBAS DEL MOTOR PARALELO PASARON")
@@ -0,0 +1,123 @@
+"""
+Pruebas de la verificación de firmas por lotes (ECDSA.verificar_lote).
+
+Ejecutar: python src/test_verificacion_lote.py  (o con pytest)
+"""
+
+import sys
+import os
+import secrets
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ecdsa_core import CurvaEliptica, ECDSA, crear_curva_ejemplo
+from test_aritmetica import SECP256K1
+
+
+def preparar_lote(ecdsa: ECDSA, n: int, llaves: int = 3, recuperables: bool = True):
+    """Genera n firmas válidas repartidas entre varias llaves"""
+    pares = [ecdsa.generar_llaves() for _ in range(llaves)]
+    elementos = []
+    for i in range(n):
+        d, Q = pares[i % llaves]
+        mensaje = f"mensaje {i}"
+        firma = ecdsa.firmar_recuperable(mensaje, d) if recuperables else ecdsa.firmar(mensaje, d)
+        elementos.append((mensaje, firma, Q))
+    return elementos
+
+
+def test_lote_valido():
+    ecdsa = ECDSA(CurvaEliptica(**SECP256K1))
+    elementos = preparar_lote(ecdsa, 20)
+    assert ecdsa.verificar_lote(elementos) == [True] * 20
+
+
+def test_lote_con_firmas_invalidas():
+    """La bisección encuentra exactamente las firmas inválidas"""
+    ecdsa = ECDSA(CurvaEliptica(**SECP256K1))
+    elementos = preparar_lote(ecdsa, 19)
+    mensaje, (r, s, v), Q = elementos[3]
+    elementos[3] = (mensaje + "!", (r, s, v), Q)
+    mensaje, (r, s, v), Q = elementos[10]
+    elementos[10] = (mensaje, (r, (s + 1) % ecdsa.curva.q, v), Q)
+    mensaje, (r, s, v), Q = elementos[11]
+    elementos[11] = (mensaje, (r, s, v), elementos[0][2] if Q != elementos[0][2] else elementos[1][2])
+    mensaje, _, Q = elementos[17]
+    elementos[17] = (mensaje, (0, 1, 0), Q)
+
+    resultados = ecdsa.verificar_lote(elementos, tam_grupo=6)
+    assert resultados == [ecdsa.verificar(m, f[:2], Q) for m, f, Q in elementos]
+    assert [i for i, valido in enumerate(resultados) if not valido] == [3, 10, 11, 17]
+
+
+def test_lote_firma_negada():
+    """(r, q - s) sigue siendo válida aunque su v ya no corresponda a R"""
+    ecdsa = ECDSA(CurvaEliptica(**SECP256K1))
+    elementos = [(m, (r, ecdsa.curva.q - s, v), Q) for m, (r, s, v), Q in preparar_lote(ecdsa, 5)]
+    assert ecdsa.verificar_lote(elementos + preparar_lote(ecdsa, 4)) == [True] * 9
+
+
+def test_lote_sin_v_y_mezclado():
+    """Las firmas (r, s) sin v se verifican una a una dentro del mismo lote"""
+    ecdsa = ECDSA(CurvaEliptica(**SECP256K1))
+    elementos = preparar_lote(ecdsa, 6, recuperables=False) + preparar_lote(ecdsa, 6)
+    mensaje, (r, s), Q = elementos[2]
+    elementos[2] = (mensaje, (r, s, 7), Q)
+    assert ecdsa.verificar_lote(elementos) == [True] * 12
+
+
+def test_tam_grupo():
+    """tam_grupo se valida y se limita a MAX_TAM_GRUPO"""
+    ecdsa = ECDSA(CurvaEliptica(**SECP256K1))
+    elementos = preparar_lote(ecdsa, 4)
+    for tam in (0, -3):
+        try:
+            ecdsa.verificar_lote(elementos, tam_grupo=tam)
+            assert False, "tam_grupo < 1 debería fallar"
+        except ValueError:
+            pass
+    assert ecdsa.verificar_lote(elementos, tam_grupo=10 ** 9) == [True] * 4
+
+
+def test_lote_una_multiplicacion_por_grupo():
+    """Un lote válido de firmas recuperables no verifica ninguna firma por separado"""
+    ecdsa = ECDSA(CurvaEliptica(**SECP256K1))
+    elementos = preparar_lote(ecdsa, 40)
+    individuales = []
+    original = ecdsa._calcular_X
+    ecdsa._calcular_X = lambda *args: individuales.append(args) or original(*args)
+    assert ecdsa.verificar_lote(elementos, tam_grupo=20) == [True] * 40
+    assert individuales == []
+
+
+def test_firmar_y_generar_lote():
+    """Las firmas y llaves generadas por lotes son válidas"""
+    for curva in (CurvaEliptica(**SECP256K1), crear_curva_ejemplo()):
+        ecdsa = ECDSA(curva)
+        for d, Q in ecdsa.generar_llaves_lote(5):
+            assert Q == curva.multiplicar_escalar(d, curva.G)
+
+    ecdsa = ECDSA(CurvaEliptica(**SECP256K1))
+    d, Q = ecdsa.generar_llaves()
+    mensajes = [f"m{i}" for i in range(12)]
+    firmas = ecdsa.firmar_lote(mensajes, d)
+    assert len(firmas) == 12
+    assert all(ecdsa.verificar(m, f, Q) for m, f in zip(mensajes, firmas))
+
+
+def test_lote_curva_pequena():
+    """En curvas de juguete se verifica cada firma por separado"""
+    ecdsa = ECDSA(crear_curva_ejemplo())
+    elementos = []
+    for _ in range(10):
+        d, Q = ecdsa.generar_llaves()
+        r, s = secrets.randbelow(5), secrets.randbelow(5)
+        elementos.append(("hola", (r, s), Q))
+    assert ecdsa.verificar_lote(elementos) == [ecdsa.verificar(m, f, Q) for m, f, Q in elementos]
+
+
+if __name__ == "__main__":
+    for nombre, prueba in list(globals().items()):
+        if nombre.startswith("test_") and callable(prueba):
+            prueba()
+            print(f"✓ {nombre}")
+    print("\n✓ TODAS LAS PRUEBAS DE VERIFICACIÓN POR LOTES PASARON")